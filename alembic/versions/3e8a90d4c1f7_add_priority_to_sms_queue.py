@@ -0,0 +1,34 @@
+"""Add priority lanes to sms_queue
+
+Revision ID: 3e8a90d4c1f7
+Revises: b7d41c0e9a62
+Create Date: 2026-10-19 11:26:05.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a90d4c1f7'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c0e9a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sms_queue', sa.Column('priority', sa.Integer(), server_default='1', nullable=False))
+    op.create_index(
+        'idx_sms_queue_pending_priority', 'sms_queue', ['priority', 'scheduled_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sms_queue_pending_priority', table_name='sms_queue')
+    op.drop_column('sms_queue', 'priority')
@@ -0,0 +1,31 @@
+"""Add (campaign_id, status, id) index to sms_queue for fair-share claiming
+
+Revision ID: 5a1d6f2b8e40
+Revises: 3e8a90d4c1f7
+Create Date: 2026-10-19 12:41:52.170386
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1d6f2b8e40'
+down_revision: Union[str, Sequence[str], None] = '3e8a90d4c1f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_sms_queue_campaign_status_id', 'sms_queue', ['campaign_id', 'status', 'id'])
+    # Left-prefix of the new index
+    op.drop_index('idx_sms_queue_campaign', table_name='sms_queue')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_sms_queue_campaign', 'sms_queue', ['campaign_id'])
+    op.drop_index('idx_sms_queue_campaign_status_id', table_name='sms_queue')
@@ -0,0 +1,28 @@
+"""Add retryable flag to sms_queue
+
+Revision ID: 8f2c4b7d1e93
+Revises: 5a1d6f2b8e40
+Create Date: 2026-10-19 14:05:37.512894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c4b7d1e93'
+down_revision: Union[str, Sequence[str], None] = '5a1d6f2b8e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sms_queue', sa.Column('retryable', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sms_queue', 'retryable')
@@ -0,0 +1,28 @@
+"""Add filter_criteria to mailing_lists for dynamic lists
+
+Revision ID: 9c2f7e1a5b3d
+Revises: e406c986d79e
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f7e1a5b3d'
+down_revision: Union[str, Sequence[str], None] = 'e406c986d79e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mailing_lists', sa.Column('filter_criteria', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mailing_lists', 'filter_criteria')
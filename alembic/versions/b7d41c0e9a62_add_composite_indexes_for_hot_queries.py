@@ -0,0 +1,55 @@
+"""Add composite and partial indexes for the hot query shapes
+
+Revision ID: b7d41c0e9a62
+Revises: 9c2f7e1a5b3d
+Create Date: 2026-10-19 10:03:17.552841
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c0e9a62'
+down_revision: Union[str, Sequence[str], None] = '9c2f7e1a5b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace single-column indexes with ones matching the real predicates."""
+
+    # Send loop: claim pending rows in (scheduled_at, id) order
+    op.create_index('idx_sms_queue_status_scheduled_id', 'sms_queue', ['status', 'scheduled_at', 'id'])
+    op.create_index(
+        'idx_sms_queue_pending_scheduled', 'sms_queue', ['scheduled_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+    # Analytics aggregates and delivery timelines, always scoped to a campaign
+    op.create_index('idx_messages_campaign_status', 'messages', ['id_campagne', 'statut_livraison'])
+    op.create_index('idx_messages_campaign_date', 'messages', ['id_campagne', 'date_envoi'])
+
+    # Contact filters and dynamic list predicates
+    op.create_index('idx_contacts_segment_zone_opt_in', 'contacts', ['segment', 'zone_geographique', 'statut_opt_in'])
+
+    # These are left-prefixes of the composite indexes above
+    op.drop_index('idx_sms_queue_status', table_name='sms_queue')
+    op.drop_index('idx_messages_campaign', table_name='messages')
+    op.drop_index('idx_contacts_segment', table_name='contacts')
+
+
+def downgrade() -> None:
+    """Restore the single-column indexes."""
+    op.create_index('idx_contacts_segment', 'contacts', ['segment'])
+    op.create_index('idx_messages_campaign', 'messages', ['id_campagne'])
+    op.create_index('idx_sms_queue_status', 'sms_queue', ['status'])
+
+    op.drop_index('idx_contacts_segment_zone_opt_in', table_name='contacts')
+    op.drop_index('idx_messages_campaign_date', table_name='messages')
+    op.drop_index('idx_messages_campaign_status', table_name='messages')
+    op.drop_index('idx_sms_queue_pending_scheduled', table_name='sms_queue')
+    op.drop_index('idx_sms_queue_status_scheduled_id', table_name='sms_queue')
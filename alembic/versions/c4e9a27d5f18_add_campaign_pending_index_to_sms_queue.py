@@ -0,0 +1,39 @@
+"""Replace the (campaign_id, status, id) sms_queue index with a partial one matching the fair-share claim
+
+Revision ID: c4e9a27d5f18
+Revises: 8f2c4b7d1e93
+Create Date: 2026-10-19 19:52:08.416203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a27d5f18'
+down_revision: Union[str, Sequence[str], None] = '8f2c4b7d1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The claim filters each campaign's lane on scheduled_at and reads it in
+    # (scheduled_at, id) order, which (campaign_id, status, id) could not serve
+    op.create_index(
+        'idx_sms_queue_campaign_pending', 'sms_queue', ['campaign_id', 'priority', 'scheduled_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+    # Foreign key lookups only need the campaign
+    op.create_index('idx_sms_queue_campaign', 'sms_queue', ['campaign_id'])
+    op.drop_index('idx_sms_queue_campaign_status_id', table_name='sms_queue')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_sms_queue_campaign_status_id', 'sms_queue', ['campaign_id', 'status', 'id'])
+    op.drop_index('idx_sms_queue_campaign', table_name='sms_queue')
+    op.drop_index('idx_sms_queue_campaign_pending', table_name='sms_queue')
@@ -1,19 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.schemas.auth import UserLogin, Token
-from app.core.security import verify_password, create_access_token
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.security import (
+    PasswordHashingBusy,
+    clear_login_failures,
+    create_access_token,
+    login_is_throttled,
+    record_login_failure,
+    verify_password_async,
+)
+from app.db.session import get_async_db
 from app.db.models import Agent
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(form_data: UserLogin, db: Session = Depends(get_db)):
+async def login(form_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Logs in a user and returns an access token.
+    The bcrypt check runs off the event loop in a bounded worker pool, and
+    clients with too many recent failures for an identifiant are refused
+    before it runs.
     """
-    user = db.query(Agent).filter(Agent.identifiant == form_data.identifiant).first()
-    if not user or not verify_password(form_data.password, user.mot_de_passe):
+    client_ip = request.client.host if request.client else "unknown"
+    if await run_in_threadpool(login_is_throttled, form_data.identifiant, client_ip):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(settings.LOGIN_THROTTLE_WINDOW_SECONDS)},
+        )
+
+    result = await db.execute(select(Agent).where(Agent.identifiant == form_data.identifiant))
+    user = result.scalars().first()
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await verify_password_async(form_data.password, user.mot_de_passe)
+        except PasswordHashingBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins in progress. Try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+    if not verified:
+        await run_in_threadpool(record_login_failure, form_data.identifiant, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -22,6 +55,12 @@ def login(form_data: UserLogin, db: Session = Depends(get_db)):
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
 
+    await run_in_threadpool(clear_login_failures, form_data.identifiant, client_ip)
+    if new_hash:
+        # Stored with outdated bcrypt parameters
+        user.mot_de_passe = new_hash
+        await db.commit()
+
     access_token = create_access_token(
         subject=user.identifiant,
     )
@@ -1,12 +1,12 @@
 from typing import List
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.v1.schemas import campaign as campaign_schema
 from app.services import campaign_service, report_service
-from app.db.session import get_db
-from app.db.models import Agent
+from app.db.session import get_async_db, get_db
+from app.db.models import Agent, Campaign
 from app.core.security import get_current_user
 from app.services.campaign_execution_service import CampaignExecutionService
 
@@ -91,14 +91,16 @@ def delete_campaign(
 @router.post("/{campaign_id}/launch", response_model=dict)
 def launch_campaign(
     campaign_id: int,
+    options: campaign_schema.CampaignLaunchOptions | None = None,
     db: Session = Depends(get_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
     Launch a campaign.
+    Optionally throttle it and restrict it to a daily send window.
     """
     execution_service = CampaignExecutionService(db=db)
-    result = execution_service.launch_campaign(campaign_id=campaign_id)
+    result = execution_service.launch_campaign(campaign_id=campaign_id, options=options)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
     return result
@@ -119,21 +121,36 @@ def pause_campaign(
     return result.get("campaign")
 
 
-@router.get("/{campaign_id}/status", response_model=campaign_schema.CampaignStatus)
-def get_campaign_status(
+@router.post("/{campaign_id}/resume", response_model=campaign_schema.Campaign)
+def resume_campaign(
     campaign_id: int,
     db: Session = Depends(get_db),
     current_user: Agent = Depends(get_current_user),
+):
+    """
+    Resume a paused campaign.
+    """
+    result = campaign_service.resume_campaign(db=db, campaign_id=campaign_id)
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("message"))
+    return result.get("campaign")
+
+
+@router.get("/{campaign_id}/status", response_model=campaign_schema.CampaignStatus)
+async def get_campaign_status(
+    campaign_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Agent = Depends(get_current_user),
 ):
     """
     Get real-time status and statistics for a campaign.
+    Polled by the campaign monitor, so it runs on the async session.
     """
     # First, check if the campaign exists to return a 404 if not
-    campaign = campaign_service.get_campaign(db, campaign_id=campaign_id)
-    if campaign is None:
+    if await db.get(Campaign, campaign_id) is None:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    status_data = report_service.get_campaign_status(db=db, campaign_id=campaign_id)
+    status_data = await report_service.get_campaign_status(db=db, campaign_id=campaign_id)
     return status_data
 
 
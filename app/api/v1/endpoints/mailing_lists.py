@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -19,29 +19,33 @@ def create_mailing_list(
     service = MailingListService(db)
     return service.create_list(list_data=list_data)
 
-@router.get("/", response_model=List[list_schema.MailingList])
+@router.get("/", response_model=List[list_schema.MailingListSummary])
 def get_all_mailing_lists(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: Agent = Depends(get_current_user)
 ):
+    """
+    List mailing lists with their member counts. Members are not included;
+    page through them with GET /{list_id}/contacts.
+    """
     service = MailingListService(db)
-    return service.get_all_lists(skip=skip, limit=limit)
+    return service.get_all_list_summaries(skip=skip, limit=limit)
 
-@router.get("/{list_id}", response_model=list_schema.MailingList)
+@router.get("/{list_id}", response_model=list_schema.MailingListSummary)
 def get_mailing_list(
     list_id: int,
     db: Session = Depends(get_db),
     current_user: Agent = Depends(get_current_user)
 ):
     service = MailingListService(db)
-    db_list = service.get_list(list_id)
-    if db_list is None:
+    summary = service.get_list_summary(list_id)
+    if summary is None:
         raise HTTPException(status_code=404, detail="Mailing list not found")
-    return db_list
+    return summary
 
-@router.put("/{list_id}", response_model=list_schema.MailingList)
+@router.put("/{list_id}", response_model=list_schema.MailingListSummary)
 def update_mailing_list(
     list_id: int,
     list_data: list_schema.MailingListUpdate,
@@ -52,7 +56,7 @@ def update_mailing_list(
     updated_list = service.update_list(list_id=list_id, list_data=list_data)
     if updated_list is None:
         raise HTTPException(status_code=404, detail="Mailing list not found")
-    return updated_list
+    return service.get_list_summary(list_id)
 
 from app.core.security import get_current_active_admin
 
@@ -111,20 +115,23 @@ def bulk_remove_contacts(
         raise HTTPException(status_code=404, detail="Mailing list not found")
     return result
 
-@router.get("/{list_id}/contacts", response_model=List[list_schema.Contact])
+@router.get("/{list_id}/contacts", response_model=list_schema.ListContactsPage)
 def get_list_contacts(
     list_id: int,
+    cursor: int | None = Query(None, description="Last id_contact of the previous page."),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: Agent = Depends(get_current_user)
 ):
     """
-    Retrieve all contacts in a specific mailing list.
+    Retrieve one page of the contacts in a specific mailing list.
+    Pass the returned `next_cursor` back as `cursor` to get the next page.
     """
     service = MailingListService(db)
-    contacts = service.get_list_contacts(list_id=list_id)
-    if contacts is None:
+    page = service.get_list_contacts(list_id=list_id, cursor=cursor, limit=limit)
+    if page is None:
         raise HTTPException(status_code=404, detail="Mailing list not found")
-    return contacts
+    return page
 
 @router.delete("/{list_id}/contacts", response_model=dict, status_code=status.HTTP_200_OK)
 def remove_contacts_from_list(
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.responses import StreamingResponse
 import io
@@ -7,27 +8,27 @@ from typing import List
 from app.api.v1.schemas import report as report_schema, analytics as analytics_schema
 from app.services.analytics_service import AnalyticsService
 from app.services import report_service
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_read_db
 from app.db.models import Agent
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 @router.get("/dashboard", response_model=report_schema.DashboardStats)
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
     Get dashboard statistics.
     """
-    stats = report_service.get_dashboard_stats(db)
+    stats = await report_service.get_dashboard_stats(db)
     return stats
 
 @router.get("/campaign-comparison", response_model=analytics_schema.CampaignComparison)
 def get_campaign_comparison(
     campaign_ids: List[int] = Query(..., description="A list of campaign IDs to compare."),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -41,7 +42,7 @@ def get_campaign_comparison(
 def get_delivery_timeline(
     campaign_id: int,
     interval: str = 'day',
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -54,7 +55,7 @@ def get_delivery_timeline(
 @router.get("/segment-analysis/{campaign_id}", response_model=analytics_schema.SegmentAnalysis)
 def get_segment_analysis(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -67,7 +68,7 @@ def get_segment_analysis(
 @router.get("/cost-analysis/{campaign_id}", response_model=analytics_schema.CostAnalysis)
 def get_cost_analysis(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -80,7 +81,7 @@ def get_cost_analysis(
 @router.get("/contact-engagement/{campaign_id}", response_model=analytics_schema.ContactEngagementReport)
 def get_contact_engagement(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -93,7 +94,7 @@ def get_contact_engagement(
 @router.get("/campaign/{campaign_id}", response_model=report_schema.Report)
 def get_campaign_report(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -110,7 +111,7 @@ from app.services.report_generation_service import ReportGenerationService
 def export_report(
     format: str,
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Agent = Depends(get_current_user),
 ):
     """
@@ -1,9 +1,13 @@
 import logging
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.api.v1.endpoints.webhooks import validate_twilio_request
+from app.db.session import get_async_db
 from app.db.models import Message
+from app.core.metrics import WEBHOOK_LAG
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,10 +15,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/twilio-status", status_code=status.HTTP_204_NO_CONTENT)
-async def twilio_status_webhook(request: Request, db: Session = Depends(get_db)):
+async def twilio_status_webhook(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(validate_twilio_request),
+):
     """
     Handles incoming status update webhooks from Twilio.
     This endpoint updates the status of the permanent 'messages' table record.
+    It takes the provider's callback storm, so it awaits the database rather
+    than blocking the event loop. It is exempt from the API rate limits, so
+    only requests signed with the Twilio auth token are accepted.
     """
     try:
         webhook_data = await request.form()
@@ -27,7 +38,8 @@ async def twilio_status_webhook(request: Request, db: Session = Depends(get_db))
 
         logger.info(f"Received Twilio status update for SID {message_sid}: {message_status}")
 
-        message = db.query(Message).filter(Message.external_message_id == message_sid).first()
+        result = await db.execute(select(Message).where(Message.external_message_id == message_sid))
+        message = result.scalars().first()
 
         if not message:
             logger.warning(f"Webhook for unknown message SID {message_sid} received. Ignoring.")
@@ -47,7 +59,10 @@ async def twilio_status_webhook(request: Request, db: Session = Depends(get_db))
         if cost_str:
              message.cost = abs(float(cost_str))
 
-        db.commit()
+        await db.commit()
+        # date_envoi is stored in UTC without a timezone
+        sent_at = message.date_envoi.replace(tzinfo=message.date_envoi.tzinfo or timezone.utc)
+        WEBHOOK_LAG.labels(message_status).observe((datetime.now(timezone.utc) - sent_at).total_seconds())
         logger.info(f"Updated message {message.id_message} (SID: {message_sid}) status to {message.statut_livraison}")
 
     except Exception as e:
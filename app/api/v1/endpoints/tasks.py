@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 from app.services.queue_service import QueueService
+from app.db.session import get_db
 from app.core.security import get_current_active_admin
 from app.db.models import Agent
 
 router = APIRouter()
 
-@router.get("/status", summary="Get Celery queue and worker status")
-def get_queue_status(current_user: Agent = Depends(get_current_active_admin)):
+@router.get("/status", summary="Get SMS queue depth, lag and send rates")
+def get_queue_status(db: Session = Depends(get_db), current_user: Agent = Depends(get_current_active_admin)):
     """
-    Retrieves the status of Celery workers and active/scheduled tasks.
+    Retrieves queue items per status and campaign, the wait of the oldest
+    due item and recent send rates. Cached for a few seconds.
     Requires admin privileges.
     """
-    status = QueueService.get_queue_status()
+    status = QueueService.get_queue_status(db)
     return status
 
 @router.post("/retry/{task_id}", summary="Retry a failed task")
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.services.webhook_service import WebhookService
 
 router = APIRouter()
 
-async def validate_twilio_request(request: Request, db: Session = Depends(get_db)):
+async def validate_twilio_request(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Dependency to validate incoming Twilio webhooks."""
     try:
         raw_body = await request.body()
@@ -26,7 +26,7 @@ async def validate_twilio_request(request: Request, db: Session = Depends(get_db
 @router.post("/sms/delivery", status_code=204)
 async def sms_delivery_webhook(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # By using Annotated[bytes, Depends(validate_twilio_request)], we ensure validation runs first
     # but we don't consume the body here, allowing FastAPI to still parse the form.
     _=Depends(validate_twilio_request),
@@ -38,6 +38,6 @@ async def sms_delivery_webhook(
     payload = await request.form()
 
     webhook_service = WebhookService(db)
-    webhook_service.handle_delivery_status(payload._dict)
+    await webhook_service.handle_delivery_status(payload._dict)
 
     return
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 
@@ -38,6 +38,16 @@ class CampaignStatus(BaseModel):
     pending: int = 0
 
 
+class CampaignLaunchOptions(BaseModel):
+    """Spreads a launch over time; unset fields fall back to the SEND_* settings."""
+    rate_per_minute: Optional[int] = Field(None, gt=0)
+    window_start_hour: Optional[int] = Field(None, ge=0, le=23)
+    window_end_hour: Optional[int] = Field(None, ge=0, le=23)
+    timezone: Optional[str] = None
+    # Queue lane override (0 = high, 1 = normal, 2 = bulk); defaults from type_campagne
+    priority: Optional[int] = Field(None, ge=0, le=2)
+
+
 class CampaignPreviewItem(BaseModel):
     contact_name: str
     phone_number: str
@@ -15,18 +15,36 @@ class MailingListBase(BaseModel):
 
 class MailingListCreate(MailingListBase):
     id_campagne: int
+    # Set to create a dynamic list whose members are the contacts matching the filter
+    filter_criteria: Optional[ContactFilter] = None
 
 class MailingListUpdate(BaseModel):
     nom_liste: Optional[str] = None
     description: Optional[str] = None
+    filter_criteria: Optional[ContactFilter] = None
 
 class MailingList(MailingListBase):
     id_liste: int
     id_campagne: int
+    filter_criteria: Optional[dict] = None
+    is_dynamic: bool = False
     contacts: List[Contact] = []
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class MailingListSummary(MailingListBase):
+    id_liste: int
+    id_campagne: int
+    filter_criteria: Optional[dict] = None
+    is_dynamic: bool = False
+    contact_count: int = 0
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+class ListContactsPage(BaseModel):
+    items: List[Contact]
+    next_cursor: Optional[int] = None
+
 class BulkContactOperation(BaseModel):
     contact_ids: List[int]
 
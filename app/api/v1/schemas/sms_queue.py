@@ -9,6 +9,7 @@ class SMSQueueItem(BaseModel):
     message_content: str
     scheduled_at: datetime
     status: str
+    priority: int
     attempts: int
     error_message: Optional[str] = None
     created_at: datetime
@@ -0,0 +1,180 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    A small thread-safe in-process cache with per-key expiry.
+    Used as a fallback when Redis is not reachable.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Drop expired entries first, then the oldest insertion if still full
+                now = time.monotonic()
+                for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+                    del self._data[k]
+                if len(self._data) >= self.maxsize:
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = TTLCache()
+
+_redis_client: Optional[redis.Redis] = None
+_redis_retry_at = 0.0
+_redis_lock = threading.Lock()
+_disabled_warned = False
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Returns a shared Redis client, or None if Redis is disabled or unreachable.
+    A failed connection is not retried for REDIS_RETRY_INTERVAL seconds.
+    """
+    global _redis_client, _redis_retry_at, _disabled_warned
+
+    if not settings.REDIS_ENABLED:
+        if not _disabled_warned:
+            _disabled_warned = True
+            logger.warning(
+                "Redis is disabled: caches, circuit breakers, login throttling and "
+                "rate limits are kept per process, not shared across the deployment."
+            )
+        return None
+    if _redis_client is not None:
+        return _redis_client
+    if time.monotonic() < _redis_retry_at:
+        return None
+
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        try:
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+            client.ping()
+            _redis_client = client
+        except redis.RedisError as e:
+            logger.warning(
+                f"Redis unavailable at {settings.REDIS_URL}, using in-process cache: {e}. "
+                f"Caches, circuit breakers, login throttling and rate limits are per process "
+                f"until it is reachable."
+            )
+            _redis_retry_at = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+            return None
+    return _redis_client
+
+
+def _reset_redis_client() -> None:
+    global _redis_client, _redis_retry_at
+    _redis_client = None
+    _redis_retry_at = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+
+
+def cache_get(key: str) -> Any:
+    """Returns the JSON-decoded value stored under key, or None."""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            raw = client.get(key)
+            return json.loads(raw) if raw is not None else None
+        except redis.RedisError as e:
+            logger.warning(f"Redis GET failed for {key}: {e}")
+            _reset_redis_client()
+    return local_cache.get(key)
+
+
+def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Stores a JSON-serializable value under key for ttl seconds."""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            client.set(key, json.dumps(value, default=str), ex=ttl)
+            return
+        except redis.RedisError as e:
+            logger.warning(f"Redis SET failed for {key}: {e}")
+            _reset_redis_client()
+    local_cache.set(key, value, ttl)
+
+
+def cache_delete(*keys: str) -> None:
+    """Removes keys from both Redis and the in-process cache."""
+    for key in keys:
+        local_cache.delete(key)
+    client = get_redis_client()
+    if client is not None and keys:
+        try:
+            client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Redis DELETE failed for {keys}: {e}")
+            _reset_redis_client()
+
+
+_local_incr_lock = threading.Lock()
+
+
+def cache_incr(key: str, amount: int, ttl: int) -> None:
+    """Adds amount to the integer counter under key, which expires ttl seconds after its last update."""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.incrby(key, amount)
+            pipe.expire(key, ttl)
+            pipe.execute()
+            return
+        except redis.RedisError as e:
+            logger.warning(f"Redis INCRBY failed for {key}: {e}")
+            _reset_redis_client()
+    with _local_incr_lock:
+        local_cache.set(key, (local_cache.get(key) or 0) + amount, ttl)
+
+
+def cache_get_many(keys: List[str]) -> List[Any]:
+    """Like cache_get for several keys at once, in one round trip to Redis."""
+    client = get_redis_client()
+    if client is not None and keys:
+        try:
+            return [json.loads(raw) if raw is not None else None for raw in client.mget(keys)]
+        except redis.RedisError as e:
+            logger.warning(f"Redis MGET failed for {keys}: {e}")
+            _reset_redis_client()
+    return [local_cache.get(key) for key in keys]
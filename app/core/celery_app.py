@@ -1,5 +1,9 @@
 from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
 from app.core.config import settings
+from app.core.metrics import mark_process_dead, start_worker_metrics_server
+from app.db.profiler import finish_profile, should_profile, start_profile
+from app.db.session import dispose_engines
 
 # Initialize the Celery application
 celery_app = Celery(
@@ -28,5 +32,33 @@ celery_app.conf.update(
     },
 )
 
+
+@worker_init.connect
+def _serve_worker_metrics(**kwargs):
+    if settings.WORKER_METRICS_PORT:
+        start_worker_metrics_server(settings.WORKER_METRICS_PORT)
+
+@worker_process_init.connect
+def _reset_db_pools(**kwargs):
+    dispose_engines()
+
+# Profile tokens of running tasks, by task id
+_task_profiles = {}
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, **kwargs):
+    if should_profile():
+        _task_profiles[task_id] = start_profile(f"task {task.name}")
+
+@task_postrun.connect
+def _finish_task_profile(task_id=None, **kwargs):
+    token = _task_profiles.pop(task_id, None)
+    if token is not None:
+        finish_profile(token)
+
+@worker_process_shutdown.connect
+def _drop_process_metrics(pid=None, **kwargs):
+    mark_process_dead(pid)
+
 if __name__ == '__main__':
     celery_app.start()
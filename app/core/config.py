@@ -1,12 +1,43 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     DATABASE_URL: str
+    # Optional read replica for analytics and report queries. Reads fall
+    # back to the primary while it lags more than REPLICA_MAX_LAG_SECONDS;
+    # the lag is measured at most every REPLICA_LAG_CHECK_INTERVAL seconds.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 30.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 10.0
     JWT_SECRET_KEY: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # How long an authenticated agent's id, role and status are reused
+    # without reading the agents table
+    AUTH_PRINCIPAL_CACHE_TTL: int = 60
+    # bcrypt cost factor; stored hashes with another cost are rehashed on login
+    BCRYPT_ROUNDS: int = 12
+    # Processes verifying login passwords (0 = the request threadpool), and
+    # how many verifications may wait for them before logins get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # Failed logins allowed per identifiant and client address within the
+    # window before further attempts are refused without checking the password
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 300
+    # API requests per minute, per agent for authenticated requests and per
+    # IP otherwise. RATE_LIMIT_ROUTE_LIMITS sets a tighter budget per path
+    # prefix and client; provider callbacks and monitoring are exempt.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_ANONYMOUS_PER_MINUTE: int = 60
+    RATE_LIMIT_USER_PER_MINUTE: int = 600
+    RATE_LIMIT_ROUTE_LIMITS: Dict[str, int] = {"/auth/login": 20}
+    RATE_LIMIT_EXEMPT_PREFIXES: List[str] = ["/api/v1/sms-webhooks", "/webhooks", "/health", "/metrics"]
+    # Reverse proxies (addresses or networks) whose X-Forwarded-For and
+    # X-Forwarded-Proto headers are trusted for the client address and
+    # scheme. Anyone else's forwarding headers are ignored.
+    TRUSTED_PROXIES: List[str] = []
     TWILIO_ACCOUNT_SID: str
     TWILIO_AUTH_TOKEN: str
     TWILIO_PHONE_NUMBER: str
@@ -15,13 +46,91 @@ class Settings(BaseSettings):
     BASE_URL: str
     SMS_RATE_LIMIT: Optional[str] = None
 
+    # Default send window applied at launch (all unset = send immediately)
+    SEND_RATE_PER_MINUTE: Optional[int] = None
+    SEND_WINDOW_START_HOUR: Optional[int] = None
+    SEND_WINDOW_END_HOUR: Optional[int] = None
+    SEND_WINDOW_TIMEZONE: str = "UTC"
+
+    # Share of each claimed batch reserved for the high, normal and bulk lanes
+    SMS_PRIORITY_WEIGHTS: List[int] = [6, 3, 1]
+
+    # How long workers may go on using a cached list of paused campaigns
+    CAMPAIGN_PAUSE_CACHE_TTL: int = 5
+
+    # How long the queue health summary (admin dashboard, /metrics) is reused
+    QUEUE_HEALTH_CACHE_TTL: int = 10
+
+    # Retry backoff for transient send failures, in seconds
+    SMS_RETRY_BASE_DELAY: int = 30
+    SMS_RETRY_MAX_DELAY: int = 3600
+    # Bounds for one run of the failed-message retry sweep
+    SMS_RETRY_SWEEP_CHUNK_SIZE: int = 500
+    SMS_RETRY_SWEEP_MAX_ITEMS: int = 5000
+
+    # Providers the router may send through, by registered name. Options per
+    # provider: prefixes (destinations served, all if omitted), costs
+    # (prefix -> price), default_cost and max_per_second. Set as JSON, e.g.
+    # {"twilio": {"costs": {"+33": 0.07}}, "fake": {"prefixes": ["+1555"]}}
+    SMS_PROVIDERS: Dict[str, Dict[str, Any]] = {"twilio": {}}
+    # Keyword arguments for SimulatedSmsProvider when "simulated" is listed
+    # in SMS_PROVIDERS, e.g. {"latency_ms": 20, "error_rate": 0.01}
+    SMS_SIMULATOR: Dict[str, Any] = {}
+    # Parallel sends per batch for providers without a bulk API
+    SMS_SEND_CONCURRENCY: int = 10
+
+    # Shared Twilio HTTP connection pool (size defaults to SMS_SEND_CONCURRENCY)
+    TWILIO_HTTP_TIMEOUT: float = 10.0
+    TWILIO_HTTP_POOL_SIZE: Optional[int] = None
+
+    # Provider circuit breaker: trips when at least MIN_CALLS calls in the
+    # window fail (or are slower than SLOW_CALL_SECONDS) at FAILURE_RATE or more
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_MIN_CALLS: int = 20
+    CIRCUIT_BREAKER_WINDOW_SECONDS: int = 60
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    CIRCUIT_BREAKER_OPEN_SECONDS: int = 30
+
+    # Connection pools. Each role gets its own pool so that long report
+    # queries cannot take the connections the webhooks and send workers need.
+    # Server-side limit on statement run time, in ms (PostgreSQL only).
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = 30000
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 5
+    ANALYTICS_DB_POOL_SIZE: int = 3
+    ANALYTICS_DB_MAX_OVERFLOW: int = 2
+    ANALYTICS_DB_STATEMENT_TIMEOUT_MS: Optional[int] = 120000
+
+    # SQL profiling: per request/task query counts, N+1 warnings for
+    # statements repeated N_PLUS_ONE_THRESHOLD times, a Server-Timing header
+    # on a SAMPLE_RATE share of requests, and logs of slow statements
+    QUERY_PROFILING_ENABLED: bool = False
+    QUERY_PROFILING_SAMPLE_RATE: float = 1.0
+    QUERY_PROFILING_N_PLUS_ONE_THRESHOLD: int = 10
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+
     # Celery Settings
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    # Port on which each Celery worker container serves its Prometheus
+    # metrics (unset = not served)
+    WORKER_METRICS_PORT: Optional[int] = None
 
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_ENABLED: bool = True
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_RETRY_INTERVAL: int = 30
     MAX_FILE_SIZE: int = 10485760
     UPLOAD_DIRECTORY: str = "./uploads"
 
+    # Mailing List Settings
+    LIST_STATISTICS_CACHE_TTL: int = 300
+    DYNAMIC_LIST_CACHE_TTL: int = 60
+
 settings = Settings()
@@ -0,0 +1,189 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set, every process of a container (uvicorn
+# workers, Celery children) writes its samples there and the container's
+# metrics endpoint aggregates the directory. Files are named by PID, which
+# restart at 1 in every container, so each container needs its own
+# directory, emptied before it starts (scripts/docker-entrypoint.sh).
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+LAUNCH_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 900, 1800, 3600)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed.", ["operation"])
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.",
+    ["operation"], buckets=DB_BUCKETS,
+)
+SMS_SENT = Counter("sms_sent_total", "Send attempts by provider and outcome.", ["provider", "outcome"])
+SMS_SEND_DURATION = Histogram(
+    "sms_send_duration_seconds", "Provider send call latency.",
+    ["provider"], buckets=LATENCY_BUCKETS,
+)
+WEBHOOK_LAG = Histogram(
+    "sms_status_callback_lag_seconds", "Time from sending a message to ingesting its status callback.",
+    ["status"], buckets=LAG_BUCKETS,
+)
+CAMPAIGN_LAUNCH_DURATION = Histogram(
+    "campaign_launch_duration_seconds", "Time taken to queue a campaign.", buckets=LAUNCH_BUCKETS,
+)
+CAMPAIGN_LAUNCH_MESSAGES = Counter("campaign_launch_messages_total", "Messages queued by campaign launches.")
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Counts and times every statement run on the engine."""
+
+    # The start time lives on the statement's execution context: after_cursor_execute
+    # does not fire for a statement that raises, so per-connection state would leak
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        operation = _operation(statement)
+        DB_QUERIES.labels(operation).inc()
+        started = getattr(context, "_metrics_query_start", None)
+        if started is not None:
+            DB_QUERY_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+
+class QueueDepthCollector:
+    """
+    Reports the SMS queue backlog when Prometheus scrapes, from the same
+    cached summary as the admin dashboard.
+    """
+
+    def collect(self):
+        from app.db.session import SessionLocal
+        from app.services.queue_service import QueueService
+
+        db = SessionLocal()
+        try:
+            health = QueueService.get_queue_health(db)
+        except SQLAlchemyError as e:
+            # A database outage must not take the other metrics down with it
+            logger.error(f"Could not collect queue depth metrics: {e}")
+            return
+        finally:
+            db.close()
+
+        depth = GaugeMetricFamily("sms_queue_depth", "SMS queue items by status.", labels=["status"])
+        for status, count in health["by_status"].items():
+            depth.add_metric([status], count)
+        yield depth
+
+        campaign_depth = GaugeMetricFamily(
+            "sms_queue_campaign_depth", "Pending and processing SMS queue items by campaign.",
+            labels=["campaign_id", "status"],
+        )
+        for campaign in health["by_campaign"]:
+            for status in ("pending", "processing"):
+                campaign_depth.add_metric([str(campaign["campaign_id"]), status], campaign[status])
+        yield campaign_depth
+
+        yield GaugeMetricFamily(
+            "sms_queue_oldest_pending_age_seconds", "How long the oldest due item has waited past its scheduled time.",
+            value=health["oldest_pending_age_seconds"] or 0,
+        )
+
+        rate = GaugeMetricFamily("sms_queue_send_rate_per_minute", "Messages sent per minute.", labels=["window"])
+        for window, value in health["send_rate_per_minute"].items():
+            rate.add_metric([window], value)
+        yield rate
+
+
+class _DefaultRegistryProxy:
+    """Exposes this process's metrics through another registry."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def _process_registry() -> CollectorRegistry:
+    """The metrics of this container's processes."""
+    registry = CollectorRegistry()
+    if MULTIPROCESS:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_DefaultRegistryProxy())
+    return registry
+
+
+def _scrape_registry() -> CollectorRegistry:
+    registry = _process_registry()
+    registry.register(QueueDepthCollector())
+    return registry
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(_scrape_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    Times every request, labelled by the route template (e.g.
+    /campaigns/{campaign_id}) so that ids do not explode the label set.
+    """
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path: Optional[str] = getattr(route, "path", None)
+        if path != "/metrics":
+            HTTP_REQUEST_DURATION.labels(
+                request.method, path or "unmatched", str(status)
+            ).observe(time.perf_counter() - started)
+
+
+def start_worker_metrics_server(port: int) -> None:
+    """
+    Serves a Celery worker container's metrics on port, for Prometheus to
+    scrape next to the API's /metrics. The queue depth is left to the API,
+    so it is not reported twice.
+    """
+    start_http_server(port, registry=_process_registry())
+    logger.info(f"Serving worker metrics on port {port}.")
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drops a finished worker's live gauges from the multiprocess directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
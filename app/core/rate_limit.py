@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from typing import List, NamedTuple, Sequence
+
+import redis
+
+from app.core.cache import TTLCache, get_redis_client, _reset_redis_client
+
+logger = logging.getLogger(__name__)
+
+# GCRA over several limits at once: each KEYS[i] holds the theoretical
+# arrival time (TAT) of that limit's next request, in ms. ARGV: now, then
+# the emission interval and burst tolerance of each key, all in ms. Every
+# key is checked before any is updated, so a refused request uses no
+# budget. Returns {allowed, ms to wait before retrying}.
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tats = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then tat = now end
+    tats[i] = tat
+    local allow_at = tat - tonumber(ARGV[2 * i + 1])
+    if allow_at - now > wait then wait = allow_at - now end
+end
+if wait > 0 then
+    return {0, wait}
+end
+for i, key in ipairs(KEYS) do
+    local new_tat = tats[i] + tonumber(ARGV[2 * i])
+    redis.call('SET', key, new_tat, 'PX', math.ceil(new_tat - now))
+end
+return {1, 0}
+"""
+
+# Per-process state when Redis is unreachable; bounded so that many distinct
+# clients cannot grow it without limit
+local_rate_limits = TTLCache(maxsize=10000)
+_local_lock = threading.Lock()
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float
+
+
+class RateLimiter:
+    """
+    A GCRA (generic cell rate algorithm) limiter: `limit` requests per
+    `period` seconds, which may all arrive at once. Each key is a single
+    timestamp with an expiry, so memory and work per request are constant,
+    unlike a log of request times. State lives in Redis so that every
+    worker enforces the same budget; if Redis is not reachable each process
+    enforces it on its own.
+    """
+
+    def __init__(self, name: str, limit: int, period: float):
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    @property
+    def _interval_ms(self) -> float:
+        return self.period * 1000 / self.limit
+
+    @property
+    def _tolerance_ms(self) -> float:
+        return self.period * 1000 - self._interval_ms
+
+    def _key(self, client: str) -> str:
+        return f"ratelimit:{self.name}:{client}"
+
+    def hit(self, client: str) -> RateLimitResult:
+        return hit_limits([self], client)
+
+
+def hit_limits(limiters: Sequence[RateLimiter], client: str) -> RateLimitResult:
+    """
+    Counts one request from client against every limiter, or against none
+    of them if any would refuse it.
+    """
+    keys = [limiter._key(client) for limiter in limiters]
+    now_ms = int(time.time() * 1000)
+    redis_client = get_redis_client()
+    if redis_client is not None:
+        try:
+            args = [now_ms]
+            for limiter in limiters:
+                args += [limiter._interval_ms, limiter._tolerance_ms]
+            allowed, wait_ms = redis_client.eval(GCRA_SCRIPT, len(keys), *keys, *args)
+            return RateLimitResult(bool(allowed), float(wait_ms) / 1000)
+        except redis.RedisError as e:
+            logger.warning(f"Redis unavailable for rate limits, using local state: {e}")
+            _reset_redis_client()
+    return _hit_local(limiters, keys, now_ms)
+
+
+def _hit_local(limiters: Sequence[RateLimiter], keys: List[str], now_ms: float) -> RateLimitResult:
+    with _local_lock:
+        tats = [max(local_rate_limits.get(key) or now_ms, now_ms) for key in keys]
+        wait_ms = max(tat - limiter._tolerance_ms - now_ms for tat, limiter in zip(tats, limiters))
+        if wait_ms > 0:
+            return RateLimitResult(False, wait_ms / 1000)
+        for key, tat, limiter in zip(keys, tats, limiters):
+            new_tat = tat + limiter._interval_ms
+            local_rate_limits.set(key, new_tat, (new_tat - now_ms) / 1000)
+        return RateLimitResult(True, 0.0)
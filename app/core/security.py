@@ -1,24 +1,44 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional, Tuple
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_delete, cache_get, cache_incr, cache_set
 from app.core.config import settings
 from app.db import models
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.api.v1.schemas.auth import TokenData
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with other rounds than BCRYPT_ROUNDS are flagged by
+# needs_update and replaced at the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+PRINCIPAL_CACHE_PREFIX = "auth:principal:"
+# What authenticated requests need to know about their agent
+PRINCIPAL_FIELDS = ("id_agent", "nom_agent", "identifiant", "role", "is_active")
+
 def create_access_token(
     subject: str | Any, expires_delta: timedelta | None = None
 ) -> str:
@@ -37,10 +57,100 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHashingBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING verifications are already waiting."""
+    pass
+
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_pid: Optional[int] = None
+_hash_lock = threading.Lock()
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    """
+    The process pool for bcrypt, created on first use in each process. Its
+    workers are started by a forkserver rather than forked from the server,
+    which has threads running and may hold their locks at fork time.
+    """
+    global _hash_executor, _hash_executor_pid
+    with _hash_lock:
+        if _hash_executor is None or _hash_executor_pid != os.getpid():
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            _hash_executor_pid = os.getpid()
+    return _hash_executor
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Checks a password without tying up the event loop or its threadpool:
+    bcrypt runs in a pool of PASSWORD_HASH_WORKERS processes (or the
+    threadpool when that is 0), so a burst of logins uses at most that many
+    cores. Beyond PASSWORD_HASH_MAX_PENDING waiting verifications it raises
+    PasswordHashingBusy rather than queueing without bound.
+
+    Returns whether the password matches and, when the stored hash uses
+    outdated parameters, a new hash to store in its place.
+    """
+    global _hash_pending
+    with _hash_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHashingBusy()
+        _hash_pending += 1
+    try:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(_verify_and_update, plain_password, hashed_password)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), _verify_and_update, plain_password, hashed_password)
+    finally:
+        with _hash_lock:
+            _hash_pending -= 1
+
+
+LOGIN_FAILURES_PREFIX = "auth:login_failures:"
+
+
+def _login_failures_key(identifiant: str, client_ip: str) -> str:
+    # Per client as well as identifiant, so that failures from elsewhere
+    # cannot lock an agent out
+    return f"{LOGIN_FAILURES_PREFIX}{client_ip}:{identifiant.lower()}"
+
+
+def login_is_throttled(identifiant: str, client_ip: str) -> bool:
+    """
+    True once a client has LOGIN_MAX_FAILURES failed logins for an
+    identifiant within LOGIN_THROTTLE_WINDOW_SECONDS.
+    """
+    return (cache_get(_login_failures_key(identifiant, client_ip)) or 0) >= settings.LOGIN_MAX_FAILURES
+
+
+def record_login_failure(identifiant: str, client_ip: str) -> None:
+    cache_incr(_login_failures_key(identifiant, client_ip), 1, settings.LOGIN_THROTTLE_WINDOW_SECONDS)
+
+
+def clear_login_failures(identifiant: str, client_ip: str) -> None:
+    cache_delete(_login_failures_key(identifiant, client_ip))
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Resolves the bearer token to its agent. The principal is cached for
+    AUTH_PRINCIPAL_CACHE_TTL seconds, so most requests skip the database;
+    a cached principal comes back as a detached Agent that only carries
+    PRINCIPAL_FIELDS. The session only connects on a cache miss. The cache
+    client is blocking, so it is called from the threadpool.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -54,12 +164,32 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.Agent).filter(models.Agent.identifiant == token_data.username).first()
+    cached = await run_in_threadpool(cache_get, principal_cache_key(token_data.username))
+    if cached is not None:
+        return models.Agent(**cached)
+
+    result = await db.execute(select(models.Agent).where(models.Agent.identifiant == token_data.username))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
+    await run_in_threadpool(
+        cache_set,
+        principal_cache_key(token_data.username),
+        {field: getattr(user, field) for field in PRINCIPAL_FIELDS},
+        settings.AUTH_PRINCIPAL_CACHE_TTL,
+    )
     return user
 
-def get_current_active_admin(current_user: models.Agent = Depends(get_current_user)):
+
+def principal_cache_key(identifiant: str) -> str:
+    return f"{PRINCIPAL_CACHE_PREFIX}{identifiant}"
+
+
+def invalidate_principal(*identifiants: str) -> None:
+    """Forgets cached principals; call whenever an agent's role, status or login changes."""
+    cache_delete(*(principal_cache_key(identifiant) for identifiant in identifiants))
+
+async def get_current_active_admin(current_user: models.Agent = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
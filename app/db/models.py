@@ -10,7 +10,9 @@ from sqlalchemy import (
     DECIMAL,
     FLOAT,
     CheckConstraint,
-    Table
+    Index,
+    Table,
+    text
 )
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -97,6 +99,10 @@ class Contact(Base):
     mailing_lists = relationship("MailingList", secondary=liste_contacts, back_populates="contacts")
     messages = relationship("Message", back_populates="contact")
 
+    __table_args__ = (
+        Index('idx_contacts_segment_zone_opt_in', 'segment', 'zone_geographique', 'statut_opt_in'),
+    )
+
 class MailingList(Base):
     __tablename__ = 'mailing_lists'
     id_liste = Column(Integer, primary_key=True)
@@ -105,11 +111,18 @@ class MailingList(Base):
     id_campagne = Column(Integer, ForeignKey('campagnes.id_campagne'), nullable=False)
     created_at = Column(TIMESTAMP, default=func.now())
     deleted_at = Column(TIMESTAMP, nullable=True)
+    # Saved ContactFilter predicate; when set, membership is evaluated from it
+    # instead of the liste_contacts association.
+    filter_criteria = Column(JSON, nullable=True)
 
     campaign = relationship("Campaign", back_populates="mailing_lists")
     contacts = relationship("Contact", secondary=liste_contacts, back_populates="mailing_lists")
     messages = relationship("Message", back_populates="mailing_list")
 
+    @property
+    def is_dynamic(self) -> bool:
+        return self.filter_criteria is not None
+
 class Message(Base):
     __tablename__ = 'messages'
     id_message = Column(Integer, primary_key=True)
@@ -129,6 +142,11 @@ class Message(Base):
     contact = relationship("Contact", back_populates="messages")
     campaign = relationship("Campaign", back_populates="messages")
 
+    __table_args__ = (
+        Index('idx_messages_campaign_status', 'id_campagne', 'statut_livraison'),
+        Index('idx_messages_campaign_date', 'id_campagne', 'date_envoi'),
+    )
+
 class CampaignReport(Base):
     __tablename__ = 'campaign_reports'
     id_rapport = Column(Integer, primary_key=True)
@@ -155,14 +173,38 @@ class SMSQueue(Base):
     message_content = Column(TEXT, nullable=False)
     scheduled_at = Column(TIMESTAMP, nullable=False)
     status = Column(String(20), CheckConstraint("status IN ('pending', 'processing', 'sent', 'failed')"), default='pending')
+    # Lower values are claimed first; see QueueService for the lanes
+    priority = Column(Integer, default=1, server_default='1', nullable=False)
     attempts = Column(Integer, default=0)
     error_message = Column(TEXT)
+    # False once the provider rejected the message for good (e.g. invalid number)
+    retryable = Column(Boolean, default=True, server_default=text('true'), nullable=False)
     created_at = Column(TIMESTAMP, default=func.now())
     processed_at = Column(TIMESTAMP)
 
     campaign = relationship("Campaign")
     contact = relationship("Contact")
 
+    __table_args__ = (
+        Index('idx_sms_queue_status_scheduled_id', 'status', 'scheduled_at', 'id'),
+        Index('idx_sms_queue_campaign', 'campaign_id'),
+        Index(
+            'idx_sms_queue_pending_scheduled', 'scheduled_at', 'id',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index(
+            'idx_sms_queue_pending_priority', 'priority', 'scheduled_at', 'id',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index(
+            'idx_sms_queue_campaign_pending', 'campaign_id', 'priority', 'scheduled_at', 'id',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
+
 
 class ActivityLog(Base):
     __tablename__ = 'activity_logs'
@@ -0,0 +1,134 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text written to a log line
+MAX_LOGGED_STATEMENT = 500
+
+
+class QueryProfile:
+    """
+    The statements run during one request or task. Statements are keyed by
+    their SQL text, which holds placeholders rather than values, so the same
+    query run for many rows (an N+1 pattern) shows up as one shape with a
+    high count.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(statement, n) for statement, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+def start_profile(label: str) -> Token:
+    return _current_profile.set(QueryProfile(label))
+
+
+def finish_profile(token: Token) -> Optional[QueryProfile]:
+    """Stops profiling and logs the statements that look like an N+1."""
+    profile = _current_profile.get()
+    _current_profile.reset(token)
+    if profile is None:
+        return None
+    for statement, n in profile.repeated_shapes(settings.QUERY_PROFILING_N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            f"Possible N+1 in {profile.label}: statement ran {n} times: {_truncate(statement)}"
+        )
+    logger.debug(f"{profile.label}: {profile.count} queries in {profile.duration * 1000:.1f} ms")
+    return profile
+
+
+@contextmanager
+def profile_queries(label: str):
+    token = start_profile(label)
+    try:
+        yield _current_profile.get()
+    finally:
+        finish_profile(token)
+
+
+def should_profile() -> bool:
+    """Whether to profile the next request, honouring the sample rate."""
+    return settings.QUERY_PROFILING_ENABLED and random.random() < settings.QUERY_PROFILING_SAMPLE_RATE
+
+
+def _truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= MAX_LOGGED_STATEMENT else statement[:MAX_LOGGED_STATEMENT] + "..."
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    Describes bind parameters by type only, so slow query logs never contain
+    phone numbers, message bodies or other contact data.
+    """
+    if executemany and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def profile_engine(engine: Engine) -> None:
+    """
+    Times the engine's statements when QUERY_PROFILING_ENABLED is set: each
+    one is added to the current request's or task's profile, and those over
+    SLOW_QUERY_THRESHOLD_MS are logged. Nothing is attached otherwise.
+    """
+    if not settings.QUERY_PROFILING_ENABLED:
+        return
+
+    # Kept on the execution context rather than the connection, as
+    # after_cursor_execute does not fire for a statement that raises
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._profiler_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profiler_query_start", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, duration)
+        if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            label = profile.label if profile else "untracked"
+            logger.warning(
+                f"Slow query ({duration * 1000:.1f} ms) in {label}: {_truncate(statement)} "
+                f"params={parameter_shape(parameters, executemany)}"
+            )
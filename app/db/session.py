@@ -1,9 +1,185 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from typing import AsyncIterator, Optional, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.profiler import profile_engine
+
+logger = logging.getLogger(__name__)
+
+# Replication lag on PostgreSQL, 0 when the replica has replayed everything
+# it received (an idle primary would otherwise look like growing lag)
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+# Async drivers for the backends we run on
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def _engine_options(url: Union[str, URL], pool_size: int, max_overflow: int, statement_timeout_ms: Optional[int], asynchronous: bool) -> dict:
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        options.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if backend == "postgresql" and statement_timeout_ms:
+        if asynchronous:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+
+def create_role_engine(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: Optional[int] = None,
+) -> Engine:
+    """
+    Creates an engine with its own connection pool, so that one kind of work
+    (API requests, send workers, analytics) cannot use up the connections
+    of another. Pool sizing and the statement timeout only apply to server
+    databases; SQLite keeps SQLAlchemy's defaults.
+    """
+    engine = create_engine(url, **_engine_options(url, pool_size, max_overflow, statement_timeout_ms, asynchronous=False))
+    instrument_engine(engine)
+    profile_engine(engine)
+    return engine
+
+
+def async_database_url(url: str) -> URL:
+    """The same database behind an async driver (asyncpg, aiosqlite)."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+
+def create_async_role_engine(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: Optional[int] = None,
+) -> AsyncEngine:
+    """Like create_role_engine, for handlers that await their queries instead of blocking a thread."""
+    url = async_database_url(url)
+    engine = create_async_engine(url, **_engine_options(url, pool_size, max_overflow, statement_timeout_ms, asynchronous=True))
+    instrument_engine(engine.sync_engine)
+    profile_engine(engine.sync_engine)
+    return engine
+
+
+# API requests and webhooks
+engine = create_role_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+)
+# Celery workers: queue claims and sends
+worker_engine = create_role_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.WORKER_DB_POOL_SIZE,
+    max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+)
+# Long-running analytics and report reads on the primary, used when there
+# is no replica or it is too far behind
+analytics_engine = create_role_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.ANALYTICS_DB_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.ANALYTICS_DB_STATEMENT_TIMEOUT_MS,
+)
+replica_engine = create_role_engine(
+    settings.DATABASE_REPLICA_URL,
+    pool_size=settings.ANALYTICS_DB_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.ANALYTICS_DB_STATEMENT_TIMEOUT_MS,
+) if settings.DATABASE_REPLICA_URL else None
+# High-concurrency async handlers: webhooks, auth, campaign status, dashboard
+async_engine = create_async_role_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+)
+# Async report reads on the primary: the analytics pool and timeout, kept
+# apart from the pool the async handlers above use
+async_analytics_engine = create_async_role_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.ANALYTICS_DB_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.ANALYTICS_DB_STATEMENT_TIMEOUT_MS,
+)
+async_replica_engine = create_async_role_engine(
+    settings.DATABASE_REPLICA_URL,
+    pool_size=settings.ANALYTICS_DB_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_DB_MAX_OVERFLOW,
+    statement_timeout_ms=settings.ANALYTICS_DB_STATEMENT_TIMEOUT_MS,
+) if settings.DATABASE_REPLICA_URL else None
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+WorkerSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+AnalyticsSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=analytics_engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+# Objects stay usable after commit: reloading expired attributes would need an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncAnalyticsSessionLocal = async_sessionmaker(async_analytics_engine, autoflush=False, expire_on_commit=False)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine, autoflush=False, expire_on_commit=False
+) if async_replica_engine else None
+
+_replica_check_lock = threading.Lock()
+_replica_checked_at = float("-inf")
+_replica_usable = False
+
+
+def measure_replica_lag(replica: Engine) -> float:
+    """Seconds the replica is behind the primary. Non-PostgreSQL replicas report 0."""
+    if replica.dialect.name != "postgresql":
+        return 0.0
+    with replica.connect() as conn:
+        return float(conn.execute(REPLICA_LAG_QUERY).scalar() or 0)
+
+
+def replica_is_usable() -> bool:
+    """
+    Whether reads may go to the replica: it is configured, reachable and no
+    more than REPLICA_MAX_LAG_SECONDS behind. The answer is reused for
+    REPLICA_LAG_CHECK_INTERVAL seconds, so requests do not each pay for a
+    lag query.
+    """
+    global _replica_checked_at, _replica_usable
+    if replica_engine is None:
+        return False
+    if time.monotonic() - _replica_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_usable
+    with _replica_check_lock:
+        if time.monotonic() - _replica_checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            try:
+                lag = measure_replica_lag(replica_engine)
+                usable = lag <= settings.REPLICA_MAX_LAG_SECONDS
+                if not usable:
+                    logger.warning(f"Read replica is {lag:.1f}s behind; reading from the primary.")
+            except Exception as e:
+                logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+                usable = False
+            _replica_usable, _replica_checked_at = usable, time.monotonic()
+    return _replica_usable
+
 
 def get_db():
     db = SessionLocal()
@@ -11,3 +187,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """
+    Like get_db, for read-only analytics and report endpoints: uses the read
+    replica while it is healthy and the primary's analytics pool otherwise.
+    Results may be up to REPLICA_MAX_LAG_SECONDS old, so anything that must
+    see its own writes should use get_db.
+    """
+    db = ReplicaSessionLocal() if replica_is_usable() else AnalyticsSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Like get_db, for async def handlers."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """Like get_read_db, for async def handlers."""
+    # The lag check is cached and only occasionally runs a query, off the event loop
+    use_replica = AsyncReplicaSessionLocal is not None and await run_in_threadpool(replica_is_usable)
+    async with (AsyncReplicaSessionLocal() if use_replica else AsyncAnalyticsSessionLocal()) as db:
+        yield db
+
+def dispose_engines() -> None:
+    """
+    Drops the pooled connections inherited from a parent process without
+    closing them, so a forked worker opens its own instead of sharing the
+    parent's sockets.
+    """
+    for role_engine in (engine, worker_engine, analytics_engine, replica_engine):
+        if role_engine is not None:
+            role_engine.dispose(close=False)
+    for async_role_engine in (async_engine, async_analytics_engine, async_replica_engine):
+        if async_role_engine is not None:
+            async_role_engine.sync_engine.dispose(close=False)
@@ -1,15 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, campaigns, contacts, templates, messages, reports, users, webhooks, mailing_lists, tasks, analytics, admin, queue
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from app.api.v1.endpoints import auth, campaigns, contacts, templates, messages, reports, users, webhooks, sms_webhooks, mailing_lists, tasks, analytics, admin, queue
 from app.core.logging import setup_logging
 from app.core.monitoring import get_application_health
+from app.core.metrics import metrics_middleware, metrics_response
 from app.core.config import settings
+from app.middleware.profiling_middleware import query_profiling_middleware
+from app.middleware.security_middleware import rate_limiting_middleware
 
 setup_logging()
 
 app = FastAPI()
 
-# CORS Middleware
+app.middleware("http")(query_profiling_middleware)
+app.middleware("http")(rate_limiting_middleware)
+app.middleware("http")(metrics_middleware)
+# CORS Middleware, added last so it is outermost: responses produced by the
+# middleware above (such as rate limit 429s) get CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -17,6 +25,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost of all: behind the reverse proxy, the client address that rate
+# limits and login throttling key on, and the scheme that webhook signatures
+# cover, come from the proxy's forwarding headers
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.TRUSTED_PROXIES)
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
@@ -26,6 +38,8 @@ app.include_router(templates.router, prefix="/templates", tags=["templates"])
 app.include_router(messages.router, prefix="/messages", tags=["messages"])
 app.include_router(reports.router, prefix="/reports", tags=["reports"])
 app.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
+# Matches the status callback URL given to providers in process_sms_batch
+app.include_router(sms_webhooks.router, prefix="/api/v1/sms-webhooks", tags=["sms-webhooks"])
 app.include_router(mailing_lists.router, prefix="/mailing-lists", tags=["mailing-lists"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
@@ -39,6 +53,14 @@ def health_check():
     """
     return get_application_health()
 
+@app.get("/metrics", tags=["monitoring"], include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics, aggregated across processes when
+    PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    return metrics_response()
+
 @app.get("/")
 def read_root():
     return {
@@ -0,0 +1,22 @@
+from fastapi import Request
+
+from app.db.profiler import finish_profile, should_profile, start_profile
+
+
+async def query_profiling_middleware(request: Request, call_next):
+    """
+    Profiles the SQL run by a sample of requests and reports it in a
+    Server-Timing header, which browser dev tools show next to the request.
+    """
+    if not should_profile():
+        return await call_next(request)
+
+    token = start_profile(f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+    finally:
+        profile = finish_profile(token)
+    existing = response.headers.get("Server-Timing")
+    timing = profile.server_timing()
+    response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+    return response
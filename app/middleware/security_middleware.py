@@ -1,33 +1,66 @@
+import math
+
 from fastapi import Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-import time
+from jose import JWTError, jwt
 
-# This would typically use a more persistent store like Redis
-request_counts = {}
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, hit_limits
+from app.core.security import ALGORITHM
 
-async def rate_limiting_middleware(request: Request, call_next):
+
+def _client_id(request: Request) -> str:
     """
-    Placeholder for a simple, in-memory rate limiting middleware.
+    The agent a bearer token was issued to, or the caller's IP (forwarded
+    by a TRUSTED_PROXIES proxy, if any). The token's signature is checked
+    but the agent is not looked up: an unknown agent is refused by the
+    endpoint itself.
     """
-    client_ip = request.client.host
-    current_time = time.time()
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
 
-    # Clean up old timestamps
-    if client_ip in request_counts:
-        request_counts[client_ip] = [t for t in request_counts[client_ip] if current_time - t < 60]
+def _limiters(path: str, client: str) -> list[RateLimiter]:
+    limiters = [
+        RateLimiter(f"route:{prefix}", limit, 60)
+        for prefix, limit in settings.RATE_LIMIT_ROUTE_LIMITS.items()
+        if path.startswith(prefix)
+    ]
+    per_minute = settings.RATE_LIMIT_USER_PER_MINUTE if client.startswith("user:") else settings.RATE_LIMIT_ANONYMOUS_PER_MINUTE
+    limiters.append(RateLimiter("api", per_minute, 60))
+    return limiters
 
-    # Check request count
-    if client_ip in request_counts and len(request_counts[client_ip]) >= 100: # 100 requests per minute
+
+async def rate_limiting_middleware(request: Request, call_next):
+    """
+    Refuses requests beyond the client's budget with a 429 and Retry-After.
+    Budgets are shared by all API processes through Redis (see RateLimiter).
+    Provider webhooks are exempt: providers retry refused callbacks and
+    their volume follows our own sends.
+    """
+    path = request.url.path
+    if not settings.RATE_LIMIT_ENABLED or any(path.startswith(prefix) for prefix in settings.RATE_LIMIT_EXEMPT_PREFIXES):
+        return await call_next(request)
+
+    client = _client_id(request)
+    # The limiter's Redis client blocks, so it must not run on the event loop
+    result = await run_in_threadpool(hit_limits, _limiters(path, client), client)
+    if not result.allowed:
         return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             content={"detail": "Too many requests."},
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
         )
-
-    # Log new request timestamp
-    request_counts.setdefault(client_ip, []).append(current_time)
-
-    response = await call_next(request)
-    return response
+    return await call_next(request)
 
 
 async def input_sanitization_middleware(request: Request, call_next):
@@ -1,8 +1,15 @@
 import logging
+import time
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import CAMPAIGN_LAUNCH_DURATION, CAMPAIGN_LAUNCH_MESSAGES
 from app.db.models import Campaign, Contact, SMSQueue
+from app.api.v1.schemas.campaign import CampaignLaunchOptions
+from app.services.mailing_list_service import MailingListService
+from app.services.queue_service import QueueService
 from app.utils.phone_validator import validate_and_format_phone_number, InvalidPhoneNumberError
+from app.utils.send_window import SendWindowScheduler, InvalidSendWindowError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,9 +26,21 @@ class CampaignExecutionService:
             email=contact.email or ''
         )
 
-    def launch_campaign(self, campaign_id: int) -> dict:
+    def _build_scheduler(self, options: CampaignLaunchOptions | None) -> SendWindowScheduler:
+        options = options or CampaignLaunchOptions()
+        return SendWindowScheduler(
+            start=datetime.now(timezone.utc),
+            rate_per_minute=options.rate_per_minute or settings.SEND_RATE_PER_MINUTE,
+            start_hour=options.window_start_hour if options.window_start_hour is not None else settings.SEND_WINDOW_START_HOUR,
+            end_hour=options.window_end_hour if options.window_end_hour is not None else settings.SEND_WINDOW_END_HOUR,
+            timezone_name=options.timezone or settings.SEND_WINDOW_TIMEZONE,
+        )
+
+    def launch_campaign(self, campaign_id: int, options: CampaignLaunchOptions | None = None) -> dict:
         """
         Validates, launches, and queues messages for a campaign.
+        Each message gets a scheduled_at from the send window, so a launch can
+        be throttled and kept out of quiet hours instead of being sent at once.
         """
         campaign = self.db.query(Campaign).filter(Campaign.id_campagne == campaign_id).first()
 
@@ -37,19 +56,35 @@ class CampaignExecutionService:
             logger.warning(f"Launch failed: Campaign {campaign_id} does not meet launch requirements (missing template or lists).")
             return {"success": False, "message": "Campaign must have a template and at least one mailing list."}
 
+        try:
+            scheduler = self._build_scheduler(options)
+        except InvalidSendWindowError as e:
+            logger.warning(f"Launch failed: invalid send window for campaign {campaign_id}: {e}")
+            return {"success": False, "message": str(e)}
+
         # All checks passed, proceed with launch
         logger.info(f"Launching campaign {campaign_id}...")
+        started = time.perf_counter()
         campaign.statut = 'active'
 
         message_template = campaign.template.contenu_modele
         queued_count = 0
+        if options is not None and options.priority is not None:
+            priority = options.priority
+        else:
+            priority = QueueService.priority_for_campaign_type(campaign.type_campagne)
 
+        list_service = MailingListService(self.db)
         for mailing_list in campaign.mailing_lists:
-            for contact in mailing_list.contacts:
-                if not contact.statut_opt_in:
-                    logger.info(f"Skipping contact {contact.id_contact} (opted out).")
-                    continue
-
+            # Dynamic lists are resolved here from their stored filter; opted-out
+            # contacts are excluded in SQL rather than loaded and skipped.
+            members = (
+                list_service.members_query(mailing_list)
+                .filter(Contact.statut_opt_in == True)
+                .order_by(Contact.id_contact)
+                .yield_per(1000)
+            )
+            for contact in members:
                 try:
                     validate_and_format_phone_number(contact.numero_telephone)
                     personalized_content = self._personalize_message(message_template, contact)
@@ -57,8 +92,9 @@ class CampaignExecutionService:
                         campaign_id=campaign.id_campagne,
                         contact_id=contact.id_contact,
                         message_content=personalized_content,
-                        scheduled_at=datetime.now(timezone.utc),
-                        status='pending'
+                        scheduled_at=scheduler.next_slot(),
+                        status='pending',
+                        priority=priority
                     )
                     self.db.add(new_queue_item)
                     queued_count += 1
@@ -67,6 +103,8 @@ class CampaignExecutionService:
 
         if queued_count > 0:
             self.db.commit()
+            CAMPAIGN_LAUNCH_DURATION.observe(time.perf_counter() - started)
+            CAMPAIGN_LAUNCH_MESSAGES.inc(queued_count)
             logger.info(f"Successfully launched campaign {campaign.id_campagne} and queued {queued_count} messages.")
             return {"success": True, "message": "Campaign launched successfully.", "queued_count": queued_count}
         else:
@@ -88,9 +126,10 @@ class CampaignExecutionService:
         preview_items = []
 
         # Collect contacts from all mailing lists associated with the campaign
+        list_service = MailingListService(self.db)
         all_contacts = []
         for mailing_list in campaign.mailing_lists:
-            all_contacts.extend(mailing_list.contacts)
+            all_contacts.extend(list_service.members_query(mailing_list).order_by(Contact.id_contact).limit(limit).all())
 
         # Get a limited number of unique contacts for the preview
         unique_contacts = list({contact.id_contact: contact for contact in all_contacts}.values())
@@ -1,6 +1,16 @@
+import logging
+from typing import Set
 from sqlalchemy.orm import Session
+from app.core.cache import cache_delete, cache_get, cache_set
+from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.db.models import Campaign
 from app.api.v1.schemas.campaign import CampaignCreate, CampaignUpdate
+from app.services.queue_service import QueueService
+
+logger = logging.getLogger(__name__)
+
+PAUSED_CAMPAIGNS_CACHE_KEY = "campaigns:paused"
 
 def create_campaign(db: Session, campaign: CampaignCreate, agent_id: int):
     db_campaign = Campaign(**campaign.model_dump(), id_agent=agent_id)
@@ -20,8 +30,11 @@ def update_campaign(db: Session, campaign_id: int, campaign: CampaignUpdate):
     if db_campaign:
         for key, value in campaign.model_dump().items():
             setattr(db_campaign, key, value)
+        if db_campaign.statut == 'completed':
+            QueueService.expire_campaign_items(db, [campaign_id])
         db.commit()
         db.refresh(db_campaign)
+        cache_delete(PAUSED_CAMPAIGNS_CACHE_KEY)
     return db_campaign
 
 def delete_campaign(db: Session, campaign_id: int):
@@ -34,7 +47,9 @@ def delete_campaign(db: Session, campaign_id: int):
 
 def pause_campaign(db: Session, campaign_id: int):
     """
-    Pauses an active campaign.
+    Pauses an active campaign. A batch that is being sent checks before
+    each message, so only messages already handed to the provider go out;
+    the rest go back to the queue.
     """
     db_campaign = get_campaign(db, campaign_id=campaign_id)
     if not db_campaign:
@@ -46,4 +61,45 @@ def pause_campaign(db: Session, campaign_id: int):
     db_campaign.statut = 'paused'
     db.commit()
     db.refresh(db_campaign)
+    cache_delete(PAUSED_CAMPAIGNS_CACHE_KEY)
     return {"success": True, "campaign": db_campaign}
+
+
+def resume_campaign(db: Session, campaign_id: int):
+    """
+    Resumes a paused campaign and kicks off a queue batch so that its
+    pending messages start draining without waiting for the next beat.
+    """
+    db_campaign = get_campaign(db, campaign_id=campaign_id)
+    if not db_campaign:
+        return {"success": False, "message": "Campaign not found."}
+
+    if db_campaign.statut != 'paused':
+        return {"success": False, "message": f"Only paused campaigns can be resumed. Current status: {db_campaign.statut}."}
+
+    db_campaign.statut = 'active'
+    db.commit()
+    db.refresh(db_campaign)
+    cache_delete(PAUSED_CAMPAIGNS_CACHE_KEY)
+
+    try:
+        celery_app.send_task("app.tasks.sms_tasks.process_sms_batch", retry=False)
+    except Exception as e:
+        # The beat schedule will pick the queue up anyway
+        logger.warning(f"Could not trigger queue processing after resuming campaign {campaign_id}: {e}")
+    return {"success": True, "campaign": db_campaign}
+
+
+def get_paused_campaign_ids(db: Session) -> Set[int]:
+    """
+    Returns the ids of paused campaigns. Workers call this before sending
+    each message, so the list is cached (in Redis when available) for
+    CAMPAIGN_PAUSE_CACHE_TTL seconds. Pausing and resuming drop the cached
+    list, so with Redis the change is seen by every worker immediately and
+    without it within the TTL.
+    """
+    paused_ids = cache_get(PAUSED_CAMPAIGNS_CACHE_KEY)
+    if paused_ids is None:
+        paused_ids = [row.id_campagne for row in db.query(Campaign.id_campagne).filter(Campaign.statut == 'paused').all()]
+        cache_set(PAUSED_CAMPAIGNS_CACHE_KEY, paused_ids, ttl=settings.CAMPAIGN_PAUSE_CACHE_TTL)
+    return set(paused_ids)
@@ -5,8 +5,10 @@ from sqlalchemy import distinct
 from pydantic import ValidationError
 from fastapi import UploadFile
 
+from app.core.cache import cache_delete
 from app.db.models import Contact
 from app.api.v1.schemas.contact import ContactCreate, ContactUpdate
+from app.services.mailing_list_service import statistics_cache_keys_for_contacts
 
 
 def create_contact(db: Session, contact: ContactCreate):
@@ -35,17 +37,21 @@ def get_contacts(db: Session, filters: dict, skip: int = 0, limit: int = 100):
 def update_contact(db: Session, contact_id: int, contact: ContactUpdate):
     db_contact = get_contact(db, contact_id)
     if db_contact:
+        stale_keys = statistics_cache_keys_for_contacts(db, [contact_id])
         for key, value in contact.model_dump().items():
             setattr(db_contact, key, value)
         db.commit()
+        cache_delete(*stale_keys)
         db.refresh(db_contact)
     return db_contact
 
 def delete_contact(db: Session, contact_id: int):
     db_contact = get_contact(db, contact_id)
     if db_contact:
+        stale_keys = statistics_cache_keys_for_contacts(db, [contact_id])
         db.delete(db_contact)
         db.commit()
+        cache_delete(*stale_keys)
     return db_contact
 
 def import_contacts_from_file(db: Session, file: UploadFile):
@@ -152,6 +158,8 @@ def bulk_update_opt_status(db: Session, contact_ids: list[int], opt_in_status: b
         .where(Contact.id_contact.in_(contact_ids))
         .values(statut_opt_in=opt_in_status)
     )
+    stale_keys = statistics_cache_keys_for_contacts(db, contact_ids)
     result = db.execute(update_stmt)
     db.commit()
+    cache_delete(*stale_keys)
     return {"updated_count": result.rowcount}
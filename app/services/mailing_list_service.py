@@ -1,18 +1,87 @@
 import logging
+from collections import Counter
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, Query
 from typing import List
+from fastapi import HTTPException
 
-from app.db.models import MailingList, Contact, MessageTemplate
+from app.core.cache import cache_get, cache_set, cache_delete
+from app.core.config import settings
+from app.db.models import MailingList, Contact, MessageTemplate, liste_contacts
 from app.api.v1.schemas.mailing_list import MailingListCreate, MailingListUpdate, ListStatistics, BulkFilter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _statistics_cache_key(list_id: int) -> str:
+    return f"mailing_list:{list_id}:statistics"
+
+def _count_cache_key(list_id: int) -> str:
+    return f"mailing_list:{list_id}:count"
+
+def statistics_cache_keys_for_contacts(db: Session, contact_ids: List[int]) -> List[str]:
+    """
+    Cache keys of the static lists containing any of the contacts, whose
+    statistics go stale when those contacts change. Read them before the
+    change is committed: deleting a contact also removes its memberships.
+    Dynamic lists are not included; their cached results expire on their own.
+    """
+    if not contact_ids:
+        return []
+    list_ids = (
+        db.query(liste_contacts.c.id_liste)
+        .filter(liste_contacts.c.id_contact.in_(contact_ids))
+        .distinct()
+    )
+    keys = []
+    for (list_id,) in list_ids:
+        keys += [_statistics_cache_key(list_id), _count_cache_key(list_id)]
+    return keys
+
+def apply_contact_filter(query: Query, filter_data: dict) -> Query:
+    """Applies a stored ContactFilter/BulkFilter predicate to a Contact query."""
+    for key, value in filter_data.items():
+        query = query.filter(getattr(Contact, key) == value)
+    return query
+
+
 class MailingListService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _invalidate_statistics(self, list_id: int) -> None:
+        """Drops cached statistics after the list's membership changed."""
+        cache_delete(_statistics_cache_key(list_id), _count_cache_key(list_id))
+
+    def _cache_ttl(self, db_list: MailingList) -> int:
+        # Dynamic lists change whenever a matching contact does, which cannot be
+        # invalidated explicitly, so their cached results expire sooner.
+        if db_list.is_dynamic:
+            return settings.DYNAMIC_LIST_CACHE_TTL
+        return settings.LIST_STATISTICS_CACHE_TTL
+
+    def _reject_if_dynamic(self, db_list: MailingList) -> None:
+        if db_list.is_dynamic:
+            raise HTTPException(
+                status_code=400,
+                detail="Membership of a dynamic list is defined by its filter and cannot be edited directly."
+            )
+
+    def members_query(self, db_list: MailingList, *columns) -> Query:
+        """
+        Returns a query over the list's members. Static lists join
+        liste_contacts; dynamic lists evaluate their stored filter directly
+        against contacts, so nothing is written to liste_contacts for them.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(Contact)
+        if db_list.is_dynamic:
+            return apply_contact_filter(query, db_list.filter_criteria)
+        return (
+            query.join(liste_contacts, liste_contacts.c.id_contact == Contact.id_contact)
+            .filter(liste_contacts.c.id_liste == db_list.id_liste)
+        )
+
     def get_list(self, list_id: int) -> MailingList | None:
         return self.db.query(MailingList).filter(
             MailingList.id_liste == list_id,
@@ -22,8 +91,74 @@ class MailingListService:
     def get_all_lists(self, skip: int = 0, limit: int = 100) -> List[MailingList]:
         return self.db.query(MailingList).filter(MailingList.deleted_at.is_(None)).offset(skip).limit(limit).all()
 
+    def get_contact_counts(self, list_ids: List[int]) -> dict:
+        """
+        Returns {id_liste: member count} for the given static lists in one
+        aggregate query over liste_contacts, without loading any contact rows.
+        """
+        if not list_ids:
+            return {}
+        rows = (
+            self.db.query(liste_contacts.c.id_liste, func.count(liste_contacts.c.id_contact))
+            .filter(liste_contacts.c.id_liste.in_(list_ids))
+            .group_by(liste_contacts.c.id_liste)
+            .all()
+        )
+        return {list_id: count for list_id, count in rows}
+
+    def get_dynamic_list_count(self, db_list: MailingList) -> int:
+        """Counts the contacts matching a dynamic list's filter, cached with a TTL."""
+        cache_key = _count_cache_key(db_list.id_liste)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached
+        count = self.members_query(db_list, func.count(Contact.id_contact)).scalar()
+        cache_set(cache_key, count, ttl=self._cache_ttl(db_list))
+        return count
+
+    def _to_summary(self, db_list: MailingList, contact_count: int) -> dict:
+        return {
+            "id_liste": db_list.id_liste,
+            "id_campagne": db_list.id_campagne,
+            "nom_liste": db_list.nom_liste,
+            "description": db_list.description,
+            "filter_criteria": db_list.filter_criteria,
+            "is_dynamic": db_list.is_dynamic,
+            "created_at": db_list.created_at,
+            "contact_count": contact_count,
+        }
+
+    def _summaries(self, lists: List[MailingList]) -> List[dict]:
+        counts = self.get_contact_counts([l.id_liste for l in lists if not l.is_dynamic])
+        return [
+            self._to_summary(
+                l,
+                self.get_dynamic_list_count(l) if l.is_dynamic else counts.get(l.id_liste, 0)
+            )
+            for l in lists
+        ]
+
+    def get_list_summary(self, list_id: int) -> dict | None:
+        db_list = self.get_list(list_id)
+        if not db_list:
+            return None
+        return self._summaries([db_list])[0]
+
+    def get_all_list_summaries(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        return self._summaries(self.get_all_lists(skip=skip, limit=limit))
+
+    @staticmethod
+    def _filter_criteria(filter_data: dict) -> dict:
+        # An empty filter would make the list match every contact
+        criteria = {k: v for k, v in filter_data.items() if v is not None}
+        if not criteria:
+            raise HTTPException(status_code=422, detail="A dynamic list's filter needs at least one criterion.")
+        return criteria
+
     def create_list(self, list_data: MailingListCreate) -> MailingList:
         new_list = MailingList(**list_data.model_dump())
+        if list_data.filter_criteria is not None:
+            new_list.filter_criteria = self._filter_criteria(list_data.filter_criteria.model_dump())
         self.db.add(new_list)
         self.db.commit()
         self.db.refresh(new_list)
@@ -35,11 +170,19 @@ class MailingListService:
             return None
 
         update_data = list_data.model_dump(exclude_unset=True)
+        if "filter_criteria" in update_data:
+            if not db_list.is_dynamic:
+                raise HTTPException(status_code=400, detail="Only dynamic lists have a filter to update.")
+            if update_data["filter_criteria"] is None:
+                raise HTTPException(status_code=400, detail="A dynamic list's filter cannot be removed.")
+            update_data["filter_criteria"] = self._filter_criteria(update_data["filter_criteria"])
+
         for key, value in update_data.items():
             setattr(db_list, key, value)
 
         self.db.commit()
         self.db.refresh(db_list)
+        self._invalidate_statistics(list_id)
         return db_list
 
     def soft_delete_list(self, list_id: int) -> MailingList | None:
@@ -49,12 +192,14 @@ class MailingListService:
 
         db_list.deleted_at = datetime.now(timezone.utc)
         self.db.commit()
+        self._invalidate_statistics(list_id)
         return db_list
 
     def add_contacts_to_list(self, list_id: int, contact_ids: List[int]) -> dict | None:
         db_list = self.get_list(list_id)
         if not db_list:
             return None
+        self._reject_if_dynamic(db_list)
 
         # Validate that all provided contact IDs exist
         valid_contacts_query = self.db.query(Contact).filter(Contact.id_contact.in_(contact_ids))
@@ -72,7 +217,6 @@ class MailingListService:
             # For now, let's just not add them and the test should be updated.
             # Let's reconsider. The test expects an exception. So we should raise it.
             # The service layer can raise HTTPExceptions that the framework will catch.
-            from fastapi import HTTPException
             raise HTTPException(status_code=404, detail=f"Contacts not found: {list(invalid_ids)}")
 
 
@@ -93,21 +237,38 @@ class MailingListService:
             db_list.contacts.append(contact)
 
         self.db.commit()
+        self._invalidate_statistics(list_id)
         return {"success": True, "contacts_added": len(new_contacts)}
 
-    def get_list_contacts(self, list_id: int) -> List[Contact] | None:
+    def get_list_contacts(self, list_id: int, cursor: int | None = None, limit: int = 100) -> dict | None:
         """
-        Retrieves all contacts associated with a specific mailing list.
+        Retrieves one page of the contacts in a mailing list, ordered by id.
+        `cursor` is the last id_contact of the previous page; the returned
+        `next_cursor` is None once the last page has been reached.
         """
         db_list = self.get_list(list_id)
         if not db_list:
             return None
-        return db_list.contacts
+
+        query = self.members_query(db_list)
+        if cursor is not None:
+            query = query.filter(Contact.id_contact > cursor)
+
+        # Fetch one extra row to know whether another page exists
+        contacts = query.order_by(Contact.id_contact).limit(limit + 1).all()
+        has_more = len(contacts) > limit
+        contacts = contacts[:limit]
+
+        return {
+            "items": contacts,
+            "next_cursor": contacts[-1].id_contact if has_more else None,
+        }
 
     def remove_contacts_from_list(self, list_id: int, contact_ids: List[int]) -> dict | None:
         db_list = self.get_list(list_id)
         if not db_list:
             return None
+        self._reject_if_dynamic(db_list)
 
         initial_count = len(db_list.contacts)
         ids_to_remove = set(contact_ids)
@@ -116,44 +277,71 @@ class MailingListService:
         contacts_removed_count = initial_count - len(db_list.contacts)
 
         self.db.commit()
+        self._invalidate_statistics(list_id)
         return {"success": True, "contacts_removed": contacts_removed_count}
 
     def get_list_statistics(self, list_id: int) -> ListStatistics | None:
-        from collections import Counter
-
+        """
+        Computes membership statistics with a single GROUP BY over the list's
+        contacts. Results are cached per list and invalidated whenever the
+        membership changes; dynamic lists are re-evaluated once the shorter
+        DYNAMIC_LIST_CACHE_TTL expires.
+        """
         db_list = self.get_list(list_id)
         if not db_list:
             return None
 
-        contacts = db_list.contacts
-        total_contacts = len(contacts)
-
-        if total_contacts == 0:
-            return ListStatistics(
-                total_contacts=0,
-                opt_in_contacts=0,
-                opt_out_contacts=0,
-                segments={},
-                zones={},
-                contact_types={}
+        cache_key = _statistics_cache_key(list_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return ListStatistics.model_validate(cached)
+
+        rows = (
+            self.members_query(
+                db_list,
+                Contact.statut_opt_in,
+                Contact.segment,
+                Contact.zone_geographique,
+                Contact.type_client,
+                func.count(Contact.id_contact).label("contact_count"),
             )
+            .group_by(
+                Contact.statut_opt_in,
+                Contact.segment,
+                Contact.zone_geographique,
+                Contact.type_client,
+            )
+            .all()
+        )
 
-        opt_in_contacts = sum(1 for c in contacts if c.statut_opt_in)
-        opt_out_contacts = total_contacts - opt_in_contacts
-
-        # Calculate segment and zone distributions
-        segment_counts = Counter(c.segment for c in contacts if c.segment)
-        zone_counts = Counter(c.zone_geographique for c in contacts if c.zone_geographique)
-        type_counts = Counter(c.type_client for c in contacts if c.type_client)
-
-        return ListStatistics(
+        # Each row is one distinct (opt-in, segment, zone, type) combination,
+        # so rolling the distributions up here is cheap regardless of list size.
+        total_contacts = 0
+        opt_in_contacts = 0
+        segment_counts = Counter()
+        zone_counts = Counter()
+        type_counts = Counter()
+        for row in rows:
+            total_contacts += row.contact_count
+            if row.statut_opt_in:
+                opt_in_contacts += row.contact_count
+            if row.segment:
+                segment_counts[row.segment] += row.contact_count
+            if row.zone_geographique:
+                zone_counts[row.zone_geographique] += row.contact_count
+            if row.type_client:
+                type_counts[row.type_client] += row.contact_count
+
+        stats = ListStatistics(
             total_contacts=total_contacts,
             opt_in_contacts=opt_in_contacts,
-            opt_out_contacts=opt_out_contacts,
+            opt_out_contacts=total_contacts - opt_in_contacts,
             segments=dict(segment_counts),
             zones=dict(zone_counts),
             contact_types=dict(type_counts)
         )
+        cache_set(cache_key, stats.model_dump(), ttl=self._cache_ttl(db_list))
+        return stats
 
     def preview_campaign_for_list(self, list_id: int, message_template: str, sample_size: int) -> dict | None:
         db_list = self.get_list(list_id)
@@ -161,10 +349,11 @@ class MailingListService:
             return None
 
         # Filter for opt-in contacts only for the preview
-        opt_in_contacts = [c for c in db_list.contacts if c.statut_opt_in]
+        opt_in_query = self.members_query(db_list).filter(Contact.statut_opt_in == True)
 
         # Get a sample of contacts
-        sample_contacts = opt_in_contacts[:sample_size]
+        sample_contacts = opt_in_query.order_by(Contact.id_contact).limit(sample_size).all()
+        stats = self.get_list_statistics(list_id)
 
         previews = []
         for contact in sample_contacts:
@@ -178,7 +367,7 @@ class MailingListService:
         # The test expects a dict that can be parsed by PreviewResponse schema
         return {
             "previews": previews,
-            "total_contacts": len(opt_in_contacts),
+            "total_contacts": stats.opt_in_contacts,
             "estimated_cost": 0.0 # Placeholder for now
         }
 
@@ -201,14 +390,10 @@ class MailingListService:
         db_list = self.get_list(list_id)
         if not db_list:
             return None
-
-        # Start with a base query for contacts
-        query = self.db.query(Contact)
+        self._reject_if_dynamic(db_list)
 
         # Apply filters from the payload
-        filter_data = filters.model_dump(exclude_none=True)
-        for key, value in filter_data.items():
-            query = query.filter(getattr(Contact, key) == value)
+        query = apply_contact_filter(self.db.query(Contact), filters.model_dump(exclude_none=True))
 
         # Ensure we only add contacts who have opted in
         query = query.filter(Contact.statut_opt_in == True)
@@ -232,6 +417,7 @@ class MailingListService:
             db_list.contacts.append(contact)
 
         self.db.commit()
+        self._invalidate_statistics(list_id)
 
         return {"success": True, "contacts_added": len(new_contacts)}
 
@@ -239,12 +425,10 @@ class MailingListService:
         db_list = self.get_list(list_id)
         if not db_list:
             return None
+        self._reject_if_dynamic(db_list)
 
         # Find contacts to remove based on filters
-        query = self.db.query(Contact.id_contact) # Only select IDs
-        filter_data = filters.model_dump(exclude_none=True)
-        for key, value in filter_data.items():
-            query = query.filter(getattr(Contact, key) == value)
+        query = apply_contact_filter(self.db.query(Contact.id_contact), filters.model_dump(exclude_none=True)) # Only select IDs
 
         contact_ids_to_remove = {id_tuple[0] for id_tuple in query.all()}
 
@@ -259,6 +443,7 @@ class MailingListService:
         contacts_removed_count = initial_count - len(db_list.contacts)
 
         self.db.commit()
+        self._invalidate_statistics(list_id)
 
         return {"success": True, "contacts_removed": contacts_removed_count}
 
@@ -273,7 +458,8 @@ class MailingListService:
         new_list_data = MailingListCreate(
             nom_liste=f"Copy of {original_list.nom_liste}",
             description=original_list.description,
-            id_campagne=original_list.id_campagne
+            id_campagne=original_list.id_campagne,
+            filter_criteria=original_list.filter_criteria
         )
 
         return self.create_list(list_data=new_list_data)
@@ -1,8 +1,39 @@
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import zip_longest
+from typing import List, Optional
+from app.core.cache import cache_get, cache_get_many, cache_incr, cache_set
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from celery.result import AsyncResult
-from app.db.models import SMSQueue
+from app.db.models import Campaign, SMSQueue
+from app.utils.backoff import backoff_delay
+from sqlalchemy import exists, func
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
+MAX_SEND_ATTEMPTS = 3
+
+# Queue lanes, most urgent first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_LANES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_BULK)
+
+QUEUE_STATUSES = ('pending', 'processing', 'sent', 'failed')
+QUEUE_HEALTH_CACHE_KEY = "queue:health"
+# Messages sent per minute, maintained by the workers
+SENT_COUNTER_PREFIX = "queue:sent:"
+SEND_RATE_WINDOWS = (1, 5, 15)
+
+CAMPAIGN_TYPE_PRIORITIES = {
+    'informational': PRIORITY_HIGH,
+    'follow_up': PRIORITY_HIGH,
+    'promotional': PRIORITY_BULK,
+}
+
 class QueueService:
     @staticmethod
     def enqueue_sms_batch(campaign_id: int):
@@ -18,20 +49,286 @@ class QueueService:
         pass
 
     @staticmethod
-    def get_queue_status():
+    def priority_for_campaign_type(type_campagne: str) -> int:
+        return CAMPAIGN_TYPE_PRIORITIES.get(type_campagne, PRIORITY_NORMAL)
+
+    @staticmethod
+    def _lane_quotas(batch_size: int) -> dict:
         """
-        Gets statistics about the queue and workers.
-        Requires Celery monitoring to be enabled (e.g., using Flower).
+        Splits a batch across the priority lanes according to
+        SMS_PRIORITY_WEIGHTS (high, normal, bulk). Rounding leftovers go to
+        the most urgent lane.
         """
-        inspector = celery_app.control.inspect()
-        stats = inspector.stats()
-        active = inspector.active()
-        scheduled = inspector.scheduled()
-        return {
-            "stats": stats,
-            "active_tasks": active,
-            "scheduled_tasks": scheduled,
+        weights = dict(zip(PRIORITY_LANES, settings.SMS_PRIORITY_WEIGHTS))
+        total_weight = sum(weights.values()) or 1
+        quotas = {lane: batch_size * weight // total_weight for lane, weight in weights.items()}
+        quotas[PRIORITY_HIGH] += batch_size - sum(quotas.values())
+        return quotas
+
+    @staticmethod
+    def _due_items_query(db: Session, now: datetime):
+        return db.query(SMSQueue).filter(SMSQueue.status == 'pending', SMSQueue.scheduled_at <= now)
+
+    @staticmethod
+    def _campaigns_with_due_items(db: Session, now: datetime, lane: int) -> List[int]:
+        """
+        Returns the active campaigns that have due items in a lane. This
+        probes idx_sms_queue_campaign_pending once per active campaign
+        instead of scanning the whole backlog. Paused, completed and draft
+        campaigns are left out, so paused items stay pending until the
+        campaign is resumed; completed campaigns expire theirs
+        (expire_campaign_items).
+        """
+        due_item_exists = (
+            exists()
+            .where(
+                SMSQueue.campaign_id == Campaign.id_campagne,
+                SMSQueue.status == 'pending',
+                SMSQueue.priority == lane,
+                SMSQueue.scheduled_at <= now,
+            )
+        )
+        return [
+            row.id_campagne
+            for row in db.query(Campaign.id_campagne).filter(Campaign.statut == 'active', due_item_exists).all()
+        ]
+
+    @staticmethod
+    def _claim_lane(db: Session, now: datetime, lane: int, quota: int, claimed_ids: set, campaign_ids: List[int]) -> List[SMSQueue]:
+        """
+        Claims up to quota items from a lane, giving every campaign in
+        campaign_ids an equal share so that concurrent campaigns progress
+        together. Items are returned interleaved round-robin across campaigns.
+        Campaigns that could not fill their share have nothing left to claim
+        and are removed from campaign_ids, so later rounds skip them.
+        """
+        if not campaign_ids:
+            return []
+        # With more campaigns than slots, a random subset gets this batch
+        selected = random.sample(campaign_ids, min(quota, len(campaign_ids)))
+        share = max(1, quota // len(selected))
+
+        lane_query = QueueService._due_items_query(db, now).filter(SMSQueue.priority == lane)
+        if claimed_ids:
+            lane_query = lane_query.filter(SMSQueue.id.notin_(claimed_ids))
+        per_campaign = []
+        for campaign_id in selected:
+            campaign_items = (
+                lane_query
+                .filter(SMSQueue.campaign_id == campaign_id)
+                .order_by(SMSQueue.scheduled_at, SMSQueue.id)
+                .limit(share)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if len(campaign_items) < share:
+                campaign_ids.remove(campaign_id)
+            per_campaign.append(campaign_items)
+        return [item for round_ in zip_longest(*per_campaign) for item in round_ if item is not None]
+
+    @staticmethod
+    def claim_pending_items(db: Session, batch_size: int) -> List[SMSQueue]:
+        """
+        Claims up to batch_size pending items that are due (scheduled_at <= now)
+        and marks them 'processing'. Each priority lane is guaranteed its
+        weighted share of the batch, so time-sensitive messages are not stuck
+        behind a bulk send, and within a lane the share is split evenly across
+        campaigns. Capacity left unused is handed out again lane by lane, most
+        urgent first, with the same per-campaign split.
+        The campaigns with due items are looked up once per lane and call, and
+        dropped as they run out, so backfilling does not probe them again.
+        Rows locked by another worker are skipped, so concurrent workers never
+        claim the same item.
+        """
+        now = datetime.now(timezone.utc)
+        items = []
+        claimed_ids = set()
+        lane_campaigns = {lane: QueueService._campaigns_with_due_items(db, now, lane) for lane in PRIORITY_LANES}
+
+        def claim(lane: int, quota: int) -> int:
+            lane_items = QueueService._claim_lane(db, now, lane, quota, claimed_ids, lane_campaigns[lane])
+            items.extend(lane_items)
+            claimed_ids.update(item.id for item in lane_items)
+            return len(lane_items)
+
+        for lane, quota in QueueService._lane_quotas(batch_size).items():
+            if quota > 0:
+                claim(lane, quota)
+
+        for lane in PRIORITY_LANES:
+            while len(items) < batch_size and claim(lane, batch_size - len(items)):
+                pass
+
+        if not items:
+            return []
+
+        item_ids = [item.id for item in items]
+        db.query(SMSQueue).filter(SMSQueue.id.in_(item_ids)).update({"status": "processing"}, synchronize_session=False)
+        db.commit()
+        return items
+
+    @staticmethod
+    def release_items(db: Session, items: List[SMSQueue]) -> None:
+        """Returns claimed items to 'pending' without counting an attempt."""
+        item_ids = [item.id for item in items]
+        if item_ids:
+            db.query(SMSQueue).filter(SMSQueue.id.in_(item_ids)).update({"status": "pending"}, synchronize_session=False)
+            db.commit()
+
+    @staticmethod
+    def expire_campaign_items(db: Session, campaign_ids: List[int], now: datetime = None) -> int:
+        """
+        Marks the pending items of campaigns that have ended as failed, and
+        not retryable, since they are never claimed again. The caller commits,
+        together with the campaign status change.
+        Returns the number of items expired.
+        """
+        if not campaign_ids:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        return (
+            db.query(SMSQueue)
+            .filter(SMSQueue.campaign_id.in_(campaign_ids), SMSQueue.status == 'pending')
+            .update(
+                {
+                    "status": "failed",
+                    "retryable": False,
+                    "error_message": "Campaign completed before the message was sent",
+                    "processed_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+
+    @staticmethod
+    def record_send_failure(item: SMSQueue, error_message: str, transient: bool, now: datetime = None) -> None:
+        """
+        Records a failed send attempt. Transient failures go back to 'pending'
+        with scheduled_at pushed out by an exponential, jittered backoff;
+        permanent failures, and items out of attempts, are marked 'failed'.
+        Permanent failures are also flagged so the retry sweep leaves them
+        alone, as are items that already had the sweep's final attempt.
+        """
+        now = now or datetime.now(timezone.utc)
+        item.attempts = (item.attempts or 0) + 1
+        item.error_message = error_message
+        if transient and item.attempts < MAX_SEND_ATTEMPTS:
+            delay = backoff_delay(item.attempts, settings.SMS_RETRY_BASE_DELAY, settings.SMS_RETRY_MAX_DELAY)
+            item.status = 'pending'
+            item.scheduled_at = now + timedelta(seconds=delay)
+        else:
+            item.status = 'failed'
+            # requeue_failed_items clears the flag, so its final attempt is the last
+            item.retryable = transient and item.retryable is not False
+            item.processed_at = now
+
+    @staticmethod
+    def requeue_failed_items(db: Session, chunk_size: int, max_items: int) -> int:
+        """
+        Gives retryable failed items one final attempt, and only one: they are
+        marked not retryable, so later sweeps skip them if it fails too.
+        Items are walked in id order, chunk_size at a time with a commit per
+        chunk, and at most max_items are requeued per call. Their scheduled_at
+        is spread over SMS_RETRY_BASE_DELAY seconds so the sweep does not send
+        them all at once.
+        Returns the number of items requeued.
+        """
+        now = datetime.now(timezone.utc)
+        requeued = 0
+        last_id = 0
+        while requeued < max_items:
+            chunk = (
+                db.query(SMSQueue)
+                .filter(SMSQueue.status == 'failed', SMSQueue.retryable.is_(True), SMSQueue.id > last_id)
+                .order_by(SMSQueue.id)
+                .limit(min(chunk_size, max_items - requeued))
+                .all()
+            )
+            if not chunk:
+                break
+            for item in chunk:
+                item.status = 'pending'
+                item.attempts = MAX_SEND_ATTEMPTS - 1
+                item.retryable = False
+                item.scheduled_at = now + timedelta(seconds=random.uniform(0, settings.SMS_RETRY_BASE_DELAY))
+                item.error_message = f"Re-queued after failure at {now}"
+            db.commit()
+            requeued += len(chunk)
+            last_id = chunk[-1].id
+            logger.info(f"Re-queued {requeued} failed messages so far.")
+        return requeued
+
+    @staticmethod
+    def record_sent(count: int, now: datetime = None) -> None:
+        """Adds sent messages to the current minute's counter, from which send rates are read."""
+        if count <= 0:
+            return
+        minute = int((now or datetime.now(timezone.utc)).timestamp() // 60)
+        cache_incr(f"{SENT_COUNTER_PREFIX}{minute}", count, ttl=(max(SEND_RATE_WINDOWS) + 2) * 60)
+
+    @staticmethod
+    def _send_rates(now: datetime) -> dict:
+        """
+        Average messages sent per minute over the last 1, 5 and 15 complete
+        minutes. The current minute is left out as it is still filling up.
+        """
+        current = int(now.timestamp() // 60)
+        longest = max(SEND_RATE_WINDOWS)
+        counts = [count or 0 for count in cache_get_many(
+            [f"{SENT_COUNTER_PREFIX}{minute}" for minute in range(current - 1, current - longest - 1, -1)]
+        )]
+        return {f"{window}m": round(sum(counts[:window]) / window, 2) for window in SEND_RATE_WINDOWS}
+
+    @staticmethod
+    def get_queue_health(db: Session, now: Optional[datetime] = None) -> dict:
+        """
+        Backlog of the sms_queue table: items per status, pending and
+        processing items per campaign, how long the oldest due item has been
+        waiting past its scheduled time, and recent send rates. Every count
+        is answered from the (status, scheduled_at, id) index, and the result
+        is cached for QUEUE_HEALTH_CACHE_TTL seconds so dashboards and scrapes
+        can poll it freely.
+        """
+        cached = cache_get(QUEUE_HEALTH_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+        now = now or datetime.now(timezone.utc)
+        by_status = dict.fromkeys(QUEUE_STATUSES, 0)
+        by_status.update(db.query(SMSQueue.status, func.count(SMSQueue.id)).group_by(SMSQueue.status).all())
+
+        by_campaign = {}
+        rows = (
+            db.query(SMSQueue.campaign_id, SMSQueue.status, func.count(SMSQueue.id))
+            .filter(SMSQueue.status.in_(('pending', 'processing')))
+            .group_by(SMSQueue.campaign_id, SMSQueue.status)
+        )
+        for campaign_id, status, count in rows:
+            by_campaign.setdefault(campaign_id, {"campaign_id": campaign_id, "pending": 0, "processing": 0})[status] = count
+
+        oldest_due = QueueService._due_items_query(db, now).with_entities(func.min(SMSQueue.scheduled_at)).scalar()
+        if oldest_due is not None:
+            # Stored as UTC without a timezone
+            oldest_due = oldest_due.replace(tzinfo=oldest_due.tzinfo or timezone.utc)
+
+        health = {
+            "by_status": by_status,
+            "by_campaign": sorted(by_campaign.values(), key=lambda c: c["campaign_id"]),
+            "oldest_pending_age_seconds": max(0.0, (now - oldest_due).total_seconds()) if oldest_due else None,
+            "send_rate_per_minute": QueueService._send_rates(now),
+            "generated_at": now.isoformat(),
         }
+        cache_set(QUEUE_HEALTH_CACHE_KEY, health, settings.QUEUE_HEALTH_CACHE_TTL)
+        return health
+
+    @staticmethod
+    def get_queue_status(db: Session):
+        """
+        Gets the state of the SMS queue. Reads the database and the send
+        counters instead of broadcasting inspect() calls to every Celery
+        worker, which blocked each page load for the inspect timeout.
+        """
+        return QueueService.get_queue_health(db)
 
     @staticmethod
     def cancel_queued_jobs(task_id: str):
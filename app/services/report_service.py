@@ -1,23 +1,24 @@
 import io
 import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, select
 from app.db.models import CampaignReport, Campaign, Contact, Message
 
 def get_campaign_report(db: Session, campaign_id: int):
     return db.query(CampaignReport).filter(CampaignReport.id_campagne == campaign_id).first()
 
-def get_dashboard_stats(db: Session):
-    total_campaigns = db.query(func.count(Campaign.id_campagne)).scalar()
-    total_contacts = db.query(func.count(Contact.id_contact)).scalar()
+async def get_dashboard_stats(db: AsyncSession):
+    total_campaigns = (await db.execute(select(func.count(Campaign.id_campagne)))).scalar()
+    total_contacts = (await db.execute(select(func.count(Contact.id_contact)))).scalar()
 
     # Query message stats directly for real-time data
-    message_stats = db.query(
+    message_stats = (await db.execute(select(
         func.count(Message.id_message).label("total_sms_sent"),
         func.sum(Message.cost).label("total_cost"),
         func.sum(case((Message.statut_livraison == 'delivered', 1), else_=0)).label("delivered_count"),
         func.sum(case((Message.statut_livraison == 'failed', 1), else_=0)).label("failed_count")
-    ).one()
+    ))).one()
 
     total_sms_sent = message_stats.total_sms_sent or 0
     total_cost = message_stats.total_cost or 0
@@ -57,18 +58,17 @@ def export_campaign_report(db: Session, campaign_id: int, format: str):
     return None
 
 
-def get_campaign_status(db: Session, campaign_id: int) -> dict:
+async def get_campaign_status(db: AsyncSession, campaign_id: int) -> dict:
     """
     Calculates the real-time counts of messages in each status for a given campaign.
     """
-    status_counts = db.query(
+    status_counts = (await db.execute(select(
         func.count(Message.id_message).label("total_messages"),
         func.sum(case((Message.statut_livraison == 'sent', 1), else_=0)).label("sent"),
         func.sum(case((Message.statut_livraison == 'delivered', 1), else_=0)).label("delivered"),
         func.sum(case((Message.statut_livraison == 'failed', 1), else_=0)).label("failed"),
         func.sum(case((Message.statut_livraison == 'pending', 1), else_=0)).label("pending")
-    ).filter(Message.id_campagne == campaign_id).one()
+    ).where(Message.id_campagne == campaign_id))).one()
 
-    # The result of the query is a Row object, which can be converted to a dict
-    # or handled as a named tuple. Pydantic can handle it directly.
-    return status_counts
+    # SUM over no rows is NULL
+    return {key: value or 0 for key, value in status_counts._mapping.items()}
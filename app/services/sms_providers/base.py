@@ -1,12 +1,49 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Union
+from app.core.config import settings
+from app.services.sms_providers.circuit_breaker import CircuitBreaker, OPEN
+
+
+class SmsProviderError(Exception):
+    """
+    Base exception for failed provider calls. `transient` tells whether the
+    same message may succeed later or through another provider.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None, code: Optional[int] = None, transient: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.transient = transient
+
+
+class SendSkipped(Exception):
+    """Returned by send_batch for a message that its `skip` check held back."""
+    pass
+
 
 class BaseSmsProvider(ABC):
     """
     Abstract base class for an SMS provider.
     Defines the interface that all concrete SMS provider implementations must follow.
+
+    Providers may set `circuit_breaker`; send_sms should then go through it
+    and raise CircuitOpenError while the provider is considered down.
     """
 
+    circuit_breaker: Optional[CircuitBreaker] = None
+    # The number or alphanumeric id messages are sent from
+    sender_id: Optional[str] = None
+
+    def circuit_state(self) -> Optional[str]:
+        """The state of the provider's circuit breaker, or None if it has none."""
+        return self.circuit_breaker.state() if self.circuit_breaker else None
+
+    def is_available(self) -> bool:
+        """False while the provider's circuit is open; workers should not claim work then."""
+        return self.circuit_state() != OPEN
+
     @abstractmethod
     def send_sms(
         self, to_number: str, message: str, callback_url: str
@@ -25,6 +62,40 @@ class BaseSmsProvider(ABC):
         """
         pass
 
+    def send_batch(
+        self, messages: List[Dict[str, str]], callback_url: str,
+        skip: Optional[Callable[[int], bool]] = None,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Sends several messages in one go. Providers with a bulk submission
+        API should override this; the default sends them one by one on up to
+        SMS_SEND_CONCURRENCY threads.
+
+        Args:
+            messages: Dictionaries with the recipient's `to_number` and the
+                `message` text.
+            callback_url: The URL for the provider to send status updates to.
+            skip: Called with a message's index right before it is sent; a
+                true result holds that message back.
+
+        Returns:
+            One entry per message, in order: the send_sms response, the
+            exception raised for that message, or SendSkipped.
+        """
+        def send(index: int) -> Union[Dict[str, Any], Exception]:
+            if skip is not None and skip(index):
+                return SendSkipped()
+            outbound = messages[index]
+            try:
+                return self.send_sms(outbound["to_number"], outbound["message"], callback_url)
+            except Exception as e:
+                return e
+
+        if len(messages) <= 1:
+            return [send(index) for index in range(len(messages))]
+        with ThreadPoolExecutor(max_workers=min(len(messages), settings.SMS_SEND_CONCURRENCY)) as executor:
+            return list(executor.map(send, range(len(messages))))
+
     @abstractmethod
     def get_delivery_status(self, message_sid: str) -> Dict[str, Any]:
         """
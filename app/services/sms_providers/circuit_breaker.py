@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import redis
+
+from app.core.cache import get_redis_client, local_cache, _reset_redis_client
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# How long a tripped breaker waits in half-open for a probe before giving up
+# on the probe and closing on its own
+HALF_OPEN_MAX_SECONDS = 24 * 60 * 60
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while its circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker whose state lives in Redis so that every worker sees
+    the same state. If Redis is not reachable the state is kept per process.
+
+    closed:    calls go through. Failures and slow calls are counted over a
+               window; once there are at least `min_calls` calls and the
+               failure ratio reaches `failure_rate`, the breaker opens.
+    open:      calls are rejected for `open_seconds`.
+    half_open: a single caller fleet-wide gets to probe the provider. Success
+               closes the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        min_calls: int,
+        window_seconds: int,
+        slow_call_seconds: float,
+        open_seconds: float,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+
+    def _key(self, suffix: str) -> str:
+        return f"circuit:{self.name}:{suffix}"
+
+    def _window_keys(self):
+        bucket = int(time.time() // self.window_seconds)
+        return self._key(f"calls:{bucket}"), self._key(f"failures:{bucket}")
+
+    # --- storage, Redis first with an in-process fallback ---
+
+    def _run(self, redis_op: Callable[[redis.Redis], Any], local_op: Callable[[], Any]) -> Any:
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return redis_op(client)
+            except redis.RedisError as e:
+                logger.warning(f"Redis unavailable for circuit '{self.name}', using local state: {e}")
+                _reset_redis_client()
+        with self._lock:
+            return local_op()
+
+    def _exists(self, key: str) -> bool:
+        return self._run(lambda r: bool(r.exists(key)), lambda: local_cache.get(key) is not None)
+
+    def _set(self, key: str, ttl: float, nx: bool = False) -> bool:
+        def local_set():
+            if nx and local_cache.get(key) is not None:
+                return False
+            local_cache.set(key, 1, ttl)
+            return True
+        return self._run(lambda r: bool(r.set(key, 1, px=int(ttl * 1000), nx=nx)), local_set)
+
+    def _delete(self, *keys: str) -> None:
+        def local_delete():
+            for key in keys:
+                local_cache.delete(key)
+        self._run(lambda r: r.delete(*keys), local_delete)
+
+    def _count(self, failed: bool) -> tuple:
+        calls_key, failures_key = self._window_keys()
+        ttl = self.window_seconds * 2
+
+        def redis_count(r):
+            pipe = r.pipeline()
+            pipe.incr(calls_key)
+            pipe.expire(calls_key, ttl)
+            if failed:
+                pipe.incr(failures_key)
+                pipe.expire(failures_key, ttl)
+            else:
+                pipe.get(failures_key)
+            results = pipe.execute()
+            return results[0], int(results[2] or 0)
+
+        def local_count():
+            calls = (local_cache.get(calls_key) or 0) + 1
+            failures = (local_cache.get(failures_key) or 0) + int(failed)
+            local_cache.set(calls_key, calls, ttl)
+            local_cache.set(failures_key, failures, ttl)
+            return calls, failures
+
+        return self._run(redis_count, local_count)
+
+    # --- state machine ---
+
+    def state(self) -> str:
+        if self._exists(self._key("open")):
+            return OPEN
+        if self._exists(self._key("tripped")):
+            return HALF_OPEN
+        return CLOSED
+
+    def allow_request(self) -> bool:
+        """Whether the caller may call the provider now. In half-open only one caller wins the probe."""
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            return self._set(self._key("probe"), self.open_seconds, nx=True)
+        return False
+
+    def trip(self) -> None:
+        logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds}s.")
+        self._set(self._key("open"), self.open_seconds)
+        self._set(self._key("tripped"), HALF_OPEN_MAX_SECONDS)
+        self._delete(self._key("probe"), *self._window_keys())
+
+    def reset(self) -> None:
+        self._delete(self._key("open"), self._key("tripped"), self._key("probe"), *self._window_keys())
+
+    def record_success(self, duration: float) -> None:
+        if self.state() == HALF_OPEN:
+            logger.info(f"Circuit '{self.name}' probe succeeded, closing.")
+            self.reset()
+            return
+        self._record(failed=duration > self.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        if self.state() == HALF_OPEN:
+            self.trip()
+            return
+        self._record(failed=True)
+
+    def _record(self, failed: bool) -> None:
+        calls, failures = self._count(failed)
+        if calls >= self.min_calls and failures / calls >= self.failure_rate:
+            self.trip()
+
+    def call(self, func: Callable[..., Any], *args, is_failure: Optional[Callable[[Exception], bool]] = None, **kwargs) -> Any:
+        """
+        Calls func through the breaker. Exceptions are re-raised; they count
+        as failures unless is_failure says otherwise (e.g. an invalid number
+        says nothing about the provider's health).
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open.")
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - started)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
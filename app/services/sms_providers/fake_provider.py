@@ -0,0 +1,55 @@
+import itertools
+import threading
+from typing import Dict, Any, List, Optional
+
+from app.services.sms_providers.base import BaseSmsProvider, SmsProviderError
+from app.services.sms_providers.circuit_breaker import CircuitBreaker
+
+
+class FakeSmsProvider(BaseSmsProvider):
+    """
+    An in-memory provider for tests and local development. Messages never
+    leave the process; they are recorded in `sent`. Setting `fail_with`
+    makes every send raise that error.
+    """
+
+    def __init__(
+        self,
+        sender_id: str = "+15005550006",
+        fail_with: Optional[SmsProviderError] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.sender_id = sender_id
+        self.fail_with = fail_with
+        self.circuit_breaker = circuit_breaker
+        self.sent: List[Dict[str, Any]] = []
+        self._sids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send_sms(
+        self, to_number: str, message: str, callback_url: str
+    ) -> Dict[str, Any]:
+        if self.circuit_breaker:
+            return self.circuit_breaker.call(
+                self._send_sms, to_number, message, callback_url,
+                is_failure=lambda e: getattr(e, "transient", True),
+            )
+        return self._send_sms(to_number, message, callback_url)
+
+    def _send_sms(self, to_number: str, message: str, callback_url: str) -> Dict[str, Any]:
+        if self.fail_with:
+            raise self.fail_with
+        with self._lock:
+            sid = f"FAKE{next(self._sids):030d}"
+            self.sent.append({"sid": sid, "to": to_number, "body": message, "callback_url": callback_url})
+        return {"sid": sid, "status": "queued"}
+
+    def get_delivery_status(self, message_sid: str) -> Dict[str, Any]:
+        return {
+            "sid": message_sid,
+            "status": "delivered",
+            "cost": None,
+            "price_unit": None,
+            "error_code": None,
+            "error_message": None,
+        }
@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import SMS_SEND_DURATION, SMS_SENT
+from app.services.sms_providers.base import BaseSmsProvider, SmsProviderError
+from app.services.sms_providers.circuit_breaker import CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+from app.services.sms_providers.fake_provider import FakeSmsProvider
+from app.services.sms_providers.simulated_provider import SimulatedSmsProvider
+from app.services.sms_providers.twilio_provider import TwilioProvider
+
+logger = logging.getLogger(__name__)
+
+# Provider name -> zero-argument factory. Names are what SMS_PROVIDERS refers to.
+PROVIDER_FACTORIES: Dict[str, Callable[[], BaseSmsProvider]] = {
+    "twilio": TwilioProvider,
+    "fake": FakeSmsProvider,
+    "simulated": SimulatedSmsProvider.from_settings,
+}
+
+# Weight given to the latest outcome in a route's success rate
+SUCCESS_RATE_SMOOTHING = 0.1
+# Floor so a struggling route is penalised rather than dropped for good
+MIN_SUCCESS_RATE = 0.05
+
+
+def register_provider(name: str, factory: Callable[[], BaseSmsProvider]) -> None:
+    PROVIDER_FACTORIES[name] = factory
+
+
+def _digits(number: str) -> str:
+    return number.lstrip("+")
+
+
+class ProviderRoute:
+    """
+    A provider together with its routing rules: the destination prefixes it
+    serves (all if empty), a per-prefix cost table, and an optional send rate
+    limit. It also keeps a smoothed success rate of recent sends.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        provider: BaseSmsProvider,
+        prefixes: Optional[List[str]] = None,
+        costs: Optional[Dict[str, float]] = None,
+        default_cost: float = 0.0,
+        max_per_second: Optional[int] = None,
+    ):
+        self.name = name
+        self.provider = provider
+        self.prefixes = [_digits(p) for p in prefixes or []]
+        self.costs = {_digits(p): cost for p, cost in (costs or {}).items()}
+        self.default_cost = default_cost
+        self.max_per_second = max_per_second
+        self.success_rate = 1.0
+        self._second = 0
+        self._sent_this_second = 0
+        self._lock = threading.Lock()
+
+    def covers(self, to_number: str) -> bool:
+        number = _digits(to_number)
+        return not self.prefixes or any(number.startswith(p) for p in self.prefixes)
+
+    def cost_for(self, to_number: str) -> float:
+        """Cost from the longest matching prefix in the cost table."""
+        number = _digits(to_number)
+        matches = [p for p in self.costs if number.startswith(p)]
+        return self.costs[max(matches, key=len)] if matches else self.default_cost
+
+    def has_headroom(self) -> bool:
+        if self.max_per_second is None:
+            return True
+        with self._lock:
+            return self._second != int(time.time()) or self._sent_this_second < self.max_per_second
+
+    def record_attempt(self) -> None:
+        with self._lock:
+            second = int(time.time())
+            if second != self._second:
+                self._second, self._sent_this_second = second, 0
+            self._sent_this_second += 1
+
+    def record_result(self, success: bool) -> None:
+        with self._lock:
+            self.success_rate += SUCCESS_RATE_SMOOTHING * (float(success) - self.success_rate)
+
+    def score(self, to_number: str) -> float:
+        """Expected cost per delivered message; lower is better."""
+        return self.cost_for(to_number) / max(self.success_rate, MIN_SUCCESS_RATE)
+
+
+class SmsRouter(BaseSmsProvider):
+    """
+    Sends each message through the best of several providers. Routes that
+    serve the destination and whose circuit is not open are tried cheapest
+    first (cost per delivered message), with routes out of rate-limit
+    headroom last. Transient errors and open circuits fail over to the next
+    route; permanent errors (e.g. an invalid number) are raised right away.
+    """
+
+    def __init__(self, routes: List[ProviderRoute]):
+        if not routes:
+            raise ValueError("SmsRouter needs at least one provider route.")
+        self.routes = routes
+
+    @property
+    def sender_id(self) -> Optional[str]:
+        return self.routes[0].provider.sender_id
+
+    def circuit_state(self) -> Optional[str]:
+        """OPEN only when every provider is open; CLOSED as soon as one can take traffic."""
+        states = [route.provider.circuit_state() for route in self.routes]
+        if all(state is None for state in states):
+            return None
+        if any(state in (None, CLOSED) for state in states):
+            return CLOSED
+        return HALF_OPEN if HALF_OPEN in states else OPEN
+
+    def candidates(self, to_number: str) -> List[ProviderRoute]:
+        routes = [
+            route for route in self.routes
+            if route.covers(to_number) and route.provider.circuit_state() != OPEN
+        ]
+        return sorted(routes, key=lambda route: (not route.has_headroom(), route.score(to_number)))
+
+    def send_sms(
+        self, to_number: str, message: str, callback_url: str
+    ) -> Dict[str, Any]:
+        if not any(route.covers(to_number) for route in self.routes):
+            raise SmsProviderError(f"No SMS provider serves {to_number}.", transient=False)
+
+        last_error: Optional[Exception] = None
+        for route in self.candidates(to_number):
+            route.record_attempt()
+            started = time.perf_counter()
+            try:
+                response = route.provider.send_sms(to_number=to_number, message=message, callback_url=callback_url)
+            except CircuitOpenError as e:
+                SMS_SENT.labels(route.name, "circuit_open").inc()
+                last_error = e
+                continue
+            except SmsProviderError as e:
+                SMS_SEND_DURATION.labels(route.name).observe(time.perf_counter() - started)
+                SMS_SENT.labels(route.name, "transient_error" if e.transient else "permanent_error").inc()
+                if not e.transient:
+                    raise
+                route.record_result(False)
+                logger.warning(f"Provider '{route.name}' failed for {to_number}, failing over: {e}")
+                last_error = e
+                continue
+            SMS_SEND_DURATION.labels(route.name).observe(time.perf_counter() - started)
+            SMS_SENT.labels(route.name, "sent").inc()
+            route.record_result(True)
+            return {**response, "provider": route.name, "sender_id": route.provider.sender_id}
+
+        if isinstance(last_error, SmsProviderError):
+            raise last_error
+        raise CircuitOpenError(f"No SMS provider is available for {to_number}.")
+
+    def get_delivery_status(self, message_sid: str, provider_name: Optional[str] = None) -> Dict[str, Any]:
+        """Asks the named provider, or the first configured one, for a message's status."""
+        route = next((r for r in self.routes if r.name == provider_name), self.routes[0])
+        return route.provider.get_delivery_status(message_sid)
+
+
+_router: Optional[SmsRouter] = None
+_router_pid: Optional[int] = None
+_router_lock = threading.Lock()
+
+
+def get_sms_router() -> SmsRouter:
+    """
+    Returns the process-wide router, building it on first use (and again in
+    a forked child). Reusing it keeps provider clients, their connection
+    pools and the routes' success rates alive across batches.
+    """
+    global _router, _router_pid
+    if _router is None or _router_pid != os.getpid():
+        with _router_lock:
+            if _router is None or _router_pid != os.getpid():
+                _router, _router_pid = build_sms_router(), os.getpid()
+    return _router
+
+
+def build_sms_router() -> SmsRouter:
+    """Builds the router from the SMS_PROVIDERS setting."""
+    routes = []
+    for name, options in settings.SMS_PROVIDERS.items():
+        factory = PROVIDER_FACTORIES.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown SMS provider '{name}' in SMS_PROVIDERS.")
+        routes.append(ProviderRoute(
+            name,
+            factory(),
+            prefixes=options.get("prefixes"),
+            costs=options.get("costs"),
+            default_cost=options.get("default_cost", 0.0),
+            max_per_second=options.get("max_per_second"),
+        ))
+    return SmsRouter(routes)
@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import httpx
+from twilio.request_validator import RequestValidator
+
+from app.core.config import settings
+from app.services.sms_providers.base import BaseSmsProvider, SmsProviderError
+
+logger = logging.getLogger(__name__)
+
+
+class _CallbackDispatcher:
+    """
+    Posts Twilio-style status callbacks once their due time has passed.
+    A single thread waits on a heap of due times and hands posts to a small
+    pool, so thousands of pending callbacks cost no extra threads.
+    """
+
+    def __init__(self, concurrency: int, timeout: float, auth_token: str):
+        self._validator = RequestValidator(auth_token)
+        self._heap = []
+        self._outstanding = 0
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sms-sim-callback")
+        self._client = httpx.Client(timeout=timeout)
+        self._thread = threading.Thread(target=self._run, name="sms-sim-dispatcher", daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay: float, url: str, data: Dict[str, str]) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._order), url, data))
+            self._outstanding += 1
+            self._condition.notify()
+
+    def pending(self) -> int:
+        """Callbacks scheduled but not yet fully posted."""
+        with self._condition:
+            return self._outstanding
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                _, _, url, data = heapq.heappop(self._heap)
+            self._executor.submit(self._post, url, data)
+
+    def _post(self, url: str, data: Dict[str, str]) -> None:
+        # Signed as Twilio signs its callbacks, so the webhook accepts them
+        headers = {"X-Twilio-Signature": self._validator.compute_signature(url, data)}
+        try:
+            self._client.post(url, data=data, headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Simulated status callback to {url} failed: {e}")
+        finally:
+            with self._condition:
+                self._outstanding -= 1
+
+
+class SimulatedSmsProvider(BaseSmsProvider):
+    """
+    A stand-in for Twilio for load testing the send pipeline. Nothing is
+    sent; instead each call:
+
+    - sleeps for a log-normally distributed latency (median `latency_ms`,
+      spread `latency_sigma`; 0 gives a constant latency),
+    - answers HTTP 429 once more than `max_per_second` sends arrive in a
+      second, and otherwise fails at `error_rate` (transient, 500) or
+      `permanent_error_rate` (invalid number),
+    - posts a status callback to `callback_url` after `callback_delay_ms`:
+      'delivered' for `delivery_rate` of messages, 'undelivered' otherwise,
+      signed with `auth_token` (TWILIO_AUTH_TOKEN by default) as Twilio
+      signs its callbacks.
+
+    The outcome of a message depends only on its SID, so get_delivery_status
+    agrees with the callback. SIDs come from the same generator as errors,
+    so with `seed` a run that sends in the same order gets the same SIDs,
+    errors and outcomes. Concurrent sends draw in the order they arrive.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        permanent_error_rate: float = 0.0,
+        max_per_second: Optional[int] = None,
+        delivery_rate: float = 0.95,
+        callback_delay_ms: float = 500.0,
+        callbacks_enabled: bool = True,
+        callback_concurrency: int = 8,
+        sender_id: str = "+15005550006",
+        auth_token: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.permanent_error_rate = permanent_error_rate
+        self.max_per_second = max_per_second
+        self.delivery_rate = delivery_rate
+        self.callback_delay_ms = callback_delay_ms
+        self.sender_id = sender_id
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._second = 0
+        self._sent_this_second = 0
+        self._dispatcher = _CallbackDispatcher(
+            callback_concurrency, timeout=5.0, auth_token=auth_token or settings.TWILIO_AUTH_TOKEN,
+        ) if callbacks_enabled else None
+
+    @classmethod
+    def from_settings(cls) -> "SimulatedSmsProvider":
+        return cls(**settings.SMS_SIMULATOR)
+
+    def _latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            return self._rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
+
+    def _throttled(self) -> bool:
+        if self.max_per_second is None:
+            return False
+        with self._lock:
+            second = int(time.time())
+            if second != self._second:
+                self._second, self._sent_this_second = second, 0
+            self._sent_this_second += 1
+            return self._sent_this_second > self.max_per_second
+
+    def _final_status(self, message_sid: str) -> str:
+        return "delivered" if random.Random(message_sid).random() < self.delivery_rate else "undelivered"
+
+    def send_sms(
+        self, to_number: str, message: str, callback_url: str
+    ) -> Dict[str, Any]:
+        time.sleep(self._latency())
+        if self._throttled():
+            raise SmsProviderError("Simulated provider: too many requests.", status=429, code=20429)
+        with self._lock:
+            roll = self._rng.random()
+            message_sid = f"SM{self._rng.getrandbits(128):032x}"
+        if roll < self.error_rate:
+            raise SmsProviderError("Simulated provider: internal server error.", status=500, code=20500)
+        if roll < self.error_rate + self.permanent_error_rate:
+            raise SmsProviderError(f"Simulated provider: invalid 'To' number {to_number}.", status=400, code=21211, transient=False)
+
+        if self._dispatcher and callback_url:
+            status = self._final_status(message_sid)
+            data = {"MessageSid": message_sid, "MessageStatus": status, "To": to_number, "From": self.sender_id}
+            if status == "undelivered":
+                data.update({"ErrorCode": "30003", "ErrorMessage": "Unreachable destination handset"})
+            self._dispatcher.schedule(self.callback_delay_ms / 1000, callback_url, data)
+        return {"sid": message_sid, "status": "queued"}
+
+    def get_delivery_status(self, message_sid: str) -> Dict[str, Any]:
+        status = self._final_status(message_sid)
+        return {
+            "sid": message_sid,
+            "status": status,
+            "cost": None,
+            "price_unit": None,
+            "error_code": 30003 if status == "undelivered" else None,
+            "error_message": "Unreachable destination handset" if status == "undelivered" else None,
+        }
+
+    def pending_callbacks(self) -> int:
+        """Number of status callbacks not yet posted; lets a load test wait for them."""
+        return self._dispatcher.pending() if self._dispatcher else 0
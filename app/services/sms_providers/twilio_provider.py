@@ -1,21 +1,126 @@
 import logging
-from typing import Dict, Any
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response
 from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
+from twilio.base.exceptions import TwilioException, TwilioRestException
 
 from app.core.config import settings
-from app.services.sms_providers.base import BaseSmsProvider
+from app.services.sms_providers.base import BaseSmsProvider, SmsProviderError
+from app.services.sms_providers.circuit_breaker import CircuitBreaker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class TwilioApiError(Exception):
+# Twilio error codes worth retrying: rate limits and outages of Twilio's
+# API. Anything else (invalid or unsubscribed numbers, permission and
+# content errors) fails the same way on every attempt.
+TRANSIENT_ERROR_CODES = frozenset({
+    20429,  # Too many requests
+    20500,  # Internal server error
+    20503,  # Service unavailable
+})
+
+
+def is_transient_error(status: Optional[int], code: Optional[int]) -> bool:
+    """
+    Tells whether a failed Twilio request may succeed if retried later.
+    Known codes win; otherwise HTTP 429 and 5xx are transient and other
+    4xx responses are permanent.
+    """
+    if code in TRANSIENT_ERROR_CODES:
+        return True
+    if status is None:
+        return True
+    return status == 429 or status >= 500
+
+
+class TwilioApiError(SmsProviderError):
     """Custom exception for Twilio API errors."""
     pass
 
 
+class SharedTwilioHttpClient(TwilioHttpClient):
+    """
+    A TwilioHttpClient that several threads can use at once. The stock
+    request() stores each response on the client and returns it from there,
+    so concurrent sends could get each other's response (and message SID).
+    This one keeps the response local; the requests Session and its
+    connection pool are thread-safe and stay shared.
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, object]] = None,
+        data: Optional[Dict[str, object]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = False,
+    ) -> Response:
+        if timeout is None:
+            timeout = self.timeout
+        elif timeout <= 0:
+            raise ValueError(timeout)
+
+        kwargs = {
+            "method": method.upper(),
+            "url": url,
+            "params": params,
+            "headers": headers,
+            "auth": auth,
+            "hooks": self.request_hooks,
+        }
+        if headers and headers.get("Content-Type") in ("application/json", "application/scim+json"):
+            kwargs["json"] = data
+        else:
+            kwargs["data"] = data
+        self.log_request(kwargs)
+
+        prepped_request = self.session.prepare_request(requests.Request(**kwargs))
+        environment = self.session.merge_environment_settings(prepped_request.url, self.proxy, None, None, None)
+        response = self.session.send(prepped_request, allow_redirects=allow_redirects, timeout=timeout, **environment)
+        self.log_response(response.status_code, response)
+        return Response(int(response.status_code), response.text, response.headers)
+
+
+_http_client: Optional[SharedTwilioHttpClient] = None
+_http_client_pid: Optional[int] = None
+_http_client_lock = threading.Lock()
+
+
+def get_twilio_http_client() -> SharedTwilioHttpClient:
+    """
+    Returns the process-wide HTTP client for Twilio. Its keep-alive
+    connection pool is shared by every TwilioProvider and task in the
+    process, so connections (and their TLS handshakes) are reused across
+    batches. A forked worker builds its own client rather than sharing the
+    parent's sockets.
+    """
+    global _http_client, _http_client_pid
+
+    if _http_client is not None and _http_client_pid == os.getpid():
+        return _http_client
+    with _http_client_lock:
+        if _http_client is None or _http_client_pid != os.getpid():
+            http_client = SharedTwilioHttpClient(timeout=settings.TWILIO_HTTP_TIMEOUT)
+            # One host, so one pool sized for the parallel sends of a batch
+            http_client.session.mount("https://", HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.TWILIO_HTTP_POOL_SIZE or settings.SMS_SEND_CONCURRENCY,
+            ))
+            _http_client, _http_client_pid = http_client, os.getpid()
+    return _http_client
+
+
 class TwilioProvider(BaseSmsProvider):
     """
     A concrete implementation of BaseSmsProvider for sending SMS via Twilio.
@@ -26,8 +131,20 @@ class TwilioProvider(BaseSmsProvider):
             if not all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, settings.TWILIO_PHONE_NUMBER]):
                 raise ValueError("Twilio credentials are not fully configured in settings.")
 
-            self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+            self.client = Client(
+                settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN,
+                http_client=get_twilio_http_client(),
+            )
             self.twilio_phone_number = settings.TWILIO_PHONE_NUMBER
+            self.sender_id = self.twilio_phone_number
+            self.circuit_breaker = CircuitBreaker(
+                "twilio",
+                failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+                min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                window_seconds=settings.CIRCUIT_BREAKER_WINDOW_SECONDS,
+                slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            )
             logger.info("TwilioProvider initialized successfully.")
         except ValueError as e:
             logger.error(f"Error initializing TwilioProvider: {e}")
@@ -37,8 +154,16 @@ class TwilioProvider(BaseSmsProvider):
         self, to_number: str, message: str, callback_url: str
     ) -> Dict[str, Any]:
         """
-        Sends an SMS message using the Twilio API.
+        Sends an SMS message using the Twilio API. Raises CircuitOpenError
+        without calling Twilio while the circuit is open; permanent errors
+        such as invalid numbers do not count against the circuit.
         """
+        return self.circuit_breaker.call(
+            self._send_sms, to_number, message, callback_url,
+            is_failure=lambda e: getattr(e, "transient", True),
+        )
+
+    def _send_sms(self, to_number: str, message: str, callback_url: str) -> Dict[str, Any]:
         logger.info(f"Attempting to send SMS to {to_number} via Twilio.")
         try:
             message_instance = self.client.messages.create(
@@ -54,7 +179,21 @@ class TwilioProvider(BaseSmsProvider):
             }
         except TwilioRestException as e:
             logger.error(f"Twilio API error while sending SMS to {to_number}: {e}")
-            raise TwilioApiError(f"Failed to send SMS via Twilio. Reason: {e}")
+            raise TwilioApiError(
+                f"Failed to send SMS via Twilio. Reason: {e}",
+                status=e.status,
+                code=e.code,
+                transient=is_transient_error(e.status, e.code),
+            )
+        except requests.ConnectionError as e:
+            # Includes connect timeouts: the request never reached Twilio's API
+            logger.error(f"Could not reach Twilio while sending SMS to {to_number}: {e}")
+            raise TwilioApiError(f"Failed to send SMS via Twilio. Reason: {e}", transient=True)
+        except (TwilioException, requests.RequestException) as e:
+            # Read timeouts and broken responses: Twilio may have accepted the
+            # message, so sending it again could deliver it twice
+            logger.error(f"Outcome unknown for SMS to {to_number} via Twilio: {e}")
+            raise TwilioApiError(f"Failed to send SMS via Twilio, outcome unknown. Reason: {e}", transient=False)
 
     def get_delivery_status(self, message_sid: str) -> Dict[str, Any]:
         """
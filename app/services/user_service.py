@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.db.models import Agent
 from app.api.v1.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, invalidate_principal
 from app.services.audit_service import AuditService
 
 def create_user(db: Session, user: UserCreate, current_admin: Agent):
@@ -28,6 +28,7 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
 def update_user(db: Session, user_id: int, user: UserUpdate):
     db_user = get_user(db, user_id)
     if db_user:
+        previous_identifiant = db_user.identifiant
         update_data = user.model_dump(exclude_unset=True)
         if "password" in update_data:
             update_data["mot_de_passe"] = get_password_hash(update_data.pop("password"))
@@ -37,6 +38,7 @@ def update_user(db: Session, user_id: int, user: UserUpdate):
 
         db.commit()
         db.refresh(db_user)
+        invalidate_principal(previous_identifiant, db_user.identifiant)
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -44,4 +46,5 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        invalidate_principal(db_user.identifiant)
     return db_user
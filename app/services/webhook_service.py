@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session
+from urllib.parse import parse_qsl
+from sqlalchemy import select
+from starlette.datastructures import ImmutableMultiDict
+from sqlalchemy.ext.asyncio import AsyncSession
 from twilio.request_validator import RequestValidator
 from fastapi import Request, HTTPException
 
@@ -6,7 +9,7 @@ from app.core.config import settings
 from app.db.models import Message
 
 class WebhookService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.validator = RequestValidator(settings.TWILIO_AUTH_TOKEN)
 
@@ -15,11 +18,15 @@ class WebhookService:
         twilio_signature = request.headers.get('X-Twilio-Signature', '')
         # The URL must be the full URL requested by Twilio, including query parameters
         url = str(request.url)
+        # Form posts are signed over their parameters; JSON bodies over the raw body
+        params = body.decode('utf-8')
+        if request.headers.get('content-type', '').startswith('application/x-www-form-urlencoded'):
+            params = ImmutableMultiDict(parse_qsl(params, keep_blank_values=True))
 
-        if not self.validator.validate(url, body.decode('utf-8'), twilio_signature):
+        if not self.validator.validate(url, params, twilio_signature):
             raise HTTPException(status_code=403, detail="Invalid Twilio signature.")
 
-    def handle_delivery_status(self, payload: dict):
+    async def handle_delivery_status(self, payload: dict):
         """Processes a delivery status update from Twilio."""
         message_sid = payload.get('MessageSid')
         message_status = payload.get('MessageStatus')
@@ -27,14 +34,15 @@ class WebhookService:
         if not message_sid or not message_status:
             return
 
-        message = self.db.query(Message).filter(Message.external_message_id == message_sid).first()
+        result = await self.db.execute(select(Message).where(Message.external_message_id == message_sid))
+        message = result.scalars().first()
 
         if message:
             message.statut_livraison = message_status
             if message_status == 'failed':
                 message.error_message = payload.get('ErrorMessage')
             # Handle cost later if needed
-            self.db.commit()
+            await self.db.commit()
 
     def handle_incoming_sms(self, payload: dict):
         """Handles an incoming SMS reply."""
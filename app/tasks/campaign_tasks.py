@@ -3,17 +3,20 @@ from app.core.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
 
-from app.db.session import SessionLocal
+from app.db.session import WorkerSessionLocal
 from app.db.models import Campaign
+from app.services.queue_service import QueueService
 from datetime import datetime, timezone
 
 @celery_app.task
 def auto_complete_campaigns():
     """
     Scans for campaigns whose end_date has passed and marks them as 'completed'.
+    Their messages still waiting in the queue are expired, as completed
+    campaigns are no longer claimed.
     """
     logger.info("Running auto_complete_campaigns task...")
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     try:
         campaigns_to_complete = db.query(Campaign).filter(
             Campaign.date_fin < datetime.now(timezone.utc),
@@ -24,7 +27,10 @@ def auto_complete_campaigns():
             logger.info(f"Found {len(campaigns_to_complete)} campaigns to mark as completed.")
             for campaign in campaigns_to_complete:
                 campaign.statut = 'completed'
+            expired = QueueService.expire_campaign_items(db, [c.id_campagne for c in campaigns_to_complete])
             db.commit()
+            if expired:
+                logger.info(f"Expired {expired} queued messages of completed campaigns.")
     finally:
         db.close()
 
@@ -1,23 +1,26 @@
 import logging
+import threading
 from datetime import datetime, timezone
 from app.core.celery_app import celery_app
 from app.core.config import settings
-from app.db.models import SMSQueue, Message, Campaign
-from app.db.session import SessionLocal
+from app.db.models import Message, Campaign, Contact
+from app.db.session import WorkerSessionLocal
+from app.services import campaign_service
 from app.services.campaign_execution_service import CampaignExecutionService
-from app.services.sms_providers.twilio_provider import TwilioProvider, TwilioApiError
+from app.services.queue_service import QueueService
+from app.services.sms_providers.base import SendSkipped, SmsProviderError
+from app.services.sms_providers.circuit_breaker import CircuitOpenError, OPEN, HALF_OPEN
+from app.services.sms_providers.router import get_sms_router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-MAX_SEND_ATTEMPTS = 3
-
 @celery_app.task
 def send_scheduled_campaigns():
     """
     Checks for campaigns that are scheduled to be sent and launches them.
     """
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     campaign_execution_service = CampaignExecutionService(db)
     try:
         scheduled_campaigns = db.query(Campaign).filter(
@@ -44,8 +47,8 @@ def process_sms_batch():
     """
     Processes a batch of pending messages from the sms_queue table.
     """
-    db = SessionLocal()
-    provider = TwilioProvider()
+    db = WorkerSessionLocal()
+    provider = get_sms_router()
 
     try:
         # Determine batch size from settings, with a fallback default
@@ -61,71 +64,131 @@ def process_sms_batch():
             except (ValueError, TypeError):
                 logger.warning(f"Invalid SMS_RATE_LIMIT format: '{settings.SMS_RATE_LIMIT}'. Expected an integer. Falling back to default {DEFAULT_BATCH_SIZE}.")
 
-        # Atomically fetch and lock pending items for processing
-        pending_items_query = db.query(SMSQueue).filter(SMSQueue.status == 'pending').limit(batch_size)
-        pending_items = pending_items_query.all()
+        circuit_state = provider.circuit_state()
+        if circuit_state == OPEN:
+            logger.warning("SMS provider circuit is open; not claiming any messages.")
+            return
+        if circuit_state == HALF_OPEN:
+            # Only the probe message may go out until the provider recovers
+            batch_size = 1
+
+        # Atomically fetch and lock pending items that are due for sending
+        pending_items = QueueService.claim_pending_items(db, batch_size)
 
         if not pending_items:
             # This is a normal state, so use info level, not warning
             # logger.info("No pending SMS messages to process.")
             return
 
-        item_ids = [item.id for item in pending_items]
-        db.query(SMSQueue).filter(SMSQueue.id.in_(item_ids)).update({"status": "processing"}, synchronize_session=False)
-        db.commit()
-
         logger.info(f"Processing {len(pending_items)} messages from the queue.")
 
+        # Paused after this batch was claimed: hand those items back untouched
+        paused_ids = campaign_service.get_paused_campaign_ids(db)
+        paused_items = [item for item in pending_items if item.campaign_id in paused_ids]
+        if paused_items:
+            QueueService.release_items(db, paused_items)
+            pending_items = [item for item in pending_items if item.campaign_id not in paused_ids]
+            if not pending_items:
+                return
+
+        # Load every contact of the batch at once instead of one lazy load per item
+        db.query(Contact).filter(Contact.id_contact.in_({item.contact_id for item in pending_items})).all()
+
+        # An item that cannot be turned into a message fails on its own
+        sendable, outbound = [], []
         for item in pending_items:
             try:
-                # Construct callback URL
-                callback_url = f"{settings.BASE_URL}/api/v1/sms-webhooks/twilio-status"
-
-                response = provider.send_sms(
-                    to_number=item.contact.numero_telephone,
-                    message=item.message_content,
-                    callback_url=callback_url
-                )
-
-                # Map Twilio's 'queued' status to our 'sent' status
-                message_status = response.get("status", "failed")
-                if message_status in ['queued', 'sending']:
-                    message_status = 'sent'
-
-                # Create permanent message record
-                new_message = Message(
-                    contenu=item.message_content,
-                    date_envoi=datetime.now(timezone.utc),
-                    statut_livraison=message_status,
-                    identifiant_expediteur=provider.twilio_phone_number,
-                    external_message_id=response.get("sid"),
-                    id_liste=item.campaign.mailing_lists[0].id_liste if item.campaign.mailing_lists else None,
-                    id_contact=item.contact_id,
-                    id_campagne=item.campaign_id
-                )
-                db.add(new_message)
-
-                # Update queue item
-                item.status = 'sent'
-                item.processed_at = datetime.now(timezone.utc)
-                logger.info(f"Successfully sent message from queue item {item.id}")
-
-            except TwilioApiError as e:
-                logger.error(f"Twilio API error for queue item {item.id}: {e}")
-                item.attempts += 1
-                item.error_message = str(e)
-                if item.attempts >= MAX_SEND_ATTEMPTS:
-                    item.status = 'failed'
-                else:
-                    item.status = 'pending' # Re-queue for another attempt
-
+                outbound.append({"to_number": item.contact.numero_telephone, "message": item.message_content})
+                sendable.append(item)
             except Exception as e:
-                logger.error(f"Unexpected error processing queue item {item.id}: {e}")
+                logger.error(f"Could not prepare queue item {item.id}: {e}")
                 item.attempts += 1
                 item.error_message = str(e)
                 item.status = 'failed'
 
+        # A campaign paused while its messages are going out stops at the
+        # next message; the send threads share the session, one at a time
+        pause_check_lock = threading.Lock()
+        sendable_campaign_ids = [item.campaign_id for item in sendable]
+
+        def campaign_paused(index: int) -> bool:
+            with pause_check_lock:
+                return sendable_campaign_ids[index] in campaign_service.get_paused_campaign_ids(db)
+
+        callback_url = f"{settings.BASE_URL}/api/v1/sms-webhooks/twilio-status"
+        try:
+            results = provider.send_batch(outbound, callback_url=callback_url, skip=campaign_paused)
+        except Exception as e:
+            # Nothing is known to have been sent: count an attempt and back off
+            # rather than leaving the batch 'processing'
+            logger.exception(f"Sending a batch of {len(sendable)} messages failed: {e}")
+            for item in sendable:
+                QueueService.record_send_failure(item, f"Batch send failed: {e}", transient=True)
             db.commit()
+            return
+
+        try:
+            released = []
+            for item, result in zip(sendable, results):
+                if isinstance(result, (CircuitOpenError, SendSkipped)):
+                    # The provider went down, or the campaign was paused, mid-batch
+                    released.append(item)
+
+                elif isinstance(result, SmsProviderError):
+                    logger.error(f"SMS provider error for queue item {item.id} ({'transient' if result.transient else 'permanent'}): {result}")
+                    QueueService.record_send_failure(item, str(result), transient=result.transient)
+
+                elif isinstance(result, Exception):
+                    logger.error(f"Unexpected error processing queue item {item.id}: {result}")
+                    item.attempts += 1
+                    item.error_message = str(result)
+                    item.status = 'failed'
+
+                else:
+                    # Map the provider's 'queued' status to our 'sent' status
+                    message_status = result.get("status", "failed")
+                    if message_status in ['queued', 'sending']:
+                        message_status = 'sent'
+
+                    # Create permanent message record
+                    new_message = Message(
+                        contenu=item.message_content,
+                        date_envoi=datetime.now(timezone.utc),
+                        statut_livraison=message_status,
+                        identifiant_expediteur=result.get("sender_id", provider.sender_id),
+                        external_message_id=result.get("sid"),
+                        id_liste=item.campaign.mailing_lists[0].id_liste if item.campaign.mailing_lists else None,
+                        id_contact=item.contact_id,
+                        id_campagne=item.campaign_id
+                    )
+                    db.add(new_message)
+
+                    # Update queue item
+                    item.status = 'sent'
+                    item.processed_at = datetime.now(timezone.utc)
+
+            db.commit()
+        except Exception as e:
+            logger.exception(f"Recording a batch of {len(sendable)} messages failed: {e}")
+            db.rollback()
+            sent = {item.id for item, result in zip(sendable, results) if not isinstance(result, Exception)}
+            for item in pending_items:
+                if item.id in sent:
+                    # Sending it again would duplicate it, so it is failed and left out of retries
+                    item.status = 'failed'
+                    item.retryable = False
+                    item.error_message = f"Sent but not recorded: {e}"
+                    item.processed_at = datetime.now(timezone.utc)
+                else:
+                    QueueService.record_send_failure(item, f"Batch not recorded: {e}", transient=True)
+            db.commit()
+            return
+
+        QueueService.record_sent(sum(1 for item in pending_items if item.status == 'sent'))
+        if released:
+            logger.warning(f"Circuit opened or campaign paused mid-batch; releasing {len(released)} messages back to the queue.")
+            QueueService.release_items(db, released)
+        logger.info(f"Finished batch of {len(pending_items)} messages; {len(released)} released.")
 
     finally:
         db.close()
@@ -134,19 +197,19 @@ def process_sms_batch():
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=300) # 5-minute delay
 def retry_failed_messages(self):
     """
-    Scans for messages that have permanently failed and re-queues them for one final attempt.
+    Scans for messages that ran out of attempts on transient errors and
+    re-queues them for one final attempt. Messages the provider rejected
+    permanently are skipped. The sweep works in chunks and is capped per run.
     This is for messages that failed in process_sms_batch, not for delivery failures.
     """
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     try:
-        failed_items = db.query(SMSQueue).filter(SMSQueue.status == 'failed').all()
-        logger.info(f"Found {len(failed_items)} failed messages to retry.")
-        for item in failed_items:
-            logger.info(f"Re-queuing failed message {item.id} for campaign {item.campaign_id}.")
-            item.status = 'pending' # Reset status to be picked up by the batch processor
-            item.attempts = 0 # Reset attempts
-            item.error_message = f"Re-queued after failure at {datetime.now(timezone.utc)}"
-        db.commit()
+        requeued = QueueService.requeue_failed_items(
+            db,
+            chunk_size=settings.SMS_RETRY_SWEEP_CHUNK_SIZE,
+            max_items=settings.SMS_RETRY_SWEEP_MAX_ITEMS,
+        )
+        logger.info(f"Re-queued {requeued} failed messages for a final attempt.")
     except Exception as exc:
         logger.error(f"Error during retry_failed_messages task: {exc}")
         raise self.retry(exc=exc)
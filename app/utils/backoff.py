@@ -0,0 +1,15 @@
+import random
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float, rng: Optional[random.Random] = None) -> float:
+    """
+    Returns how many seconds to wait before retry number `attempt` (1-based).
+
+    The ceiling doubles with every attempt up to `max_seconds`. Half of it is
+    always waited and the other half is random, so retries from an outage are
+    spread out instead of all landing on the provider at once.
+    """
+    rng = rng or random
+    ceiling = min(max_seconds, base_seconds * 2 ** max(attempt - 1, 0))
+    return ceiling / 2 + rng.uniform(0, ceiling / 2)
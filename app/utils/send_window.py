@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+class InvalidSendWindowError(ValueError):
+    """Custom exception for invalid send window parameters."""
+    pass
+
+
+class SendWindowScheduler:
+    """
+    Assigns a scheduled_at to each message of a launch so that sending is
+    throttled to `rate_per_minute` and only happens between `start_hour` and
+    `end_hour` (local time in `timezone_name`). A window where start_hour is
+    greater than end_hour wraps past midnight (e.g. 20 -> 6).
+
+    With no rate and no window every message is scheduled at `start`.
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        rate_per_minute: Optional[int] = None,
+        start_hour: Optional[int] = None,
+        end_hour: Optional[int] = None,
+        timezone_name: str = "UTC",
+    ):
+        if rate_per_minute is not None and rate_per_minute <= 0:
+            raise InvalidSendWindowError("rate_per_minute must be a positive integer.")
+        if (start_hour is None) != (end_hour is None):
+            raise InvalidSendWindowError("start_hour and end_hour must be provided together.")
+        if start_hour is not None:
+            if not (0 <= start_hour <= 23 and 0 <= end_hour <= 23) or start_hour == end_hour:
+                raise InvalidSendWindowError("Send window hours must be distinct values between 0 and 23.")
+        try:
+            self.tz = ZoneInfo(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise InvalidSendWindowError(f"Unknown timezone '{timezone_name}'.")
+
+        self.interval = timedelta(minutes=1) / rate_per_minute if rate_per_minute else None
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self._cursor = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+
+    def _in_window(self, hour: int) -> bool:
+        if self.start_hour < self.end_hour:
+            return self.start_hour <= hour < self.end_hour
+        return hour >= self.start_hour or hour < self.end_hour
+
+    def _fit_window(self, moment: datetime) -> datetime:
+        """Moves `moment` forward to the next opening of the send window."""
+        if self.start_hour is None:
+            return moment
+        local = moment.astimezone(self.tz)
+        if self._in_window(local.hour):
+            return moment
+        opening = local.replace(hour=self.start_hour, minute=0, second=0, microsecond=0)
+        if opening <= local:
+            opening += timedelta(days=1)
+        return opening.astimezone(timezone.utc)
+
+    def next_slot(self) -> datetime:
+        """Returns the scheduled_at (UTC) for the next message."""
+        slot = self._fit_window(self._cursor)
+        self._cursor = slot + self.interval if self.interval else slot
+        return slot
@@ -1,6 +1,13 @@
 import React from 'react';
 import { useTaskStatus } from '../../hooks/useTasks';
 
+const formatAge = (seconds: number | null | undefined) => {
+  if (seconds == null) return 'None due';
+  if (seconds < 60) return `${Math.round(seconds)}s`;
+  if (seconds < 3600) return `${Math.round(seconds / 60)}m`;
+  return `${(seconds / 3600).toFixed(1)}h`;
+};
+
 const TaskMonitor: React.FC = () => {
   const { data, isLoading, isError } = useTaskStatus();
 
@@ -9,25 +16,48 @@ const TaskMonitor: React.FC = () => {
 
   return (
     <div className="bg-white dark:bg-gray-800 p-6 rounded-lg shadow-md">
-      <h3 className="text-xl font-bold mb-4">Background Task Monitor</h3>
+      <h3 className="text-xl font-bold mb-4">SMS Queue Monitor</h3>
+      <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-6">
+        {data && Object.entries(data.by_status).map(([status, count]) => (
+          <div key={status} className="bg-gray-100 dark:bg-gray-900 p-3 rounded-md">
+            <p className="text-xs uppercase text-gray-500">{status}</p>
+            <p className="text-2xl font-semibold">{count}</p>
+          </div>
+        ))}
+      </div>
       <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
         <div>
-          <h4 className="font-semibold">Worker Stats</h4>
-          <pre className="bg-gray-100 dark:bg-gray-900 p-2 rounded-md text-xs overflow-x-auto">
-            {JSON.stringify(data?.stats, null, 2)}
-          </pre>
+          <h4 className="font-semibold">Oldest Due Message Waiting</h4>
+          <p>{formatAge(data?.oldest_pending_age_seconds)}</p>
+          <h4 className="font-semibold mt-4">Sent per Minute</h4>
+          <p>
+            {data && Object.entries(data.send_rate_per_minute).map(([window, rate]) => `${window}: ${rate}`).join(' · ')}
+          </p>
         </div>
         <div>
-          <h4 className="font-semibold">Active Tasks</h4>
-          <pre className="bg-gray-100 dark:bg-gray-900 p-2 rounded-md text-xs overflow-x-auto">
-            {JSON.stringify(data?.active_tasks, null, 2)}
-          </pre>
-        </div>
-        <div className="col-span-2">
-          <h4 className="font-semibold">Scheduled Tasks</h4>
-          <pre className="bg-gray-100 dark:bg-gray-900 p-2 rounded-md text-xs overflow-x-auto">
-            {JSON.stringify(data?.scheduled_tasks, null, 2)}
-          </pre>
+          <h4 className="font-semibold">Backlog by Campaign</h4>
+          {data?.by_campaign.length ? (
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left">
+                  <th>Campaign</th>
+                  <th>Pending</th>
+                  <th>Processing</th>
+                </tr>
+              </thead>
+              <tbody>
+                {data.by_campaign.map((campaign) => (
+                  <tr key={campaign.campaign_id}>
+                    <td>#{campaign.campaign_id}</td>
+                    <td>{campaign.pending}</td>
+                    <td>{campaign.processing}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          ) : (
+            <p>No queued messages.</p>
+          )}
         </div>
       </div>
     </div>
@@ -1,5 +1,5 @@
 import React from 'react';
-import { useCampaignStatus, usePauseCampaign, useUpdateCampaign } from '../../hooks/useCampaigns';
+import { useCampaignStatus, usePauseCampaign, useResumeCampaign } from '../../hooks/useCampaigns';
 import { Campaign } from '../../services/campaignApi';
 import { BarChart, Bar, XAxis, YAxis, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { Pause, Play } from 'lucide-react';
@@ -14,15 +14,14 @@ const CampaignMonitor: React.FC<CampaignMonitorProps> = ({ campaign }) => {
   });
 
   const pauseMutation = usePauseCampaign();
-  const updateMutation = useUpdateCampaign();
+  const resumeMutation = useResumeCampaign();
 
   const handlePause = () => {
     pauseMutation.mutate(campaign.id_campagne);
   };
 
   const handleResume = () => {
-    const payload = { ...campaign, statut: 'active' as const };
-    updateMutation.mutate({ id: campaign.id_campagne, payload });
+    resumeMutation.mutate(campaign.id_campagne);
   };
 
   if (isLoading && !status) return <p>Loading status...</p>;
@@ -50,7 +49,7 @@ const CampaignMonitor: React.FC<CampaignMonitorProps> = ({ campaign }) => {
             </button>
           )}
           {campaign.statut === 'paused' && (
-            <button onClick={handleResume} disabled={updateMutation.isLoading} className="flex items-center px-3 py-2 text-sm bg-green-100 text-green-800 rounded-md hover:bg-green-200">
+            <button onClick={handleResume} disabled={resumeMutation.isLoading} className="flex items-center px-3 py-2 text-sm bg-green-100 text-green-800 rounded-md hover:bg-green-200">
               <Play size={16} className="mr-1" /> Resume
             </button>
           )}
@@ -8,6 +8,7 @@ import {
   getCampaignStatus,
   getCampaign,
   pauseCampaign,
+  resumeCampaign,
   Campaign,
   CampaignCreationPayload
 } from '../services/campaignApi';
@@ -82,3 +83,17 @@ export const usePauseCampaign = () => {
         },
     });
 }
+
+export const useResumeCampaign = () => {
+    const queryClient = useQueryClient();
+    return useMutation(resumeCampaign, {
+        onSuccess: (data) => {
+            queryClient.invalidateQueries(CAMPAIGNS_QUERY_KEY);
+            queryClient.invalidateQueries(['campaign', data.id_campagne]);
+            toast.success('Campaign resumed successfully!');
+        },
+        onError: (error: Error) => {
+            toast.error(`Failed to resume campaign: ${error.message}`);
+        },
+    });
+}
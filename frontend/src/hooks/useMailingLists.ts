@@ -1,11 +1,11 @@
 import { useQuery, useMutation, useQueryClient } from 'react-query';
-import { getMailingLists, createMailingList, MailingList, MailingListCreationPayload } from '../services/mailingListApi';
+import { getMailingLists, createMailingList, MailingListSummary, MailingListCreationPayload } from '../services/mailingListApi';
 import toast from 'react-hot-toast';
 
 const MAILING_LISTS_QUERY_KEY = 'mailingLists';
 
 export const useMailingLists = () => {
-  return useQuery<MailingList[], Error>(MAILING_LISTS_QUERY_KEY, getMailingLists);
+  return useQuery<MailingListSummary[], Error>(MAILING_LISTS_QUERY_KEY, getMailingLists);
 };
 
 export const useCreateMailingList = () => {
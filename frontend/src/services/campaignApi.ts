@@ -89,3 +89,8 @@ export const pauseCampaign = async (id: number): Promise<Campaign> => {
   const response = await api.post<Campaign>(`/campaigns/${id}/pause`);
   return response.data;
 }
+
+export const resumeCampaign = async (id: number): Promise<Campaign> => {
+  const response = await api.post<Campaign>(`/campaigns/${id}/resume`);
+  return response.data;
+}
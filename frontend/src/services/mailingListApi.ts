@@ -17,8 +17,34 @@ export interface MailingList {
   created_at: string; // ISO 8601 date string
 }
 
-export const getMailingLists = async (): Promise<MailingList[]> => {
-  const response = await api.get<MailingList[]>('/mailing-lists/');
+// Returned by the list/detail endpoints; members are paged via /{id}/contacts
+export interface MailingListSummary {
+  id_liste: number;
+  id_campagne: number;
+  nom_liste: string;
+  description: string | null;
+  contact_count: number;
+  created_at: string; // ISO 8601 date string
+}
+
+export interface ListContactsPage {
+  items: Contact[];
+  next_cursor: number | null;
+}
+
+export const getMailingLists = async (): Promise<MailingListSummary[]> => {
+  const response = await api.get<MailingListSummary[]>('/mailing-lists/');
+  return response.data;
+};
+
+export const getMailingListContacts = async (
+  listId: number,
+  cursor?: number | null,
+  limit = 100,
+): Promise<ListContactsPage> => {
+  const response = await api.get<ListContactsPage>(`/mailing-lists/${listId}/contacts`, {
+    params: { cursor: cursor ?? undefined, limit },
+  });
   return response.data;
 };
 
@@ -1,9 +1,17 @@
 import api from './api';
 
+export interface CampaignQueueDepth {
+  campaign_id: number;
+  pending: number;
+  processing: number;
+}
+
 export interface TaskStatus {
-  stats: any;
-  active_tasks: any;
-  scheduled_tasks: any;
+  by_status: Record<'pending' | 'processing' | 'sent' | 'failed', number>;
+  by_campaign: CampaignQueueDepth[];
+  oldest_pending_age_seconds: number | null;
+  send_rate_per_minute: Record<'1m' | '5m' | '15m', number>;
+  generated_at: string;
 }
 
 export const getTaskStatus = async (): Promise<TaskStatus> => {
@@ -0,0 +1,13 @@
+#!/bin/sh
+set -e
+
+# prometheus_client names its multiprocess files by PID, and PIDs restart at
+# 1 in every container, so files left by an earlier run (or another
+# container) would be merged into this one's counters. Start from an empty
+# directory of our own.
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+exec "$@"
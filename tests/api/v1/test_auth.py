@@ -1,7 +1,10 @@
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
 from sqlalchemy.orm import Session
 
 from app.api.v1.schemas import user as user_schema
+from app.core.config import settings
+from app.db.models import Agent
 from app.services import user_service
 
 def test_login(client: TestClient, db_session: Session):
@@ -43,3 +46,61 @@ def test_login(client: TestClient, db_session: Session):
     )
     assert response.status_code == 401
     assert response.json()["detail"] == "Incorrect username or password"
+
+
+def _agent_with_password(db_session: Session, password: str, rounds: int = 4) -> Agent:
+    agent = Agent(
+        nom_agent="Login Agent", identifiant="login_agent", role="agent", is_active=True,
+        mot_de_passe=bcrypt.using(rounds=rounds).hash(password),
+    )
+    db_session.add(agent)
+    db_session.commit()
+    return agent
+
+
+def test_login_rehashes_passwords_with_outdated_cost(client: TestClient, db_session: Session):
+    agent = _agent_with_password(db_session, "secret", rounds=5)
+
+    response = client.post("/auth/login", json={"identifiant": "login_agent", "password": "secret"})
+
+    assert response.status_code == 200
+    db_session.refresh(agent)
+    assert bcrypt.from_string(agent.mot_de_passe).rounds == settings.BCRYPT_ROUNDS
+    assert bcrypt.verify("secret", agent.mot_de_passe)
+
+
+def test_login_is_throttled_after_repeated_failures(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES", 3)
+    _agent_with_password(db_session, "secret")
+
+    for _ in range(3):
+        response = client.post("/auth/login", json={"identifiant": "login_agent", "password": "wrong"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", json={"identifiant": "Login_Agent", "password": "secret"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(settings.LOGIN_THROTTLE_WINDOW_SECONDS)
+
+
+def test_login_throttle_does_not_lock_the_agent_out_elsewhere(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES", 3)
+    _agent_with_password(db_session, "secret")
+    # Sharing the client fixture's database overrides, from behind the proxy
+    proxy = TestClient(client.app, client=("10.0.0.1", 50000))
+    attacker = {"X-Forwarded-For": "203.0.113.7"}
+    agent = {"X-Forwarded-For": "198.51.100.20"}
+
+    for _ in range(3):
+        proxy.post("/auth/login", json={"identifiant": "login_agent", "password": "wrong"}, headers=attacker)
+
+    assert proxy.post("/auth/login", json={"identifiant": "login_agent", "password": "secret"}, headers=attacker).status_code == 429
+    assert proxy.post("/auth/login", json={"identifiant": "login_agent", "password": "secret"}, headers=agent).status_code == 200
+
+
+def test_login_is_refused_when_hashing_is_saturated(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    _agent_with_password(db_session, "secret")
+
+    response = client.post("/auth/login", json={"identifiant": "login_agent", "password": "secret"})
+
+    assert response.status_code == 503
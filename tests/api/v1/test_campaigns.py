@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 from app.services import campaign_service
 from app.api.v1.schemas import campaign as campaign_schema
@@ -80,6 +81,46 @@ def test_pause_campaign(client: TestClient, db_session: Session, admin_auth_head
     assert response.status_code == 200
     updated_campaign = db_session.get(Campaign, campaign.id_campagne)
     assert updated_campaign.statut == "paused"
+    assert campaign.id_campagne in campaign_service.get_paused_campaign_ids(db_session)
+
+
+def test_resume_campaign(client: TestClient, db_session: Session, admin_auth_headers: dict):
+    # --- Setup ---
+    campaign = Campaign(
+        nom_campagne="Paused Campaign to Resume",
+        statut="paused",
+        date_debut=datetime(2025, 1, 1), date_fin=datetime(2025, 1, 31),
+        type_campagne="promotional", id_agent=1
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    assert campaign.id_campagne in campaign_service.get_paused_campaign_ids(db_session)
+
+    # --- Execute ---
+    with patch("app.services.campaign_service.celery_app.send_task") as send_task:
+        response = client.post(f"/campaigns/{campaign.id_campagne}/resume", headers=admin_auth_headers)
+
+    # --- Assert ---
+    assert response.status_code == 200
+    assert response.json()["statut"] == "active"
+    send_task.assert_called_once()
+    # The cached pause list is dropped, so workers see the change right away
+    assert campaign.id_campagne not in campaign_service.get_paused_campaign_ids(db_session)
+
+
+def test_resume_campaign_not_paused(client: TestClient, db_session: Session, admin_auth_headers: dict):
+    campaign = Campaign(
+        nom_campagne="Active Campaign to Resume",
+        statut="active",
+        date_debut=datetime(2025, 1, 1), date_fin=datetime(2025, 1, 31),
+        type_campagne="promotional", id_agent=1
+    )
+    db_session.add(campaign)
+    db_session.commit()
+
+    response = client.post(f"/campaigns/{campaign.id_campagne}/resume", headers=admin_auth_headers)
+
+    assert response.status_code == 400
 
 
 def test_get_campaign_status(client: TestClient, db_session: Session, admin_auth_headers: dict):
@@ -156,7 +156,8 @@ class TestMailingListCRUD:
         data = response.json()
         assert data["id_liste"] == test_mailing_list
         assert data["nom_liste"] == "Test Mailing List"
-        assert "contacts" in data  # Should include contacts list
+        assert data["contact_count"] == 0
+        assert "contacts" not in data  # Members are paginated separately
 
     def test_update_mailing_list(self, client: TestClient, admin_auth_headers: dict, test_mailing_list):
         """Test updating a mailing list"""
@@ -309,8 +310,32 @@ class TestContactOperations:
 
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) >= 1  # At least opt-in contacts
+        assert isinstance(data["items"], list)
+        assert len(data["items"]) >= 1  # At least opt-in contacts
+
+    def test_get_list_contacts_paginated(self, client: TestClient, admin_auth_headers: dict,
+                                         test_mailing_list, test_contacts):
+        """Test paging through list members with a cursor"""
+        client.post(
+            f"/mailing-lists/{test_mailing_list}/contacts",
+            json={"contact_ids": test_contacts},
+            headers=admin_auth_headers,
+        )
+
+        first_page = client.get(f"/mailing-lists/{test_mailing_list}/contacts",
+                                params={"limit": 1}, headers=admin_auth_headers).json()
+        assert len(first_page["items"]) == 1
+        assert first_page["next_cursor"] == first_page["items"][0]["id_contact"]
+
+        second_page = client.get(f"/mailing-lists/{test_mailing_list}/contacts",
+                                 params={"limit": 1, "cursor": first_page["next_cursor"]},
+                                 headers=admin_auth_headers).json()
+        assert len(second_page["items"]) == 1
+        assert second_page["items"][0]["id_contact"] > first_page["items"][0]["id_contact"]
+        assert second_page["next_cursor"] is None  # Only two opted-in contacts were added
+
+        summary = client.get(f"/mailing-lists/{test_mailing_list}", headers=admin_auth_headers).json()
+        assert summary["contact_count"] == 2
 
     def test_add_invalid_contact_to_list(self, client: TestClient, admin_auth_headers: dict, test_mailing_list):
         """Test adding non-existent contact to list"""
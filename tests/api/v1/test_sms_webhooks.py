@@ -2,8 +2,17 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
+from twilio.request_validator import RequestValidator
+from app.core.config import settings
 from app.db.models import Message, Contact, Campaign, MailingList
 
+STATUS_WEBHOOK = "/api/v1/sms-webhooks/twilio-status"
+
+def _post_signed(client: TestClient, data: dict):
+    """Posts a status callback signed the way Twilio signs it."""
+    signature = RequestValidator(settings.TWILIO_AUTH_TOKEN).compute_signature(f"http://testserver{STATUS_WEBHOOK}", data)
+    return client.post(STATUS_WEBHOOK, data=data, headers={"X-Twilio-Signature": signature})
+
 def test_twilio_webhook_updates_status_delivered(client: TestClient, db_session: Session):
     # --- Setup ---
     contact = Contact(nom="Webhook", prenom="Test", numero_telephone="+15551234567", email="hook@example.com")
@@ -23,9 +32,8 @@ def test_twilio_webhook_updates_status_delivered(client: TestClient, db_session:
     db_session.commit()
 
     # --- Execute ---
-    response = client.post(
-        "/api/v1/sms-webhooks/twilio-status",
-        data={"MessageSid": "SMwebhookdelivered", "MessageStatus": "delivered", "Price": "-0.0075"},
+    response = _post_signed(
+        client, {"MessageSid": "SMwebhookdelivered", "MessageStatus": "delivered", "Price": "-0.0075"},
     )
 
     # --- Assert ---
@@ -54,9 +62,8 @@ def test_twilio_webhook_updates_status_failed(client: TestClient, db_session: Se
     db_session.commit()
 
     # --- Execute ---
-    response = client.post(
-        "/api/v1/sms-webhooks/twilio-status",
-        data={"MessageSid": "SMwebhookfailed", "MessageStatus": "failed", "ErrorMessage": "30005-Message-Delivery-Unknown-error"},
+    response = _post_signed(
+        client, {"MessageSid": "SMwebhookfailed", "MessageStatus": "failed", "ErrorMessage": "30005-Message-Delivery-Unknown-error"},
     )
 
     # --- Assert ---
@@ -64,3 +71,25 @@ def test_twilio_webhook_updates_status_failed(client: TestClient, db_session: Se
     updated_message = db_session.get(Message, message.id_message)
     assert updated_message.statut_livraison == "failed"
     assert updated_message.error_message == "30005-Message-Delivery-Unknown-error"
+
+
+def test_twilio_webhook_rejects_unsigned_requests(client: TestClient, db_session: Session):
+    contact = Contact(nom="Forged", prenom="Test", numero_telephone="+15551234569")
+    campaign = Campaign(nom_campagne="Forged Campaign", date_debut=datetime.now(timezone.utc), date_fin=datetime.now(timezone.utc), statut="active", type_campagne="promotional", id_agent=1)
+    mailing_list = MailingList(nom_liste="Forged List", campaign=campaign, contacts=[contact])
+    message = Message(
+        contenu="Test message", date_envoi=datetime.now(timezone.utc), statut_livraison="sent",
+        identifiant_expediteur="test", external_message_id="SMwebhookforged",
+        contact=contact, campaign=campaign, mailing_list=mailing_list
+    )
+    db_session.add_all([contact, campaign, mailing_list, message])
+    db_session.commit()
+    data = {"MessageSid": "SMwebhookforged", "MessageStatus": "delivered"}
+
+    unsigned = client.post(STATUS_WEBHOOK, data=data)
+    forged = client.post(STATUS_WEBHOOK, data=data, headers={"X-Twilio-Signature": "forged"})
+
+    assert unsigned.status_code == 403
+    assert forged.status_code == 403
+    db_session.expire_all()
+    assert db_session.get(Message, message.id_message).statut_livraison == "sent"
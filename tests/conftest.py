@@ -1,12 +1,16 @@
 import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 
-# Set environment variables for testing BEFORE loading the app
-os.environ['DATABASE_URL'] = "sqlite:///:memory:"
+# Set environment variables for testing BEFORE loading the app.
+# A file rather than an in-memory database, so that the async handlers'
+# connections see the same data as the tests' session.
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
 os.environ['JWT_SECRET_KEY'] = "testsecret"
 os.environ['TWILIO_ACCOUNT_SID'] = "ACxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx"
 os.environ['TWILIO_AUTH_TOKEN'] = "testtoken"
@@ -14,10 +18,16 @@ os.environ['TWILIO_PHONE_NUMBER'] = "+15005550006"
 os.environ['BASE_URL'] = "http://testserver"
 os.environ['CELERY_BROKER_URL'] = "redis://localhost:6379/0"
 os.environ['CELERY_RESULT_BACKEND'] = "redis://localhost:6379/0"
+os.environ['REDIS_ENABLED'] = "false"
+os.environ['BCRYPT_ROUNDS'] = "4"
+# Requests from this address come through the reverse proxy
+os.environ['TRUSTED_PROXIES'] = '["10.0.0.1"]'
 
 from app.main import app
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import async_database_url, get_async_db, get_async_read_db, get_db, get_read_db
+from app.core.cache import local_cache
+from app.core.rate_limit import local_rate_limits
 from app.services import user_service
 from app.api.v1.schemas import user as user_schema
 
@@ -27,6 +37,9 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# TestClient may run each request on a new event loop, so connections are not pooled
+async_engine = create_async_engine(async_database_url(os.environ['DATABASE_URL']), poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 @pytest.fixture(scope="function")
@@ -41,6 +54,9 @@ def db_session():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        # IDs are reused across tests, so cached entries must not leak between them
+        local_cache.clear()
+        local_rate_limits.clear()
 
 
 @pytest.fixture(scope="function")
@@ -54,9 +70,19 @@ def client(db_session):
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     yield TestClient(app)
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_read_db]
+    del app.dependency_overrides[get_async_db]
+    del app.dependency_overrides[get_async_read_db]
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,97 @@
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from prometheus_client import generate_latest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db.models import Campaign, Contact, SMSQueue
+from app.services.sms_providers.fake_provider import FakeSmsProvider
+from app.services.sms_providers.router import ProviderRoute, SmsRouter
+
+
+def test_metrics_endpoint_reports_route_latency_and_queue_depth(client: TestClient, db_session: Session, monkeypatch):
+    contact = Contact(nom="Metrics", prenom="Queue", numero_telephone="+33700000001")
+    campaign = Campaign(
+        nom_campagne="Metrics Campaign",
+        date_debut=datetime.now(timezone.utc), date_fin=datetime.now(timezone.utc),
+        statut="active", type_campagne="promotional", id_agent=1
+    )
+    db_session.add_all([contact, campaign])
+    db_session.commit()
+    db_session.add_all([
+        SMSQueue(campaign_id=campaign.id_campagne, contact_id=contact.id_contact, message_content="Hi",
+                 scheduled_at=datetime.now(timezone.utc), status=status)
+        for status in ("pending", "pending", "failed")
+    ])
+    db_session.commit()
+    monkeypatch.setattr("app.db.session.SessionLocal", lambda: db_session)
+
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert 'sms_queue_depth{status="pending"} 2.0' in body
+    assert 'sms_queue_depth{status="failed"} 1.0' in body
+
+
+def test_instrumented_engine_counts_queries_by_operation():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    selects = metrics.DB_QUERIES.labels("SELECT")
+    before = selects._value.get()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("select 2"))
+
+    assert selects._value.get() == before + 2
+
+
+def test_failed_statements_do_not_skew_later_timings(monkeypatch):
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    clock = [100.0]
+    monkeypatch.setattr(metrics.time, "perf_counter", lambda: clock[0])
+    # Runs after the metrics listener: every statement takes 0.5s
+    event.listen(engine, "before_cursor_execute", lambda *args: clock.__setitem__(0, clock[0] + 0.5))
+    duration = metrics.DB_QUERY_DURATION.labels("SELECT")
+    before = duration._sum.get()
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        # Nothing is left behind on the pooled connection
+        assert conn.info == {}
+
+    assert duration._sum.get() == before + 0.5
+
+
+def test_router_counts_sends_per_provider():
+    sent = metrics.SMS_SENT.labels("metrics-fake", "sent")
+    failed = metrics.SMS_SENT.labels("metrics-fake", "permanent_error")
+    before_sent, before_failed = sent._value.get(), failed._value.get()
+
+    router = SmsRouter([ProviderRoute("metrics-fake", FakeSmsProvider())])
+    router.send_sms("+33700000001", "Hi", "http://testserver/callback")
+
+    assert sent._value.get() == before_sent + 1
+    assert failed._value.get() == before_failed
+
+
+def test_worker_metrics_server_serves_process_metrics_without_queue_depth(monkeypatch):
+    served = {}
+    monkeypatch.setattr(metrics, "start_http_server", lambda port, registry: served.update(port=port, registry=registry))
+    metrics.SMS_SENT.labels("fake", "sent").inc()
+
+    metrics.start_worker_metrics_server(9808)
+
+    body = generate_latest(served["registry"]).decode()
+    assert served["port"] == 9808
+    assert 'sms_sent_total{outcome="sent",provider="fake"}' in body
+    assert "sms_queue_depth" not in body
@@ -0,0 +1,108 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, hit_limits
+from app.core.security import create_access_token
+from app.main import app
+from app.middleware import security_middleware
+
+
+def test_limiter_allows_a_burst_then_spaces_requests(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.time", lambda: clock[0])
+    limiter = RateLimiter("test", limit=3, period=60)
+
+    assert [limiter.hit("a").allowed for _ in range(3)] == [True, True, True]
+    denied = limiter.hit("a")
+    assert not denied.allowed
+    assert denied.retry_after == 20
+    # Other clients have their own budget
+    assert limiter.hit("b").allowed
+
+    clock[0] += 20
+    assert limiter.hit("a").allowed
+    assert not limiter.hit("a").allowed
+
+
+def test_route_limit_returns_429_with_retry_after(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_LIMITS", {"/auth/login": 2})
+    credentials = {"identifiant": "nobody", "password": "wrong"}
+
+    statuses = [client.post("/auth/login", json=credentials).status_code for _ in range(3)]
+
+    assert statuses == [401, 401, 429]
+    response = client.post("/auth/login", json=credentials)
+    assert response.json() == {"detail": "Too many requests."}
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_authenticated_clients_are_limited_per_agent(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_PER_MINUTE", 1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_MINUTE", 2)
+    first = {"Authorization": f"Bearer {create_access_token('agent-1')}"}
+    second = {"Authorization": f"Bearer {create_access_token('agent-2')}"}
+
+    assert [client.get("/", headers=first).status_code for _ in range(3)] == [200, 200, 429]
+    assert client.get("/", headers=second).status_code == 200
+
+
+def test_provider_webhooks_are_exempt(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_PER_MINUTE", 1)
+
+    assert [client.get("/health").status_code for _ in range(3)] == [200, 200, 200]
+    assert client.get("/").status_code == 200
+    assert client.get("/").status_code == 429
+
+
+def test_refused_requests_use_no_budget_from_any_limit():
+    route = RateLimiter("route", limit=5, period=60)
+    api = RateLimiter("api", limit=1, period=60)
+    assert hit_limits([api], "a").allowed
+
+    assert not hit_limits([route, api], "a").allowed
+    assert [route.hit("a").allowed for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_rate_limited_responses_carry_cors_headers(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_PER_MINUTE", 1)
+    origin = {"Origin": settings.ALLOWED_ORIGINS[0]}
+    client.get("/", headers=origin)
+
+    response = client.get("/", headers=origin)
+
+    assert response.status_code == 429
+    assert response.headers["Access-Control-Allow-Origin"] == settings.ALLOWED_ORIGINS[0]
+
+
+def test_clients_behind_the_reverse_proxy_are_limited_by_forwarded_address(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_PER_MINUTE", 1)
+    proxy = TestClient(app, client=("10.0.0.1", 50000))
+    first = {"X-Forwarded-For": "203.0.113.7"}
+    second = {"X-Forwarded-For": "198.51.100.1, 203.0.113.8"}
+
+    assert [proxy.get("/", headers=first).status_code for _ in range(2)] == [200, 429]
+    assert proxy.get("/", headers=second).status_code == 200
+
+    # Forwarding headers from anyone but the proxy are ignored
+    direct = TestClient(app, client=("192.0.2.10", 50000))
+    assert direct.get("/", headers={"X-Forwarded-For": "192.0.2.99"}).status_code == 200
+    assert direct.get("/", headers={"X-Forwarded-For": "192.0.2.100"}).status_code == 429
+
+
+def test_limits_are_not_checked_on_the_event_loop(client: TestClient, monkeypatch):
+    threads = []
+
+    def recording_hit_limits(limiters, client_id):
+        try:
+            asyncio.get_running_loop()
+            threads.append("event loop")
+        except RuntimeError:
+            threads.append("thread")
+        return hit_limits(limiters, client_id)
+
+    monkeypatch.setattr(security_middleware, "hit_limits", recording_hit_limits)
+
+    assert client.get("/").status_code == 200
+    assert threads == ["thread"]
@@ -0,0 +1,70 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1.schemas.user import UserUpdate
+from app.core import security
+from app.core.security import create_access_token
+from app.db.models import Agent
+from app.services import user_service
+
+
+def _agent(db_session: Session) -> Agent:
+    agent = Agent(nom_agent="Cached Agent", identifiant="cached", mot_de_passe="!", role="agent")
+    db_session.add(agent)
+    db_session.commit()
+    return agent
+
+
+def test_current_user_is_served_from_cache(client: TestClient, db_session: Session):
+    agent = _agent(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(agent.identifiant)}"}
+    assert client.get("/users/me", headers=headers).json()["role"] == "agent"
+
+    # Changed behind the service's back, so the cached principal is still used
+    agent.role = "admin"
+    db_session.commit()
+
+    response = client.get("/users/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id_agent": agent.id_agent, "nom_agent": "Cached Agent", "identifiant": "cached",
+        "role": "agent", "is_active": True,
+    }
+
+
+def test_update_and_delete_user_invalidate_the_cached_principal(client: TestClient, db_session: Session):
+    agent = _agent(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(agent.identifiant)}"}
+    client.get("/users/me", headers=headers)
+
+    user_service.update_user(db_session, agent.id_agent, UserUpdate(role="supervisor"))
+    assert client.get("/users/me", headers=headers).json()["role"] == "supervisor"
+
+    user_service.delete_user(db_session, agent.id_agent)
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+
+def test_principal_cache_is_not_called_on_the_event_loop(client: TestClient, db_session: Session, monkeypatch):
+    calls = []
+
+    def off_loop(call):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                calls.append("event loop")
+            except RuntimeError:
+                calls.append("thread")
+            return call(*args)
+        return wrapper
+
+    monkeypatch.setattr(security, "cache_get", off_loop(security.cache_get))
+    monkeypatch.setattr(security, "cache_set", off_loop(security.cache_set))
+    agent = _agent(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(agent.identifiant)}"}
+
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    assert calls == ["thread", "thread"]
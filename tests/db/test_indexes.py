@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# EXPLAIN plans are only meaningful on the production database engine, so these
+# tests run against a disposable PostgreSQL database when one is configured.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+# Enough rows, spread like production data, that the planner prefers the
+# indexes on its own: 200 campaigns, 50k contacts, 200k messages and a 200k
+# row queue of which 1% is still pending.
+SEED_STATEMENTS = [
+    "INSERT INTO agents (id_agent, nom_agent, identifiant, mot_de_passe, role) "
+    "VALUES (1, 'Seed', 'seed', 'x', 'admin')",
+    "INSERT INTO campagnes (id_campagne, nom_campagne, date_debut, date_fin, statut, type_campagne, id_agent) "
+    "SELECT g, 'Campaign ' || g, now(), now() + interval '30 days', "
+    "CASE WHEN g % 10 = 0 THEN 'active' ELSE 'completed' END, 'promotional', 1 "
+    "FROM generate_series(1, 200) g",
+    "INSERT INTO mailing_lists (id_liste, nom_liste, id_campagne) "
+    "SELECT g, 'List ' || g, g FROM generate_series(1, 200) g",
+    "INSERT INTO contacts (id_contact, nom, prenom, numero_telephone, statut_opt_in, segment, zone_geographique) "
+    "SELECT g, 'Nom', 'Prenom', '+33' || g, g % 5 <> 0, 'segment-' || (g % 25), 'zone-' || (g % 40) "
+    "FROM generate_series(1, 50000) g",
+    "INSERT INTO messages (contenu, date_envoi, statut_livraison, identifiant_expediteur, id_liste, id_contact, id_campagne) "
+    "SELECT 'Hello', now() - (g % 180) * interval '1 day', "
+    "(ARRAY['sent', 'delivered', 'delivered', 'delivered', 'failed'])[g % 5 + 1], 'seed', "
+    "g % 200 + 1, g % 50000 + 1, g % 200 + 1 "
+    "FROM generate_series(1, 200000) g",
+    "INSERT INTO sms_queue (campaign_id, contact_id, message_content, scheduled_at, status, priority) "
+    "SELECT g % 200 + 1, g % 50000 + 1, 'Hello', now() - (g % 1000) * interval '1 minute', "
+    "CASE WHEN g % 97 = 0 THEN 'pending' ELSE 'sent' END, g % 3 "
+    "FROM generate_series(1, 200000) g",
+]
+
+
+def _reset_schema(engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+
+
+def _upgrade_to_head(url: str) -> None:
+    """Builds the schema the way production does, with `alembic upgrade head`."""
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    # alembic/env.py migrates the configured DATABASE_URL
+    original_url = settings.DATABASE_URL
+    settings.DATABASE_URL = url
+    try:
+        command.upgrade(config, "head")
+    finally:
+        settings.DATABASE_URL = original_url
+
+
+@pytest.fixture(scope="module")
+def pg_connection():
+    engine = create_engine(POSTGRES_URL)
+    _reset_schema(engine)
+    _upgrade_to_head(POSTGRES_URL)
+    with engine.begin() as connection:
+        for statement in SEED_STATEMENTS:
+            connection.execute(text(statement))
+    # VACUUM, as autovacuum would have, so that index-only scans are costed
+    # with a populated visibility map
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE"))
+        yield connection
+    _reset_schema(engine)
+    engine.dispose()
+
+
+def _plan(connection, sql: str) -> str:
+    rows = connection.execute(text(f"EXPLAIN {sql}")).all()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "sql, expected_index",
+    [
+        (
+            "SELECT id FROM sms_queue WHERE status = 'pending' AND scheduled_at <= now() "
+            "ORDER BY scheduled_at, id LIMIT 100",
+            "idx_sms_queue_pending_scheduled",
+        ),
+        (
+            "SELECT id_campagne FROM campagnes WHERE statut = 'active' AND EXISTS ("
+            "SELECT 1 FROM sms_queue WHERE sms_queue.campaign_id = campagnes.id_campagne "
+            "AND status = 'pending' AND priority = 1 AND scheduled_at <= now())",
+            "idx_sms_queue_campaign_pending",
+        ),
+        (
+            "SELECT id FROM sms_queue WHERE status = 'pending' AND scheduled_at <= now() "
+            "AND priority = 1 AND campaign_id = 10 ORDER BY scheduled_at, id LIMIT 50 FOR UPDATE SKIP LOCKED",
+            "idx_sms_queue_campaign_pending",
+        ),
+        (
+            "SELECT statut_livraison, count(*) FROM messages WHERE id_campagne = 1 GROUP BY statut_livraison",
+            "idx_messages_campaign_status",
+        ),
+        (
+            "SELECT date(date_envoi), count(*) FROM messages WHERE id_campagne = 1 "
+            "AND date_envoi >= now() - interval '7 days' GROUP BY 1",
+            "idx_messages_campaign_date",
+        ),
+        (
+            "SELECT id_contact FROM contacts WHERE segment = 'segment-1' AND zone_geographique = 'zone-1' "
+            "AND statut_opt_in = true",
+            "idx_contacts_segment_zone_opt_in",
+        ),
+    ],
+)
+def test_hot_queries_use_composite_indexes(pg_connection, sql, expected_index):
+    plan = _plan(pg_connection, sql)
+    assert expected_index in plan, plan
@@ -0,0 +1,86 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.profiler import parameter_shape, profile_engine, profile_queries
+from app.middleware.profiling_middleware import query_profiling_middleware
+
+
+@pytest.fixture
+def profiled_engine(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "QUERY_PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "QUERY_PROFILING_N_PLUS_ONE_THRESHOLD", 3)
+    engine = create_engine("sqlite://")
+    profile_engine(engine)
+    return engine
+
+
+def test_profile_counts_statements_and_flags_repeated_shapes(profiled_engine, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.db.profiler"):
+        with profile_queries("test") as profile, profiled_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            for i in range(3):
+                conn.execute(text("SELECT :id"), {"id": i})
+
+    assert profile.count == 4
+    assert profile.shapes["SELECT ?"] == 3
+    assert "Possible N+1 in test: statement ran 3 times: SELECT ?" in caplog.text
+
+
+def test_slow_queries_are_logged_without_parameter_values(profiled_engine, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.profiler"):
+        with profiled_engine.connect() as conn:
+            conn.execute(text("SELECT :phone"), {"phone": "+33612345678"})
+
+    assert "Slow query" in caplog.text
+    assert "params=(str)" in caplog.text
+    assert "+33612345678" not in caplog.text
+
+
+def test_failed_statements_leave_nothing_on_the_connection(profiled_engine):
+    with profile_queries("test") as profile, profiled_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info == {}
+
+    assert profile.count == 1
+
+
+def test_parameter_shape_describes_executemany():
+    assert parameter_shape([{"id": 1}, {"id": 2}], executemany=True) == "2 x {id: int}"
+
+
+def test_middleware_adds_server_timing_header(profiled_engine):
+    app = FastAPI()
+    app.middleware("http")(query_profiling_middleware)
+
+    @app.get("/items")
+    def items():
+        with profiled_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return []
+
+    response = TestClient(app).get("/items")
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+
+def test_middleware_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_PROFILING_ENABLED", False)
+    app = FastAPI()
+    app.middleware("http")(query_profiling_middleware)
+    app.get("/items")(lambda: [])
+
+    response = TestClient(app).get("/items")
+
+    assert "Server-Timing" not in response.headers
@@ -1,6 +1,8 @@
 import pytest
 from sqlalchemy.orm import Session
 from app.services.campaign_execution_service import CampaignExecutionService
+from app.api.v1.schemas.campaign import CampaignLaunchOptions
+from app.services.queue_service import PRIORITY_BULK
 from app.db.models import Campaign, Contact, MailingList, MessageTemplate, SMSQueue
 from datetime import datetime
 
@@ -42,6 +44,7 @@ def test_launch_campaign_success(db_session: Session, mock_draft_campaign: Campa
     queue_item = db_session.query(SMSQueue).filter_by(campaign_id=campaign_id).one()
     assert queue_item is not None
     assert queue_item.status == 'pending'
+    assert queue_item.priority == PRIORITY_BULK  # promotional campaigns use the bulk lane
 
 def test_launch_campaign_not_in_draft(db_session: Session, mock_draft_campaign: Campaign):
     # --- Setup ---
@@ -80,3 +83,73 @@ def test_launch_campaign_invalid_requirements(db_session: Session):
     # --- Assert ---
     assert result["success"] is False
     assert "must have a template and at least one mailing list" in result["message"]
+
+def test_launch_campaign_with_dynamic_list(db_session: Session):
+    # --- Setup ---
+    template = MessageTemplate(nom_modele="Dynamic Template", contenu_modele="Hi {prenom}!")
+    vip = Contact(nom="Dyn", prenom="Vip", numero_telephone="+33611223355", segment="VIP")
+    vip_opted_out = Contact(nom="Dyn", prenom="Out", numero_telephone="+33611223366", segment="VIP", statut_opt_in=False)
+    standard = Contact(nom="Dyn", prenom="Std", numero_telephone="+33611223377", segment="Standard")
+    mailing_list = MailingList(nom_liste="Dynamic VIPs", filter_criteria={"segment": "VIP"})
+    campaign = Campaign(
+        nom_campagne="Dynamic Campaign",
+        template=template,
+        mailing_lists=[mailing_list],
+        statut="draft",
+        date_debut=datetime(2025, 1, 1), date_fin=datetime(2025, 1, 31),
+        type_campagne="promotional", id_agent=1
+    )
+    db_session.add_all([template, vip, vip_opted_out, standard, mailing_list, campaign])
+    db_session.commit()
+
+    # --- Execute ---
+    result = CampaignExecutionService(db=db_session).launch_campaign(campaign_id=campaign.id_campagne)
+
+    # --- Assert ---
+    assert result["success"] is True
+    assert result["queued_count"] == 1
+    queue_item = db_session.query(SMSQueue).filter_by(campaign_id=campaign.id_campagne).one()
+    assert queue_item.contact_id == vip.id_contact
+
+def test_launch_campaign_throttles_scheduled_at(db_session: Session):
+    # --- Setup ---
+    template = MessageTemplate(nom_modele="Throttle Template", contenu_modele="Hi {prenom}!")
+    contacts = [
+        Contact(nom="Thr", prenom=f"C{i}", numero_telephone=f"+3361122340{i}")
+        for i in range(3)
+    ]
+    mailing_list = MailingList(nom_liste="Throttle List", contacts=contacts)
+    campaign = Campaign(
+        nom_campagne="Throttled Campaign",
+        template=template,
+        mailing_lists=[mailing_list],
+        statut="draft",
+        date_debut=datetime(2025, 1, 1), date_fin=datetime(2025, 1, 31),
+        type_campagne="promotional", id_agent=1
+    )
+    db_session.add_all([template, *contacts, mailing_list, campaign])
+    db_session.commit()
+
+    # --- Execute ---
+    result = CampaignExecutionService(db=db_session).launch_campaign(
+        campaign_id=campaign.id_campagne,
+        options=CampaignLaunchOptions(rate_per_minute=60),
+    )
+
+    # --- Assert ---
+    assert result["success"] is True
+    items = db_session.query(SMSQueue).filter_by(campaign_id=campaign.id_campagne).order_by(SMSQueue.id).all()
+    gaps = [(b.scheduled_at - a.scheduled_at).total_seconds() for a, b in zip(items, items[1:])]
+    assert gaps == [1.0, 1.0]
+
+def test_launch_campaign_invalid_send_window(db_session: Session, mock_draft_campaign: Campaign):
+    service = CampaignExecutionService(db=db_session)
+
+    result = service.launch_campaign(
+        campaign_id=mock_draft_campaign.id_campagne,
+        options=CampaignLaunchOptions(timezone="Mars/Olympus"),
+    )
+
+    assert result["success"] is False
+    db_session.refresh(mock_draft_campaign)
+    assert mock_draft_campaign.statut == "draft"
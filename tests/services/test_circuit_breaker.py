@@ -0,0 +1,66 @@
+import time
+import pytest
+from app.core.cache import local_cache
+from app.services.sms_providers.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+)
+
+@pytest.fixture
+def breaker():
+    """A breaker on in-process state (Redis is disabled in tests) that trips quickly."""
+    local_cache.clear()
+    yield CircuitBreaker(
+        "test", failure_rate=0.5, min_calls=4, window_seconds=60,
+        slow_call_seconds=0.05, open_seconds=0.1,
+    )
+    local_cache.clear()
+
+def _fail():
+    raise ConnectionError("provider down")
+
+def test_opens_once_failure_rate_is_reached(breaker):
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+
+    assert breaker.state() == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+def test_stays_closed_below_min_calls(breaker):
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+    assert breaker.state() == CLOSED
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(4):
+        breaker.call(time.sleep, 0.06)
+    assert breaker.state() == OPEN
+
+def test_ignored_errors_do_not_trip(breaker):
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            breaker.call(lambda: int("x"), is_failure=lambda e: False)
+    assert breaker.state() == CLOSED
+
+def test_half_open_allows_a_single_probe(breaker):
+    breaker.trip()
+    time.sleep(0.15)
+
+    assert breaker.state() == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+def test_successful_probe_closes_and_failed_probe_reopens(breaker):
+    breaker.trip()
+    time.sleep(0.15)
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+    assert breaker.state() == OPEN
+
+    time.sleep(0.15)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state() == CLOSED
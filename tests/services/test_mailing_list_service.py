@@ -1,8 +1,11 @@
 import pytest
 from sqlalchemy.orm import Session
+from app.services import contact_service
 from app.services.mailing_list_service import MailingListService
-from app.db.models import MailingList, Contact, MessageTemplate, Campaign
-from app.api.v1.schemas.mailing_list import MailingListCreate, MailingListUpdate
+from fastapi import HTTPException
+from app.db.models import MailingList, Contact, MessageTemplate, Campaign, liste_contacts
+from app.api.v1.schemas.contact import ContactUpdate
+from app.api.v1.schemas.mailing_list import MailingListCreate, MailingListUpdate, ContactFilter
 from datetime import datetime, timezone
 
 @pytest.fixture
@@ -106,3 +109,97 @@ def test_preview_campaign_for_list(db_session: Session, setup_contacts_and_list)
     personalized_messages = {p['personalized_message'] for p in previews}
     assert "Hi User1" in personalized_messages
     assert "Hi User2" in personalized_messages
+
+def test_get_list_statistics_distributions(db_session: Session, setup_contacts_and_list):
+    mailing_list, contacts = setup_contacts_and_list
+    contacts[0].segment = "VIP"
+    contacts[0].zone_geographique = "Paris"
+    contacts[1].segment = "VIP"
+    contacts[1].type_client = "B2B"
+    contacts[2].statut_opt_in = False
+    db_session.commit()
+
+    service = MailingListService(db=db_session)
+    stats = service.get_list_statistics(mailing_list.id_liste)
+
+    assert stats.total_contacts == 3
+    assert stats.opt_out_contacts == 1
+    assert stats.segments == {"VIP": 2}
+    assert stats.zones == {"Paris": 1}
+    assert stats.contact_types == {"B2B": 1}
+
+def test_list_statistics_cache_invalidated_on_membership_change(db_session: Session, setup_contacts_and_list):
+    mailing_list, contacts = setup_contacts_and_list
+    service = MailingListService(db=db_session)
+
+    assert service.get_list_statistics(mailing_list.id_liste).total_contacts == 3
+
+    service.remove_contacts_from_list(mailing_list.id_liste, [contacts[0].id_contact])
+    assert service.get_list_statistics(mailing_list.id_liste).total_contacts == 2
+
+    service.add_contacts_to_list(mailing_list.id_liste, [contacts[0].id_contact])
+    assert service.get_list_statistics(mailing_list.id_liste).total_contacts == 3
+
+def test_list_statistics_cache_invalidated_on_contact_change(db_session: Session, setup_contacts_and_list):
+    mailing_list, contacts = setup_contacts_and_list
+    service = MailingListService(db=db_session)
+
+    assert service.get_list_statistics(mailing_list.id_liste).opt_out_contacts == 0
+
+    contact_service.bulk_update_opt_status(db_session, [contacts[0].id_contact], False)
+    assert service.get_list_statistics(mailing_list.id_liste).opt_out_contacts == 1
+
+    update = ContactUpdate(nom="List", prenom="User2", numero_telephone="100000002", segment="VIP")
+    contact_service.update_contact(db_session, contacts[1].id_contact, update)
+    assert service.get_list_statistics(mailing_list.id_liste).segments == {"VIP": 1}
+
+    contact_service.delete_contact(db_session, contacts[2].id_contact)
+    assert service.get_list_statistics(mailing_list.id_liste).total_contacts == 2
+
+def test_dynamic_list_membership_follows_filter(db_session: Session, setup_contacts_and_list):
+    mailing_list, contacts = setup_contacts_and_list
+    contacts[0].segment = "VIP"
+    contacts[1].segment = "VIP"
+    db_session.commit()
+
+    service = MailingListService(db=db_session)
+    dynamic_list = service.create_list(MailingListCreate(
+        nom_liste="VIPs",
+        id_campagne=mailing_list.id_campagne,
+        filter_criteria=ContactFilter(segment="VIP")
+    ))
+
+    assert dynamic_list.is_dynamic
+    assert service.get_list_statistics(dynamic_list.id_liste).total_contacts == 2
+    assert service.get_list_summary(dynamic_list.id_liste)["contact_count"] == 2
+    page = service.get_list_contacts(dynamic_list.id_liste)
+    assert [c.id_contact for c in page["items"]] == [contacts[0].id_contact, contacts[1].id_contact]
+
+    # Nothing is written to the association table for dynamic lists
+    assert db_session.query(liste_contacts).filter(liste_contacts.c.id_liste == dynamic_list.id_liste).count() == 0
+
+def test_dynamic_list_rejects_an_empty_filter(db_session: Session, setup_contacts_and_list):
+    mailing_list, _ = setup_contacts_and_list
+    service = MailingListService(db=db_session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.create_list(MailingListCreate(
+            nom_liste="Everyone",
+            id_campagne=mailing_list.id_campagne,
+            filter_criteria=ContactFilter()
+        ))
+    assert exc_info.value.status_code == 422
+    assert service.get_all_lists() == [mailing_list]
+
+def test_dynamic_list_rejects_direct_membership_edits(db_session: Session, setup_contacts_and_list):
+    mailing_list, contacts = setup_contacts_and_list
+    service = MailingListService(db=db_session)
+    dynamic_list = service.create_list(MailingListCreate(
+        nom_liste="Paris",
+        id_campagne=mailing_list.id_campagne,
+        filter_criteria=ContactFilter(zone_geographique="Paris")
+    ))
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.add_contacts_to_list(dynamic_list.id_liste, [contacts[0].id_contact])
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,233 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from app.services.queue_service import QueueService, MAX_SEND_ATTEMPTS, PRIORITY_HIGH, PRIORITY_BULK
+from app.db.models import Campaign, Contact, SMSQueue
+from app.tasks.campaign_tasks import auto_complete_campaigns
+
+@pytest.fixture
+def queue_campaign(db_session: Session):
+    """Creates an active campaign and a contact to attach queue items to."""
+    contact = Contact(nom="Queue", prenom="Claim", numero_telephone="+33700000001")
+    campaign = Campaign(
+        nom_campagne="Queue Campaign",
+        date_debut=datetime.now(timezone.utc), date_fin=datetime.now(timezone.utc),
+        statut="active", type_campagne="promotional", id_agent=1
+    )
+    db_session.add_all([contact, campaign])
+    db_session.commit()
+    return campaign, contact
+
+def _enqueue(db_session, campaign, contact, scheduled_at, status="pending", priority=1):
+    item = SMSQueue(
+        campaign_id=campaign.id_campagne, contact_id=contact.id_contact,
+        message_content="Hi", scheduled_at=scheduled_at, status=status, priority=priority
+    )
+    db_session.add(item)
+    db_session.commit()
+    return item.id
+
+def test_claim_skips_items_scheduled_in_the_future(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    due_id = _enqueue(db_session, campaign, contact, now - timedelta(minutes=1))
+    future_id = _enqueue(db_session, campaign, contact, now + timedelta(hours=1))
+
+    claimed = QueueService.claim_pending_items(db_session, batch_size=10)
+
+    assert [item.id for item in claimed] == [due_id]
+    assert db_session.get(SMSQueue, due_id).status == "processing"
+    assert db_session.get(SMSQueue, future_id).status == "pending"
+
+def test_claim_orders_by_schedule_and_respects_batch_size(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    later_id = _enqueue(db_session, campaign, contact, now - timedelta(minutes=1))
+    earlier_id = _enqueue(db_session, campaign, contact, now - timedelta(minutes=5))
+    _enqueue(db_session, campaign, contact, now - timedelta(minutes=10), status="sent")
+
+    claimed = QueueService.claim_pending_items(db_session, batch_size=1)
+
+    assert [item.id for item in claimed] == [earlier_id]
+    assert db_session.get(SMSQueue, later_id).status == "pending"
+
+def test_lane_quotas_cover_the_whole_batch():
+    quotas = QueueService._lane_quotas(100)
+    assert quotas == {0: 60, 1: 30, 2: 10}
+    assert sum(QueueService._lane_quotas(7).values()) == 7
+
+def test_high_priority_lane_is_not_starved_by_bulk(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    recent = datetime.now(timezone.utc) - timedelta(seconds=1)
+    bulk_ids = [_enqueue(db_session, campaign, contact, old, priority=PRIORITY_BULK) for _ in range(10)]
+    urgent_id = _enqueue(db_session, campaign, contact, recent, priority=PRIORITY_HIGH)
+
+    claimed = QueueService.claim_pending_items(db_session, batch_size=5)
+
+    claimed_ids = [item.id for item in claimed]
+    assert urgent_id in claimed_ids
+    # The bulk lane backfills the capacity the high lane did not use
+    assert len(claimed_ids) == 5
+    assert set(claimed_ids) - {urgent_id} <= set(bulk_ids)
+
+def test_concurrent_campaigns_share_the_batch(db_session: Session, queue_campaign):
+    first_campaign, contact = queue_campaign
+    second_campaign = Campaign(
+        nom_campagne="Second Queue Campaign",
+        date_debut=datetime.now(timezone.utc), date_fin=datetime.now(timezone.utc),
+        statut="active", type_campagne="promotional", id_agent=1
+    )
+    db_session.add(second_campaign)
+    db_session.commit()
+
+    # The first campaign enqueued a large backlog before the second one launched
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    for _ in range(20):
+        _enqueue(db_session, first_campaign, contact, old)
+    for _ in range(5):
+        _enqueue(db_session, second_campaign, contact, datetime.now(timezone.utc))
+
+    claimed = QueueService.claim_pending_items(db_session, batch_size=10)
+
+    claimed_campaigns = [item.campaign_id for item in claimed]
+    assert len(claimed) == 10
+    assert claimed_campaigns.count(second_campaign.id_campagne) >= 3
+    # Items come back interleaved rather than one campaign after the other
+    assert claimed_campaigns[0] != claimed_campaigns[1]
+
+def test_claim_skips_paused_campaigns(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    item_id = _enqueue(db_session, campaign, contact, datetime.now(timezone.utc) - timedelta(minutes=1))
+    campaign.statut = "paused"
+    db_session.commit()
+
+    assert QueueService.claim_pending_items(db_session, batch_size=10) == []
+    assert db_session.get(SMSQueue, item_id).status == "pending"
+
+def test_claim_skips_campaigns_that_are_not_active(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    item_id = _enqueue(db_session, campaign, contact, datetime.now(timezone.utc) - timedelta(minutes=1))
+    campaign.statut = "completed"
+    db_session.commit()
+
+    assert QueueService.claim_pending_items(db_session, batch_size=10) == []
+    assert db_session.get(SMSQueue, item_id).status == "pending"
+
+def test_completing_a_campaign_expires_its_pending_items(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    pending_id = _enqueue(db_session, campaign, contact, now - timedelta(minutes=1))
+    sent_id = _enqueue(db_session, campaign, contact, now - timedelta(minutes=5), status="sent")
+    campaign_id = campaign.id_campagne
+    campaign.date_fin = now - timedelta(days=1)
+    db_session.commit()
+
+    with patch("app.tasks.campaign_tasks.WorkerSessionLocal", return_value=db_session):
+        auto_complete_campaigns()
+
+    assert db_session.get(Campaign, campaign_id).statut == "completed"
+    expired = db_session.get(SMSQueue, pending_id)
+    assert (expired.status, expired.retryable) == ("failed", False)
+    assert db_session.get(SMSQueue, sent_id).status == "sent"
+    health = QueueService.get_queue_health(db_session)
+    assert health["by_campaign"] == []
+    assert health["oldest_pending_age_seconds"] is None
+    assert QueueService.requeue_failed_items(db_session, chunk_size=10, max_items=10) == 0
+
+def test_backfill_does_not_probe_exhausted_campaigns_again(db_session: Session, queue_campaign, monkeypatch):
+    campaign, contact = queue_campaign
+    for _ in range(3):
+        _enqueue(db_session, campaign, contact, datetime.now(timezone.utc) - timedelta(minutes=1))
+    probes = []
+    original = QueueService._claim_lane
+
+    def counting_claim_lane(db, now, lane, quota, claimed_ids, campaign_ids):
+        probes.extend(campaign_ids)
+        return original(db, now, lane, quota, claimed_ids, campaign_ids)
+    monkeypatch.setattr(QueueService, "_claim_lane", staticmethod(counting_claim_lane))
+
+    claimed = QueueService.claim_pending_items(db_session, batch_size=100)
+
+    assert len(claimed) == 3
+    # One probe for the lane quota; the campaign ran out, so no backfill rounds
+    assert probes == [campaign.id_campagne]
+
+def test_transient_failure_is_rescheduled_with_backoff(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    item = db_session.get(SMSQueue, _enqueue(db_session, campaign, contact, now))
+
+    QueueService.record_send_failure(item, "Service unavailable", transient=True, now=now)
+    first_delay = (item.scheduled_at - now).total_seconds()
+    QueueService.record_send_failure(item, "Service unavailable", transient=True, now=now)
+    second_delay = (item.scheduled_at - now).total_seconds()
+
+    assert item.status == "pending"
+    assert item.attempts == 2
+    assert 15 <= first_delay <= 30
+    assert 30 <= second_delay <= 60
+
+def test_permanent_failure_is_not_retried(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    item = db_session.get(SMSQueue, _enqueue(db_session, campaign, contact, now))
+
+    QueueService.record_send_failure(item, "Invalid 'To' number", transient=False, now=now)
+    db_session.commit()
+
+    assert item.status == "failed"
+    assert item.retryable is False
+    assert QueueService.requeue_failed_items(db_session, chunk_size=10, max_items=10) == 0
+
+def test_requeue_failed_items_is_chunked_and_bounded(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    ids = [_enqueue(db_session, campaign, contact, now, status="failed") for _ in range(5)]
+
+    requeued = QueueService.requeue_failed_items(db_session, chunk_size=2, max_items=3)
+
+    assert requeued == 3
+    statuses = [db_session.get(SMSQueue, item_id).status for item_id in ids]
+    assert statuses == ["pending"] * 3 + ["failed"] * 2
+    # A requeued item gets exactly one more attempt
+    assert db_session.get(SMSQueue, ids[0]).attempts == MAX_SEND_ATTEMPTS - 1
+
+def test_requeued_item_that_fails_again_is_not_requeued_by_the_next_sweep(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    item_id = _enqueue(db_session, campaign, contact, now, status="failed")
+
+    assert QueueService.requeue_failed_items(db_session, chunk_size=10, max_items=10) == 1
+    item = db_session.get(SMSQueue, item_id)
+    QueueService.record_send_failure(item, "Service unavailable", transient=True, now=now)
+    db_session.commit()
+
+    assert item.status == "failed"
+    assert item.attempts == MAX_SEND_ATTEMPTS
+    assert QueueService.requeue_failed_items(db_session, chunk_size=10, max_items=10) == 0
+
+def test_queue_health_reports_backlog_lag_and_send_rates(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    now = datetime.now(timezone.utc)
+    _enqueue(db_session, campaign, contact, now - timedelta(minutes=10))
+    _enqueue(db_session, campaign, contact, now + timedelta(hours=1))
+    _enqueue(db_session, campaign, contact, now, status="sent")
+    QueueService.record_sent(30, now=now - timedelta(minutes=1))
+    QueueService.record_sent(60, now=now - timedelta(minutes=4))
+    QueueService.record_sent(99, now=now)  # current minute, not complete yet
+
+    health = QueueService.get_queue_health(db_session, now=now)
+
+    assert health["by_status"] == {"pending": 2, "processing": 0, "sent": 1, "failed": 0}
+    assert health["by_campaign"] == [{"campaign_id": campaign.id_campagne, "pending": 2, "processing": 0}]
+    assert 599 <= health["oldest_pending_age_seconds"] <= 601
+    assert health["send_rate_per_minute"] == {"1m": 30.0, "5m": 18.0, "15m": 6.0}
+
+def test_queue_health_is_cached(db_session: Session, queue_campaign):
+    campaign, contact = queue_campaign
+    QueueService.get_queue_health(db_session)
+    _enqueue(db_session, campaign, contact, datetime.now(timezone.utc))
+
+    assert QueueService.get_queue_health(db_session)["by_status"]["pending"] == 0
@@ -0,0 +1,79 @@
+import time
+import httpx
+import pytest
+from urllib.parse import parse_qs
+from twilio.request_validator import RequestValidator
+from app.services.sms_providers.base import SmsProviderError
+from app.services.sms_providers.simulated_provider import SimulatedSmsProvider
+
+CALLBACK = "http://testserver/api/v1/sms-webhooks/twilio-status"
+
+def _quiet(**kwargs):
+    """A simulator with no latency and no callbacks unless asked for."""
+    options = {"latency_ms": 0, "callbacks_enabled": False, "seed": 1}
+    options.update(kwargs)
+    return SimulatedSmsProvider(**options)
+
+def test_error_rates_are_applied():
+    provider = _quiet(error_rate=0.2, permanent_error_rate=0.1)
+    transient = permanent = 0
+    for _ in range(1000):
+        try:
+            provider.send_sms("+33612345678", "Hi", CALLBACK)
+        except SmsProviderError as e:
+            transient += e.transient
+            permanent += not e.transient
+
+    assert 150 < transient < 250
+    assert 60 < permanent < 140
+
+def test_throttles_above_max_per_second(monkeypatch):
+    monkeypatch.setattr("app.services.sms_providers.simulated_provider.time.time", lambda: 1_000_000.0)
+    provider = _quiet(max_per_second=2)
+
+    provider.send_sms("+33612345678", "Hi", CALLBACK)
+    provider.send_sms("+33612345678", "Hi", CALLBACK)
+    with pytest.raises(SmsProviderError) as exc_info:
+        provider.send_sms("+33612345678", "Hi", CALLBACK)
+
+    assert exc_info.value.status == 429
+    assert exc_info.value.transient is True
+
+def test_posts_status_callback_matching_delivery_status():
+    received, signatures = [], []
+    provider = _quiet(callbacks_enabled=True, callback_delay_ms=10, auth_token="simtoken")
+
+    def handle(request):
+        received.append(parse_qs(request.content.decode()))
+        signatures.append(request.headers.get("X-Twilio-Signature"))
+        return httpx.Response(204)
+    provider._dispatcher._client = httpx.Client(transport=httpx.MockTransport(handle))
+
+    response = provider.send_sms("+33612345678", "Hi", CALLBACK)
+    deadline = time.monotonic() + 2
+    while provider.pending_callbacks() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(received) == 1
+    assert received[0]["MessageSid"] == [response["sid"]]
+    assert received[0]["MessageStatus"] == [provider.get_delivery_status(response["sid"])["status"]]
+    params = {name: values[0] for name, values in received[0].items()}
+    assert RequestValidator("simtoken").validate(CALLBACK, params, signatures[0])
+
+def test_same_seed_gives_the_same_sids_and_outcomes():
+    def run(seed):
+        provider = _quiet(seed=seed, error_rate=0.1, delivery_rate=0.5)
+        outcomes = []
+        for _ in range(50):
+            try:
+                sid = provider.send_sms("+33612345678", "Hi", CALLBACK)["sid"]
+                outcomes.append((sid, provider.get_delivery_status(sid)["status"]))
+            except SmsProviderError as e:
+                outcomes.append(e.status)
+        return outcomes
+
+    first = run(seed=7)
+
+    assert run(seed=7) == first
+    assert run(seed=8) != first
+    assert {"delivered", "undelivered"} <= {outcome[1] for outcome in first if isinstance(outcome, tuple)}
@@ -0,0 +1,30 @@
+from app.services.sms_providers.base import SmsProviderError
+from app.services.sms_providers.fake_provider import FakeSmsProvider
+
+CALLBACK = "http://test/callback"
+
+class PickyProvider(FakeSmsProvider):
+    """Rejects numbers ending in 0."""
+
+    def _send_sms(self, to_number, message, callback_url):
+        if to_number.endswith("0"):
+            raise SmsProviderError("Invalid number", status=400, transient=False)
+        return super()._send_sms(to_number, message, callback_url)
+
+def test_send_batch_returns_one_result_per_message_in_order():
+    provider = FakeSmsProvider()
+    messages = [{"to_number": f"+3361234567{i}", "message": f"Msg {i}"} for i in range(5)]
+
+    results = provider.send_batch(messages, callback_url=CALLBACK)
+
+    assert [r["status"] for r in results] == ["queued"] * 5
+    assert sorted(sent["to"] for sent in provider.sent) == [m["to_number"] for m in messages]
+
+def test_send_batch_returns_errors_instead_of_raising():
+    provider = PickyProvider()
+    messages = [{"to_number": number, "message": "Hi"} for number in ("+33612345671", "+33612345670", "+33612345672")]
+
+    results = provider.send_batch(messages, callback_url=CALLBACK)
+
+    assert isinstance(results[1], SmsProviderError)
+    assert results[0]["status"] == results[2]["status"] == "queued"
@@ -0,0 +1,174 @@
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.services.sms_providers.base import SmsProviderError
+from app.services.sms_providers.circuit_breaker import CircuitOpenError, OPEN
+from app.services.sms_providers.fake_provider import FakeSmsProvider
+from app.services.sms_providers.router import ProviderRoute, SmsRouter
+
+CALLBACK = "http://test/callback"
+
+def test_routes_to_cheapest_provider_for_destination():
+    cheap_fr, expensive = FakeSmsProvider(sender_id="+100"), FakeSmsProvider(sender_id="+200")
+    router = SmsRouter([
+        ProviderRoute("expensive", expensive, default_cost=0.10),
+        ProviderRoute("cheap_fr", cheap_fr, costs={"+33": 0.02}, default_cost=0.50),
+    ])
+
+    french = router.send_sms("+33612345678", "Bonjour", CALLBACK)
+    british = router.send_sms("+447700900000", "Hello", CALLBACK)
+
+    assert french["provider"] == "cheap_fr" and french["sender_id"] == "+100"
+    assert british["provider"] == "expensive"
+
+def test_only_routes_through_providers_serving_the_prefix():
+    us_only = FakeSmsProvider()
+    router = SmsRouter([ProviderRoute("us", us_only, prefixes=["+1"])])
+
+    with pytest.raises(SmsProviderError) as exc_info:
+        router.send_sms("+33612345678", "Bonjour", CALLBACK)
+
+    assert exc_info.value.transient is False
+    assert us_only.sent == []
+
+def test_fails_over_on_transient_error():
+    down = FakeSmsProvider(fail_with=SmsProviderError("503", status=503))
+    backup = FakeSmsProvider()
+    router = SmsRouter([
+        ProviderRoute("primary", down, default_cost=0.01),
+        ProviderRoute("backup", backup, default_cost=0.05),
+    ])
+
+    response = router.send_sms("+33612345678", "Bonjour", CALLBACK)
+
+    assert response["provider"] == "backup"
+    assert len(backup.sent) == 1
+    assert router.routes[0].success_rate < 1.0
+
+def test_permanent_error_is_not_failed_over():
+    rejecting = FakeSmsProvider(fail_with=SmsProviderError("Invalid number", status=400, transient=False))
+    backup = FakeSmsProvider()
+    router = SmsRouter([
+        ProviderRoute("primary", rejecting, default_cost=0.01),
+        ProviderRoute("backup", backup, default_cost=0.05),
+    ])
+
+    with pytest.raises(SmsProviderError):
+        router.send_sms("+33612345678", "Bonjour", CALLBACK)
+    assert backup.sent == []
+
+def test_low_success_rate_makes_a_route_lose_to_a_pricier_one():
+    flaky, steady = FakeSmsProvider(), FakeSmsProvider()
+    router = SmsRouter([
+        ProviderRoute("flaky", flaky, default_cost=0.04),
+        ProviderRoute("steady", steady, default_cost=0.05),
+    ])
+    router.routes[0].success_rate = 0.5
+
+    assert router.send_sms("+33612345678", "Bonjour", CALLBACK)["provider"] == "steady"
+
+def test_route_without_headroom_is_tried_last(monkeypatch):
+    monkeypatch.setattr("app.services.sms_providers.router.time.time", lambda: 1_000_000.0)
+    limited, other = FakeSmsProvider(), FakeSmsProvider()
+    router = SmsRouter([
+        ProviderRoute("limited", limited, default_cost=0.01, max_per_second=1),
+        ProviderRoute("other", other, default_cost=0.05),
+    ])
+
+    providers = [router.send_sms("+33612345678", "Bonjour", CALLBACK)["provider"] for _ in range(2)]
+
+    assert providers == ["limited", "other"]
+
+def test_raises_circuit_open_when_every_provider_is_down():
+    class OpenBreaker:
+        def state(self):
+            return OPEN
+
+    router = SmsRouter([ProviderRoute("only", FakeSmsProvider(circuit_breaker=OpenBreaker()))])
+
+    assert router.circuit_state() == OPEN
+    with pytest.raises(CircuitOpenError):
+        router.send_sms("+33612345678", "Bonjour", CALLBACK)
+
+def test_router_and_twilio_http_client_are_reused(monkeypatch):
+    from app.services.sms_providers import router as router_module
+    from app.services.sms_providers.twilio_provider import TwilioProvider, get_twilio_http_client
+    monkeypatch.setattr(router_module, "_router", None)
+
+    first = router_module.get_sms_router()
+
+    assert router_module.get_sms_router() is first
+    assert TwilioProvider().client.http_client is get_twilio_http_client()
+
+class TwilioAdapter(HTTPAdapter):
+    """Answers message creation with a SID derived from the recipient."""
+
+    def send(self, request, **kwargs):
+        to_number = parse_qs(request.body)["To"][0]
+        response = requests.Response()
+        response.status_code = 201
+        response._content = json.dumps({"sid": f"SM{to_number[1:]}", "status": "queued"}).encode()
+        response.headers["Content-Type"] = "application/json"
+        response.request, response.url = request, request.url
+        return response
+
+def test_concurrent_twilio_sends_each_get_their_own_response(monkeypatch):
+    from app.services.sms_providers import twilio_provider
+
+    class RacyHttpClient(twilio_provider.SharedTwilioHttpClient):
+        # Widens the window in which a response stored on the client is
+        # overwritten by another thread's before being returned
+        def __setattr__(self, name, value):
+            super().__setattr__(name, value)
+            if name == "_test_only_last_response":
+                time.sleep(0.005)
+
+    http_client = RacyHttpClient()
+    http_client.session.mount("https://", TwilioAdapter())
+    monkeypatch.setattr(twilio_provider, "_http_client", http_client)
+    monkeypatch.setattr(twilio_provider, "_http_client_pid", os.getpid())
+    monkeypatch.setattr(settings, "SMS_SEND_CONCURRENCY", 8)
+    numbers = [f"+336000000{i:02d}" for i in range(40)]
+
+    results = twilio_provider.TwilioProvider().send_batch(
+        [{"to_number": number, "message": "Bonjour"} for number in numbers], CALLBACK
+    )
+
+    assert [result["sid"] for result in results] == [f"SM{number[1:]}" for number in numbers]
+
+class FailingAdapter(HTTPAdapter):
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+    def send(self, request, **kwargs):
+        raise self.error
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (requests.ConnectionError("Connection refused"), True),
+        (requests.ConnectTimeout("Connect timed out"), True),
+        (requests.ReadTimeout("Read timed out"), False),
+        (requests.exceptions.ChunkedEncodingError("Connection broken"), False),
+    ],
+)
+def test_only_twilio_requests_that_never_reached_the_api_are_transient(monkeypatch, error, transient):
+    from app.services.sms_providers import twilio_provider
+
+    http_client = twilio_provider.SharedTwilioHttpClient()
+    http_client.session.mount("https://", FailingAdapter(error))
+    monkeypatch.setattr(twilio_provider, "_http_client", http_client)
+    monkeypatch.setattr(twilio_provider, "_http_client_pid", os.getpid())
+
+    with pytest.raises(twilio_provider.TwilioApiError) as exc_info:
+        twilio_provider.TwilioProvider()._send_sms("+33612345678", "Bonjour", CALLBACK)
+
+    assert exc_info.value.transient is transient
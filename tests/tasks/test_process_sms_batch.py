@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services import campaign_service
+from app.tasks.sms_tasks import process_sms_batch
+from app.db.models import Campaign, Contact, MailingList, Message, SMSQueue
+from app.services.sms_providers.base import SmsProviderError
+from app.services.sms_providers.fake_provider import FakeSmsProvider
+
+def _queue_messages(db_session: Session, count: int):
+    contacts = [Contact(nom="Batch", prenom=f"C{i}", numero_telephone=f"+3371234500{i}") for i in range(count)]
+    campaign = Campaign(
+        nom_campagne="Batch Campaign", date_debut=datetime.now(timezone.utc), date_fin=datetime.now(timezone.utc),
+        statut="active", type_campagne="promotional", id_agent=1
+    )
+    mailing_list = MailingList(nom_liste="Batch List", campaign=campaign, contacts=contacts)
+    db_session.add_all([*contacts, campaign, mailing_list])
+    db_session.commit()
+    items = [
+        SMSQueue(campaign_id=campaign.id_campagne, contact_id=contact.id_contact, message_content="Go", scheduled_at=datetime.now(timezone.utc))
+        for contact in contacts
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return [item.id for item in items]
+
+def test_process_sms_batch_sends_the_whole_batch(db_session: Session):
+    item_ids = _queue_messages(db_session, 3)
+    provider = FakeSmsProvider()
+
+    with patch("app.tasks.sms_tasks.WorkerSessionLocal", return_value=db_session), \
+         patch("app.tasks.sms_tasks.get_sms_router", return_value=provider):
+        process_sms_batch()
+
+    assert len(provider.sent) == 3
+    assert all(db_session.get(SMSQueue, item_id).status == "sent" for item_id in item_ids)
+    messages = db_session.query(Message).all()
+    assert {m.external_message_id for m in messages} == {sent["sid"] for sent in provider.sent}
+    assert all(m.identifiant_expediteur == provider.sender_id for m in messages)
+
+def test_process_sms_batch_reschedules_transient_failures(db_session: Session):
+    (item_id,) = _queue_messages(db_session, 1)
+    provider = FakeSmsProvider(fail_with=SmsProviderError("Service unavailable", status=503))
+
+    with patch("app.tasks.sms_tasks.WorkerSessionLocal", return_value=db_session), \
+         patch("app.tasks.sms_tasks.get_sms_router", return_value=provider):
+        process_sms_batch()
+
+    item = db_session.get(SMSQueue, item_id)
+    assert item.status == "pending"
+    assert item.attempts == 1
+    assert db_session.query(Message).count() == 0
+
+def test_process_sms_batch_does_not_strand_items_when_the_batch_send_raises(db_session: Session):
+    item_ids = _queue_messages(db_session, 2)
+    provider = FakeSmsProvider()
+
+    with patch("app.tasks.sms_tasks.WorkerSessionLocal", return_value=db_session), \
+         patch("app.tasks.sms_tasks.get_sms_router", return_value=provider), \
+         patch.object(provider, "send_batch", side_effect=RuntimeError("connection reset")):
+        process_sms_batch()
+
+    items = [db_session.get(SMSQueue, item_id) for item_id in item_ids]
+    assert [item.status for item in items] == ["pending", "pending"]
+    assert all(item.attempts == 1 and "connection reset" in item.error_message for item in items)
+    assert db_session.query(Message).count() == 0
+
+def test_pausing_a_campaign_stops_the_batch_being_sent(db_session: Session, monkeypatch):
+    monkeypatch.setattr(settings, "SMS_SEND_CONCURRENCY", 1)
+    item_ids = _queue_messages(db_session, 3)
+    campaign_id = db_session.get(SMSQueue, item_ids[0]).campaign_id
+    provider = FakeSmsProvider()
+    send_sms = provider.send_sms
+
+    def send_then_pause(*args):
+        result = send_sms(*args)
+        campaign_service.pause_campaign(db_session, campaign_id)
+        return result
+
+    with patch("app.tasks.sms_tasks.WorkerSessionLocal", return_value=db_session), \
+         patch("app.tasks.sms_tasks.get_sms_router", return_value=provider), \
+         patch.object(provider, "send_sms", side_effect=send_then_pause):
+        process_sms_batch()
+
+    assert len(provider.sent) == 1
+    items = [db_session.get(SMSQueue, item_id) for item_id in item_ids]
+    assert sorted(item.status for item in items) == ["pending", "pending", "sent"]
+    assert all(item.attempts == 0 for item in items if item.status == "pending")
+    assert db_session.query(Message).count() == 1
@@ -5,7 +5,7 @@ from app.db.models import Campaign, Contact, MailingList, SMSQueue, Message
 from datetime import datetime, timedelta, timezone
 
 @patch("app.tasks.sms_tasks.CampaignExecutionService")
-@patch("app.tasks.sms_tasks.SessionLocal")
+@patch("app.tasks.sms_tasks.WorkerSessionLocal")
 def test_send_scheduled_campaigns(MockSessionLocal, MockExecutionService, db_session: Session):
     # --- Setup ---
     MockSessionLocal.return_value = db_session
@@ -30,7 +30,7 @@ def test_send_scheduled_campaigns(MockSessionLocal, MockExecutionService, db_ses
     mock_service_instance.launch_campaign.assert_called_once_with(scheduled_campaign.id_campagne)
 
 
-@patch("app.tasks.sms_tasks.SessionLocal")
+@patch("app.tasks.sms_tasks.WorkerSessionLocal")
 @patch("app.tasks.sms_tasks.TwilioProvider")
 def test_process_sms_queue_success(MockTwilioProvider, MockSessionLocal, db_session: Session):
     # --- Setup ---
@@ -65,7 +65,7 @@ def test_process_sms_queue_success(MockTwilioProvider, MockSessionLocal, db_sess
     assert message.statut_livraison == "sent"
 
 
-@patch("app.tasks.sms_tasks.SessionLocal")
+@patch("app.tasks.sms_tasks.WorkerSessionLocal")
 @patch("app.tasks.sms_tasks.TwilioProvider")
 def test_process_sms_queue_failure_and_retry(MockTwilioProvider, MockSessionLocal, db_session: Session):
     # --- Setup ---
@@ -97,7 +97,7 @@ def test_process_sms_queue_failure_and_retry(MockTwilioProvider, MockSessionLoca
 
 
 @patch("app.tasks.sms_tasks.settings")
-@patch("app.tasks.sms_tasks.SessionLocal")
+@patch("app.tasks.sms_tasks.WorkerSessionLocal")
 @patch("app.tasks.sms_tasks.TwilioProvider")
 def test_process_sms_queue_respects_rate_limit(MockTwilioProvider, MockSessionLocal, mock_settings, db_session: Session):
     # --- Setup ---
@@ -0,0 +1,17 @@
+import random
+from app.utils.backoff import backoff_delay
+
+def test_delay_doubles_with_each_attempt():
+    rng = random.Random(42)
+    for attempt, ceiling in [(1, 10), (2, 20), (3, 40)]:
+        delay = backoff_delay(attempt, base_seconds=10, max_seconds=1000, rng=rng)
+        assert ceiling / 2 <= delay <= ceiling
+
+def test_delay_is_capped():
+    delay = backoff_delay(20, base_seconds=10, max_seconds=60)
+    assert 30 <= delay <= 60
+
+def test_delay_is_jittered():
+    rng = random.Random(7)
+    delays = {backoff_delay(3, base_seconds=10, max_seconds=1000, rng=rng) for _ in range(10)}
+    assert len(delays) > 1
@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.utils.send_window import SendWindowScheduler, InvalidSendWindowError
+
+START = datetime(2025, 6, 2, 10, 0, tzinfo=timezone.utc)
+
+def test_no_window_schedules_everything_at_start():
+    """Without a rate or window every message is due immediately."""
+    scheduler = SendWindowScheduler(start=START)
+    assert [scheduler.next_slot() for _ in range(3)] == [START, START, START]
+
+def test_rate_spaces_messages_evenly():
+    """120 messages per minute means one every 0.5 seconds."""
+    scheduler = SendWindowScheduler(start=START, rate_per_minute=120)
+    slots = [scheduler.next_slot() for _ in range(3)]
+    assert slots == [START, START + timedelta(seconds=0.5), START + timedelta(seconds=1)]
+
+def test_outside_window_moves_to_next_opening():
+    """A launch at 22:00 UTC with a 09-18 window starts at 09:00 the next day."""
+    scheduler = SendWindowScheduler(start=START.replace(hour=22), start_hour=9, end_hour=18)
+    assert scheduler.next_slot() == datetime(2025, 6, 3, 9, 0, tzinfo=timezone.utc)
+
+def test_window_is_evaluated_in_local_time():
+    """09:00 in Paris during summer time is 07:00 UTC."""
+    scheduler = SendWindowScheduler(start=START.replace(hour=5), start_hour=9, end_hour=18, timezone_name="Europe/Paris")
+    assert scheduler.next_slot() == datetime(2025, 6, 2, 7, 0, tzinfo=timezone.utc)
+
+def test_throttled_send_rolls_over_into_next_window():
+    """Messages that would land after the window closes wait for the next opening."""
+    scheduler = SendWindowScheduler(start=START.replace(hour=17, minute=59), rate_per_minute=1, start_hour=9, end_hour=18)
+    assert scheduler.next_slot() == START.replace(hour=17, minute=59)
+    assert scheduler.next_slot() == datetime(2025, 6, 3, 9, 0, tzinfo=timezone.utc)
+
+def test_overnight_window():
+    """A 20-06 window is open at 23:00 and closed at 12:00."""
+    scheduler = SendWindowScheduler(start=START.replace(hour=23), start_hour=20, end_hour=6)
+    assert scheduler.next_slot() == START.replace(hour=23)
+    scheduler = SendWindowScheduler(start=START.replace(hour=12), start_hour=20, end_hour=6)
+    assert scheduler.next_slot() == START.replace(hour=20)
+
+@pytest.mark.parametrize("kwargs", [
+    {"rate_per_minute": 0},
+    {"start_hour": 9},
+    {"start_hour": 9, "end_hour": 9},
+    {"timezone_name": "Mars/Olympus"},
+])
+def test_invalid_parameters(kwargs):
+    with pytest.raises(InvalidSendWindowError):
+        SendWindowScheduler(start=START, **kwargs)